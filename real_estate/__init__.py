@@ -0,0 +1 @@
+# Synthetic real estate database generator
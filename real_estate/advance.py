@@ -0,0 +1,305 @@
+import argparse
+import sqlite3
+
+import numpy as np
+
+from . import schema
+from .columnar import NULL_DAY, Categorical, ColumnTable
+from .config import AGENT_ID_START, OWNER_ID_START, PROPERTY_ID_START, RENTAL_ID_START, REQUEST_ID_START, SALE_ID_START, TENANT_ID_START
+from .payments import PAYMENT_INTERVAL, completed_payment_notes, payment_details, payment_methods
+from .vectorized import issue_descriptions, open_maintenance_statuses, uniform_cents
+
+# "Advance the clock": append the activity of the next months to an existing
+# database. Everything needed is read from the database itself through indexed
+# lookups, never by scanning history:
+#
+# - the clock is the end of the month of the latest activity date (payments, request
+#   submissions, sales and lease starts; resolution dates may lie ahead of it);
+# - active leases are the rentals whose End_Date is not before the new period, found
+#   through the End_Date index. As in a fresh build, a lease pays every
+#   PAYMENT_INTERVAL days from one interval after its Start_Date, the last time on or
+#   before its End_Date, so its payments in the period follow from its dates alone;
+# - payments dated before the new last month are completed, those in the new last
+#   month are pending, as in a fresh build;
+# - open maintenance requests are resolved with probability RESOLVE_PROBABILITY per
+#   month, and new requests, sales and rentals arrive at the average monthly rate of
+#   the existing history. Sold or rented properties are drawn from the available ones.
+#
+# The cost of a top-up is proportional to the rows it adds or changes.
+
+# Months covered by the generated history of each kind of activity
+REQUEST_HISTORY_MONTHS = (2024 - 2005 + 1) * 12
+SALE_HISTORY_MONTHS = (2024 - 2002 + 1) * 12
+
+RESOLVE_PROBABILITY = 0.5
+
+# Property IDs checked per query while looking for available properties
+AVAILABLE_PROBE_BATCH = 500
+AVAILABLE_PROBE_ROUNDS = 50
+
+
+def _day(text):
+    return int(np.datetime64(text, "D").astype(np.int64))
+
+
+def _days(texts):
+    return np.array(texts, dtype="datetime64[D]").astype(np.int64)
+
+
+def _month_end(day):
+    month = np.datetime64(int(day), "D").astype("datetime64[M]")
+    return int((month + 1).astype("datetime64[D]").astype(np.int64)) - 1
+
+
+def _month_start(day):
+    return int(np.datetime64(int(day), "D").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64))
+
+
+def _add_months(day, months):
+    month = np.datetime64(int(day), "D").astype("datetime64[M]") + months
+    return int(month.astype("datetime64[D]").astype(np.int64))
+
+
+def _max(conn, table, column):
+    return conn.execute(f"SELECT max({column}) FROM {table}").fetchone()[0]
+
+
+# High-water IDs, table sizes and the current clock of a database
+class State:
+    def __init__(self, conn):
+        self.max_ids = {
+            "Properties": _max(conn, "Properties", "Property_ID") or PROPERTY_ID_START - 1,
+            "Agents": _max(conn, "Agents", "Agent_ID") or AGENT_ID_START - 1,
+            "Owners": _max(conn, "Owners", "Owner_ID") or OWNER_ID_START - 1,
+            "Tenants": _max(conn, "Tenants", "Tenant_ID") or TENANT_ID_START - 1,
+            "MaintenanceRequests": _max(conn, "MaintenanceRequests", "Request_ID") or REQUEST_ID_START - 1,
+            "Sales": _max(conn, "Sales", "Sale_ID") or SALE_ID_START - 1,
+            "Rentals": _max(conn, "Rentals", "Rental_ID") or RENTAL_ID_START - 1,
+            "Rent_Payments": _max(conn, "Rent_Payments", "Payment_ID") or 0,
+        }
+        self.last_dates = {
+            column: _max(conn, table, column)
+            for table, column in [
+                ("Rent_Payments", "Payment_Date"),
+                ("MaintenanceRequests", "Date_Submitted"),
+                ("Sales", "Sale_Date"),
+                ("Rentals", "Start_Date"),
+            ]
+        }
+        dates = [_day(text) for text in self.last_dates.values() if text is not None]
+        if not dates:
+            raise ValueError("The database has no activity to continue from")
+        self.clock = _month_end(max(dates))
+
+    def count(self, table, id_start):
+        return self.max_ids[table] - id_start + 1
+
+    def random_ids(self, rng, table, id_start, size):
+        return rng.integers(id_start, self.max_ids[table], size, endpoint=True)
+
+
+# Leases that may pay from first_day on: (Rental_ID, Property_ID, Tenant_ID,
+# Start_Date, End_Date) of the rentals that end on or after it
+def active_leases(conn, first_day):
+    rows = conn.execute(
+        "SELECT Rental_ID, Property_ID, Tenant_ID, Start_Date, End_Date FROM Rentals WHERE End_Date >= ?",
+        (str(np.datetime64(first_day, "D")),),
+    ).fetchall()
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty, empty
+    rental_ids, property_ids, tenant_ids, starts, ends = (np.array(column) for column in zip(*rows))
+    return rental_ids.astype(np.int64), property_ids.astype(np.int64), tenant_ids.astype(np.int64), _days(starts), _days(ends)
+
+
+# Up to `count` distinct available properties, found by probing random property IDs
+def available_properties(conn, state, rng, count):
+    found = {}
+    for _ in range(AVAILABLE_PROBE_ROUNDS):
+        if len(found) >= count:
+            break
+        probe = np.unique(state.random_ids(rng, "Properties", PROPERTY_ID_START, AVAILABLE_PROBE_BATCH))
+        placeholders = ", ".join("?" for _ in probe)
+        rows = conn.execute(
+            f"SELECT Property_ID FROM Properties WHERE Status = 'Available' AND Property_ID IN ({placeholders})",
+            probe.tolist(),
+        ).fetchall()
+        found.update((row[0], None) for row in rows)
+    return np.array(list(found)[:count], dtype=np.int64)
+
+
+def new_maintenance_requests(state, rng, first_day, last_day, months):
+    rate = state.count("MaintenanceRequests", REQUEST_ID_START) / REQUEST_HISTORY_MONTHS
+    size = int(rng.poisson(rate * months))
+    request_ids = np.arange(state.max_ids["MaintenanceRequests"] + 1, state.max_ids["MaintenanceRequests"] + 1 + size)
+    return {
+        "Request_ID": request_ids,
+        "Property_ID": state.random_ids(rng, "Properties", PROPERTY_ID_START, size),
+        "Date_Submitted": rng.integers(first_day, last_day, size, endpoint=True).astype(np.int32),
+        "Issue_Description": Categorical(request_ids % len(issue_descriptions), issue_descriptions),
+        "Status": Categorical(rng.integers(0, len(open_maintenance_statuses), size), open_maintenance_statuses),
+        "Date_Resolved": np.full(size, NULL_DAY, dtype=np.int32),
+        "Cost": uniform_cents(rng, 100, 1000, size),
+    }
+
+
+# (Request_ID, Date_Resolved) of the open requests resolved during the period
+def resolved_requests(conn, rng, first_day, last_day, months):
+    rows = conn.execute(
+        f"SELECT Request_ID, Date_Submitted FROM MaintenanceRequests WHERE Status IN ({', '.join('?' for _ in open_maintenance_statuses)})",
+        open_maintenance_statuses.tolist(),
+    ).fetchall()
+    if not rows:
+        return []
+    request_ids, submitted = (np.array(column) for column in zip(*rows))
+    resolved = rng.random(len(rows)) < 1 - (1 - RESOLVE_PROBABILITY) ** months
+    # Resolved at least a day after submission and inside the period
+    earliest = np.maximum(_days(submitted[resolved]) + 1, first_day)
+    days = earliest + (rng.random(len(earliest)) * (last_day - earliest + 1)).astype(np.int64)
+    dates = np.datetime64("1970-01-01") + days.astype("timedelta64[D]")
+    return list(zip(dates.astype(str).tolist(), request_ids[resolved].tolist()))
+
+
+def new_sales(state, rng, property_ids, first_day, last_day):
+    size = len(property_ids)
+    sale_price = rng.integers(200_000, 2_000_000, size, endpoint=True)
+    return {
+        "Sale_ID": np.arange(state.max_ids["Sales"] + 1, state.max_ids["Sales"] + 1 + size),
+        "Property_ID": property_ids,
+        "Owner_ID": state.random_ids(rng, "Owners", OWNER_ID_START, size),
+        "Sale_Date": rng.integers(first_day, last_day, size, endpoint=True).astype(np.int32),
+        "Sale_Price": sale_price,
+        "Agent_ID": state.random_ids(rng, "Agents", AGENT_ID_START, size),
+        "Commission": uniform_cents(rng, 4, 10, size),
+        "Closing_Costs": sale_price + rng.uniform(1000, 3000, size),
+    }
+
+
+def new_rentals(state, rng, property_ids, first_day, last_day):
+    size = len(property_ids)
+    start_date = rng.integers(first_day, last_day, size, endpoint=True).astype(np.int32)
+    monthly_rent = rng.integers(1000, 5000, size, endpoint=True)
+    return {
+        "Rental_ID": np.arange(state.max_ids["Rentals"] + 1, state.max_ids["Rentals"] + 1 + size),
+        "Property_ID": property_ids,
+        "Tenant_ID": state.random_ids(rng, "Tenants", TENANT_ID_START, size),
+        "Start_Date": start_date,
+        "End_Date": start_date + rng.integers(90, 365, size, endpoint=True, dtype=np.int32),
+        "Monthly_Rent": monthly_rent,
+        "Security_Deposit": np.round(monthly_rent * rng.uniform(1, 2, size), 2),
+        "Agent_ID": state.random_ids(rng, "Agents", AGENT_ID_START, size),
+        "Commission": uniform_cents(rng, 4, 10, size),
+    }
+
+
+# Payments dated first_day..last_day of leases paying every interval after their
+# start day, up to their end day
+def new_payments(state, rng, rental_ids, property_ids, tenant_ids, starts, ends, first_day, last_day):
+    # Payments k = first_k..last_k of each lease fall inside the period
+    first_k = np.maximum(1, -(-(first_day - starts) // PAYMENT_INTERVAL))
+    last_k = (np.minimum(ends, last_day) - starts) // PAYMENT_INTERVAL
+    counts = np.maximum(0, last_k - first_k + 1)
+    lease = np.repeat(np.arange(len(property_ids)), counts)
+    k = np.arange(len(lease)) - np.repeat(np.cumsum(counts) - counts, counts) + first_k[lease]
+    days = starts[lease] + k * PAYMENT_INTERVAL
+    order = np.lexsort((property_ids[lease], days))
+    lease, days = lease[order], days[order]
+
+    payment_ids = np.arange(state.max_ids["Rent_Payments"] + 1, state.max_ids["Rent_Payments"] + 1 + len(lease))
+    return {
+        "Payment_ID": payment_ids,
+        "Rental_ID": rental_ids[lease],
+        "Payment_Date": days.astype(np.int32),
+        "Tenant_ID": tenant_ids[lease],
+        "Property_ID": property_ids[lease],
+        **payment_details(rng, days >= _month_start(last_day)),
+    }
+
+
+# (Payment_Method, Notes, Payment_ID) of pending payments that are now completed
+def completed_payments(conn, rng, pending_from_day):
+    rows = conn.execute(
+        "SELECT Payment_ID FROM Rent_Payments WHERE Status = 'Pending' AND Payment_Date < ?",
+        (str(np.datetime64(pending_from_day, "D")),),
+    ).fetchall()
+    size = len(rows)
+    methods = payment_methods[rng.integers(0, len(payment_methods), size)]
+    notes = completed_payment_notes[rng.integers(0, len(completed_payment_notes), size)]
+    return list(zip(methods.tolist(), notes.tolist(), [row[0] for row in rows]))
+
+
+def _insert(conn, table, columns):
+    chunk = ColumnTable(table, columns)
+    conn.executemany(schema.insert_sql(table), chunk)
+    return len(chunk)
+
+
+# Append `months` months of activity after the database's clock in one transaction.
+# Returns the new clock (a 'YYYY-MM-DD' string) and the rows added or changed per kind.
+def advance(conn, months=1, seed=None):
+    if months < 1:
+        raise ValueError(f"months must be at least 1, got {months}")
+
+    state = State(conn)
+    first_day = state.clock + 1
+    last_day = _add_months(first_day, months) - 1
+    rng = np.random.default_rng(None if seed is None else [seed, last_day])
+
+    with conn:
+        counts = {}
+        requests = new_maintenance_requests(state, rng, first_day, last_day, months)
+        resolved = resolved_requests(conn, rng, first_day, last_day, months)
+        conn.executemany("UPDATE MaintenanceRequests SET Status = 'Resolved', Date_Resolved = ? WHERE Request_ID = ?", resolved)
+        counts["Resolved requests"] = len(resolved)
+        counts["MaintenanceRequests"] = _insert(conn, "MaintenanceRequests", requests)
+
+        # Available properties sold or rented at the historical monthly rates
+        sale_rate = state.count("Sales", SALE_ID_START) / SALE_HISTORY_MONTHS
+        rental_rate = state.count("Rentals", RENTAL_ID_START) / SALE_HISTORY_MONTHS
+        sale_count, rental_count = int(rng.poisson(sale_rate * months)), int(rng.poisson(rental_rate * months))
+        chosen = available_properties(conn, state, rng, sale_count + rental_count)
+        sold, rented = chosen[:sale_count], chosen[sale_count:]
+
+        sales = new_sales(state, rng, sold, first_day, last_day)
+        conn.executemany("UPDATE Properties SET Status = 'Owned' WHERE Property_ID = ?", [(pid,) for pid in sold.tolist()])
+        counts["Sales"] = _insert(conn, "Sales", sales)
+
+        rentals = new_rentals(state, rng, rented, first_day, last_day)
+        # Rented properties carry their monthly rent as price
+        conn.executemany(
+            "UPDATE Properties SET Status = 'Rented', Price = ? WHERE Property_ID = ?",
+            list(zip(rentals["Monthly_Rent"].tolist(), rented.tolist())),
+        )
+        counts["Rentals"] = _insert(conn, "Rentals", rentals)
+
+        completed = completed_payments(conn, rng, _month_start(last_day))
+        conn.executemany("UPDATE Rent_Payments SET Status = 'Completed', Payment_Method = ?, Notes = ? WHERE Payment_ID = ?", completed)
+        counts["Completed payments"] = len(completed)
+
+        # The rentals just inserted are among the active leases
+        payments = new_payments(state, rng, *active_leases(conn, first_day), first_day, last_day)
+        counts["Rent_Payments"] = _insert(conn, "Rent_Payments", payments)
+
+    return str(np.datetime64(last_day, "D")), counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append the next months of activity to an existing database")
+    parser.add_argument("db", nargs="?", default="real_estate.db")
+    parser.add_argument("--months", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        clock, counts = advance(conn, args.months, args.seed)
+    finally:
+        conn.close()
+    print(f"{args.db} advanced to {clock}")
+    for kind, count in counts.items():
+        print(f"{kind:<20} {count:>12,}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+from . import build, feature_index, geo, reports, tables, text_search
+from .config import Scale
+from .export import export_database
+from .loader import Loader
+from .parallel import chunk_stream
+from .pools import Pool
+
+# Benchmark of the whole pipeline, phase by phase, at several scale tiers. Every
+# phase records its rows, seconds, rows/sec and peak resident memory; results are
+# written as JSON and can be compared against a stored baseline.
+#
+# Peak memory is the high-water mark of the process' resident set while the phase
+# ran. On Linux the mark is reset before every phase (and around every chunk for the
+# generate/insert phases) through /proc/self/clear_refs; elsewhere it is the peak of
+# the whole process so far.
+
+# Tier name -> scale factor; scale 1 has 1000 properties
+TIERS = {
+    "1k": 1,
+    "100k": 100,
+    "1m": 1000,
+}
+DEFAULT_TIERS = list(TIERS)
+DEFAULT_SEED = 0
+DEFAULT_EXPORT_FORMAT = "csv"
+
+# Relative slowdown (rows/sec) or memory growth that counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+RESULTS_VERSION = 1
+
+
+class PeakMemory:
+    def __init__(self):
+        self.resettable = os.path.exists("/proc/self/clear_refs")
+
+    def reset(self):
+        if self.resettable:
+            try:
+                with open("/proc/self/clear_refs", "w") as f:
+                    f.write("5")
+            except OSError:
+                self.resettable = False
+
+    # Peak resident set size in bytes since the last reset
+    def peak(self):
+        if self.resettable:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Phase:
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.seconds = 0.0
+        self.peak_bytes = 0
+
+    def add(self, rows, seconds, peak_bytes):
+        self.rows += rows
+        self.seconds += seconds
+        self.peak_bytes = max(self.peak_bytes, peak_bytes)
+
+    def result(self):
+        return {
+            "phase": self.name,
+            "rows": self.rows,
+            "seconds": self.seconds,
+            "rows_per_sec": self.rows / self.seconds if self.seconds else 0.0,
+            "peak_mb": self.peak_bytes / 2**20,
+        }
+
+
+# Run `function` as one phase
+def measure(memory, name, function):
+    phase = Phase(name)
+    memory.reset()
+    start = time.perf_counter()
+    rows = function()
+    phase.add(rows, time.perf_counter() - start, memory.peak())
+    return phase
+
+
+# Pass a chunk stream through while charging the time and memory of producing each
+# chunk to `generate` and of consuming it (the loader's executemany) to `insert`
+def metered(chunks, memory, generate, insert):
+    chunks = iter(chunks)
+    while True:
+        memory.reset()
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        generate.add(len(chunk), time.perf_counter() - start, memory.peak())
+
+        memory.reset()
+        start = time.perf_counter()
+        yield chunk
+        insert.add(len(chunk), time.perf_counter() - start, memory.peak())
+
+
+def run_tier(scale, directory, workers=1, export_format=DEFAULT_EXPORT_FORMAT):
+    memory = PeakMemory()
+    phases = []
+
+    phases.append(measure(memory, "pools", lambda: len(Pool.build(scale.locale, scale.pool_seed, scale.pool_size).streets)))
+
+    db_name = os.path.join(directory, "benchmark.db")
+    if os.path.exists(db_name):
+        os.remove(db_name)
+    conn = sqlite3.connect(db_name)
+    try:
+        context = tables.Context(scale)
+        chunks = chunk_stream(context, workers)
+        with Loader(conn, "drop") as loader:
+            # The same chunks per table as a real build
+            for table, table_chunks in build.table_streams(scale, chunks):
+                generate, insert = Phase(f"generate:{table}"), Phase(f"insert:{table}")
+                loader.load_table(table, metered(table_chunks, memory, generate, insert))
+                phases += [generate, insert]
+            # Leaving the block commits and builds the indexes
+            memory.reset()
+        index = Phase("indexes")
+        index.add(loader.report.total_rows(), loader.report.index_seconds, memory.peak())
+        phases.append(index)
+
+        def summaries():
+            reports.install(conn)
+            return loader.report.total_rows()
+
+        phases.append(measure(memory, "summaries", summaries))
+
+        def features():
+            feature_index.install(conn)
+            return loader.report.counts()["Property_Features"]
+
+        phases.append(measure(memory, "feature index", features))
+
+        def locations():
+            geo.install(conn)
+            counts = loader.report.counts()
+            return counts["Properties"] + counts["Owners"] + counts["Tenants"]
+
+        phases.append(measure(memory, "spatial index", locations))
+
+        def texts():
+            text_search.install(conn)
+            counts = loader.report.counts()
+            return counts["MaintenanceRequests"] + counts["Properties"] + counts["Owners"] + counts["Tenants"] + counts["Rent_Payments"]
+
+        phases.append(measure(memory, "text index", texts))
+
+        export_path = os.path.join(directory, f"export.{export_format}")
+        phases.append(measure(memory, f"export:{export_format}", lambda: sum(export_database(conn, export_path, export_format).values())))
+    finally:
+        conn.close()
+        os.remove(db_name)
+
+    return [phase.result() for phase in phases]
+
+
+def run(tiers=DEFAULT_TIERS, seed=DEFAULT_SEED, workers=1, export_format=DEFAULT_EXPORT_FORMAT):
+    results = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "workers": workers,
+        "tiers": {},
+    }
+    for tier in tiers:
+        scale = Scale(TIERS[tier], seed=seed)
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            phases = run_tier(scale, directory, workers, export_format)
+        results["tiers"][tier] = {
+            "scale": scale.factor,
+            "properties": scale.properties,
+            "seconds": time.perf_counter() - start,
+            "phases": phases,
+        }
+    return results
+
+
+# Phases that got slower or bigger than the baseline by more than `tolerance`
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for tier, tier_results in results["tiers"].items():
+        if tier not in baseline.get("tiers", {}):
+            continue
+        base_phases = {phase["phase"]: phase for phase in baseline["tiers"][tier]["phases"]}
+        for phase in tier_results["phases"]:
+            base = base_phases.get(phase["phase"])
+            if base is None:
+                continue
+            if base["rows_per_sec"] and phase["rows_per_sec"] < base["rows_per_sec"] * (1 - tolerance):
+                regressions.append(f"{tier} {phase['phase']}: {phase['rows_per_sec']:,.0f} rows/s, baseline {base['rows_per_sec']:,.0f}")
+            if base["peak_mb"] and phase["peak_mb"] > base["peak_mb"] * (1 + tolerance):
+                regressions.append(f"{tier} {phase['phase']}: {phase['peak_mb']:,.1f} MB peak, baseline {base['peak_mb']:,.1f}")
+    return regressions
+
+
+def format_results(results):
+    lines = []
+    for tier, tier_results in results["tiers"].items():
+        lines.append(f"== {tier} ({tier_results['properties']:,} properties, {tier_results['seconds']:.2f}s)")
+        for phase in tier_results["phases"]:
+            lines.append(
+                f"{phase['phase']:<32} {phase['rows']:>12,} rows {phase['seconds']:>9.3f}s "
+                f"{phase['rows_per_sec']:>12,.0f} rows/s {phase['peak_mb']:>9.1f} MB"
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-phase throughput and peak memory of the pipeline")
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=DEFAULT_TIERS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--export-format", default=DEFAULT_EXPORT_FORMAT)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results file; it is created when missing")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = run(args.tiers, args.seed, args.workers, args.export_format)
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            with open(args.baseline, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"Baseline written to {args.baseline}")
+            return 0
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
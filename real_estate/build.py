@@ -0,0 +1,77 @@
+from itertools import islice
+
+from . import feature_index, geo, reports, shards, tables, text_search
+from .instrument import disabled
+from .loader import DEFAULT_TRANSACTION_ROWS, Loader, target_database
+from .parallel import chunk_stream
+
+
+# (table, chunks of that table) in load order, taken from the chunk stream of a run
+def table_streams(scale, chunks, shard=None):
+    for table in tables.load_order:
+        yield table, islice(chunks, len(tables.chunk_indexes(scale, table, shard)))
+
+
+# Generation context of a run, as the "pools" phase. Loads (or builds and caches) the
+# name pools before any worker starts, so the workers all find them on disk.
+def load_context(scale, instrumentation=None):
+    with (instrumentation or disabled).phase("pools") as phase:
+        context = tables.Context(scale)
+        phase.rows = len(context.pool.streets)
+    return context
+
+
+# Structures derived from the loaded tables and kept current by triggers afterwards:
+# the module building one and the LoadReport attribute recording the time it took
+derived = [
+    (reports, "summary_seconds"),
+    (feature_index, "feature_index_seconds"),
+    (geo, "spatial_index_seconds"),
+    (text_search, "text_index_seconds"),
+]
+
+
+# Build the derived structures; without rebuild only those that are missing. Each
+# build is a "derived:<module>" phase of the instrumentation.
+def install_derived(conn, report, rebuild=True, instrumentation=None):
+    for module, attribute in derived:
+        if rebuild or not module.installed(conn):
+            with (instrumentation or disabled).phase(f"derived:{module.__name__.rpartition('.')[2]}"):
+                setattr(report, attribute, module.install(conn))
+
+
+# Work after the tables are loaded: shard files record their build, other loads
+# bring the derived structures up to date
+def finish_load(conn, report, scale, if_exists, shard=None, instrumentation=None):
+    if shard is not None:
+        # The derived structures are built once the shards are merged
+        shards.write_info(conn, scale, shard)
+    else:
+        # A fresh load replaced the source tables, so they are rebuilt; appended rows
+        # were already added to them by their triggers
+        install_derived(conn, report, if_exists != "append", instrumentation)
+
+
+# Generate every table for the given scale and bulk-load it into the database. With
+# workers > 1 the chunks are generated in worker processes while this process stays
+# the only writer; the rows are the same either way. With a shard only that shard's
+# block of every table is generated (see shards.py). The phases of the build are
+# reported to `instrumentation` (see instrument.py).
+def build_database(conn, scale, workers=1, if_exists="fail", transaction_rows=DEFAULT_TRANSACTION_ROWS, shard=None, instrumentation=None):
+    context = load_context(scale, instrumentation)
+    chunks = chunk_stream(context, workers, shard)
+
+    with Loader(conn, if_exists, transaction_rows, instrumentation) as loader:
+        for table, table_chunks in table_streams(scale, chunks, shard):
+            loader.load_table(table, table_chunks)
+
+    finish_load(conn, loader.report, scale, if_exists, shard, instrumentation)
+    return loader.report
+
+
+# Build the database file db_name. With if_exists="replace" the data is loaded into a
+# separate file that only replaces db_name once the load has succeeded, so readers of
+# the old database never see a half-loaded one.
+def create_database(db_name, scale, workers=1, if_exists="fail", transaction_rows=DEFAULT_TRANSACTION_ROWS, shard=None, instrumentation=None):
+    with target_database(db_name, if_exists) as conn:
+        return build_database(conn, scale, workers, if_exists, transaction_rows, shard, instrumentation)
@@ -0,0 +1,223 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from . import instrument
+
+# Command line of the package: python -m real_estate <command>. Only the standard
+# library is imported up front; each command imports the modules it needs when it
+# runs, so numpy, Faker and the Excel and Parquet writers are only loaded by the
+# commands that generate or export data, and quick commands (query, validate, --help)
+# start in a fraction of the time. `startup` measures that time against a target.
+# generate and export take the instrumentation options of instrument.py (--events,
+# --progress, --profile).
+
+DEFAULT_DB = "real_estate.db"
+EXPORT_FORMATS = ["xlsx", "csv", "parquet", "parquet-dataset"]
+IF_EXISTS = ["fail", "drop", "replace", "append"]
+
+# Modules the quick commands must not import
+HEAVY_MODULES = ["numpy", "pandas", "faker", "openpyxl", "pyarrow"]
+
+# Startup target of the quick commands (median wall time of a fresh interpreter) and
+# the runs it is measured over
+STARTUP_TARGET_SECONDS = 0.15
+STARTUP_REPEATS = 5
+
+# Runs one command in a fresh interpreter and reports the heavy modules it imported
+_PROBE = f"""
+import sys
+from real_estate.cli import main
+try:
+    main(sys.argv[1:])
+except SystemExit:
+    pass
+sys.stderr.write("\\nheavy modules: " + " ".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+
+def _connect_read_only(db):
+    import sqlite3
+
+    return sqlite3.connect(db) if db == ":memory:" else sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+
+
+def _scale(args):
+    from .config import Scale
+
+    options = {"chunk_size": args.chunk_size} if args.chunk_size else {}
+    return Scale(args.scale, seed=args.seed, **options)
+
+
+def generate(args):
+    scale = _scale(args)
+    with instrument.from_args(args) as instrumentation:
+        _generate(args, scale, instrumentation)
+
+
+def _generate(args, scale, instrumentation):
+    if args.snapshot:
+        from . import snapshot
+
+        # The snapshot replaces the whole file, so "drop" and "replace" both apply
+        if args.if_exists == "fail" and os.path.exists(args.db):
+            raise SystemExit(f"{args.db} already exists (use --if-exists drop or replace)")
+        hit = snapshot.create_database(args.db, scale, args.workers)
+        print(f"Database created: {args.db} ({scale}, {'copied from the snapshot cache' if hit else 'built and cached'})")
+    elif args.export:
+        from .pipeline import build_and_export
+
+        # Generate all tables, insert them and export them in one overlapped pass
+        report = build_and_export(args.db, scale, args.export, args.export_format, args.workers, args.if_exists, instrumentation=instrumentation)
+        print(f"Database created: {args.db} ({scale}, {report.load.total_rows()} rows)")
+        print(report.summary())
+        print(f"{args.export_format} export created: {args.export}")
+    else:
+        from .build import create_database
+
+        report = create_database(args.db, scale, args.workers, args.if_exists, instrumentation=instrumentation)
+        print(f"Database created: {args.db} ({scale}, {report.total_rows()} rows)")
+        print(report.summary())
+
+
+def append(args):
+    from .advance import main as advance
+
+    return advance([args.db, "--months", str(args.months)] + (["--seed", str(args.seed)] if args.seed is not None else []))
+
+
+def export(args):
+    from .export import export_database
+
+    conn = _connect_read_only(args.db)
+    try:
+        start = time.perf_counter()
+        with instrument.from_args(args) as instrumentation:
+            counts = export_database(conn, args.path, args.format, args.table, instrumentation=instrumentation)
+    finally:
+        conn.close()
+    for table, count in counts.items():
+        print(f"{table:<20} {count:>12,}")
+    print(f"{args.format} export created: {args.path} in {time.perf_counter() - start:.2f}s")
+
+
+def validate(args):
+    from .validate import main as validate
+
+    return validate([args.db] + args.options)
+
+
+def query(args):
+    if (args.sql is None) == (args.report is None):
+        raise SystemExit("Give either SQL or --report")
+    conn = _connect_read_only(args.db)
+    try:
+        start = time.perf_counter()
+        if args.report:
+            from .reports import run_report
+
+            columns, rows = run_report(conn, args.report)
+            rows = rows[: args.limit] if args.limit else rows
+        else:
+            cursor = conn.execute(args.sql, args.params)
+            columns = [column[0] for column in cursor.description or []]
+            rows = cursor.fetchmany(args.limit) if args.limit else cursor.fetchall()
+        seconds = time.perf_counter() - start
+    finally:
+        conn.close()
+
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if value is None else str(value) for value in row))
+    print(f"{len(rows)} rows in {seconds * 1000:.2f} ms", file=sys.stderr)
+
+
+# Median seconds and heavy modules imported of a command run in a fresh interpreter
+def measure_startup(argv, repeats=STARTUP_REPEATS):
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")]))}
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", _PROBE, *argv], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        seconds.append(time.perf_counter() - start)
+    heavy = result.stderr.rpartition("heavy modules:")[2].split()
+    return statistics.median(seconds), heavy
+
+
+def startup(args):
+    commands = [["--help"], ["query", ":memory:", "SELECT sqlite_version()"], ["validate", ":memory:", "--list"]]
+    failed = 0
+    for argv in commands:
+        seconds, heavy = measure_startup(argv, args.repeats)
+        ok = seconds <= args.target and not heavy
+        failed += not ok
+        note = f"  imports {', '.join(heavy)}" if heavy else ""
+        print(f"{' '.join(argv):<40} {seconds * 1000:8.1f} ms  {'ok' if ok else 'OVER'}{note}")
+    print(f"target {args.target * 1000:.0f} ms, {failed} of {len(commands)} commands over")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    from . import reports
+
+    parser = argparse.ArgumentParser(prog="python -m real_estate", description="Synthetic real estate database generator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = generate_command = commands.add_parser("generate", help="generate a database, optionally exporting it in the same pass")
+    command.add_argument("db", nargs="?", default=DEFAULT_DB)
+    command.add_argument("--scale", type=float, default=1.0, help="1 is the original 1000-property layout")
+    command.add_argument("--seed", type=int)
+    command.add_argument("--chunk-size", type=int)
+    command.add_argument("--workers", type=int, default=1, help="chunk generation processes; the rows are the same for any count")
+    command.add_argument("--if-exists", choices=IF_EXISTS, default="replace")
+    command.add_argument("--export", metavar="PATH", help="also export the tables to PATH while loading them")
+    command.add_argument("--export-format", choices=EXPORT_FORMATS, default="xlsx")
+    command.add_argument("--snapshot", action="store_true", help="copy the database from the snapshot cache (needs --seed, cannot append)")
+    instrument.add_arguments(command)
+    command.set_defaults(run=generate)
+
+    command = commands.add_parser("append", help="append the next months of activity to a database")
+    command.add_argument("db", nargs="?", default=DEFAULT_DB)
+    command.add_argument("--months", type=int, default=1)
+    command.add_argument("--seed", type=int)
+    command.set_defaults(run=append)
+
+    command = commands.add_parser("export", help="export the tables of a database")
+    command.add_argument("db")
+    command.add_argument("path")
+    command.add_argument("--format", choices=EXPORT_FORMATS, default="xlsx")
+    command.add_argument("--table", action="append", help="table to export (repeatable, default all)")
+    instrument.add_arguments(command)
+    command.set_defaults(run=export)
+
+    command = commands.add_parser("validate", help="check foreign keys and business rules", add_help=False)
+    command.add_argument("db")
+    command.add_argument("options", nargs=argparse.REMAINDER, help="options of the validator (--rule, --samples, --workers, --list)")
+    command.set_defaults(run=validate)
+
+    command = commands.add_parser("query", help="run an SQL query or a named report, printing tab-separated rows")
+    command.add_argument("db")
+    command.add_argument("sql", nargs="?")
+    command.add_argument("params", nargs="*", help="values of the ? placeholders")
+    command.add_argument("--report", choices=list(reports.reports), help="named report instead of SQL")
+    command.add_argument("--limit", type=int, help="rows to print, of the query or the report")
+    command.set_defaults(run=query)
+
+    command = commands.add_parser("startup", help="measure the startup time of the quick commands")
+    command.add_argument("--target", type=float, default=STARTUP_TARGET_SECONDS, help="seconds")
+    command.add_argument("--repeats", type=int, default=STARTUP_REPEATS)
+    command.set_defaults(run=startup)
+
+    args = parser.parse_args(argv)
+    if args.command == "generate" and args.snapshot:
+        if args.seed is None:
+            generate_command.error("--snapshot needs --seed")
+        if args.export:
+            generate_command.error("--snapshot cannot be combined with --export")
+        if args.if_exists == "append":
+            generate_command.error("--snapshot copies a whole database and cannot append")
+    return args.run(args)
@@ -0,0 +1,113 @@
+import numpy as np
+
+from . import schema
+
+# Columnar chunks. A generated chunk is a ColumnTable: one numpy array per column,
+# with numbers in typed arrays, dates as int32 epoch days (NULL_DAY for NULL) and
+# low-cardinality strings (Status, Type, Payment_Method, Agency, Issue_Description,
+# pooled names, ...) dictionary-encoded as small integer codes into a category array.
+# Rows are only materialised as Python tuples chunk by chunk, when the SQLite writer
+# iterates over a table or an exporter asks for rows; Parquet is written from the
+# arrays directly.
+
+# Epoch-day value standing for a NULL date
+NULL_DAY = np.iinfo(np.int32).min
+
+
+# Smallest signed integer type that holds codes 0..size-1 and the NULL code -1
+def _code_type(size):
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+# 'YYYY-MM-DD' strings for an epoch-day array, None where the date is NULL
+def format_dates(days):
+    days = np.asarray(days)
+    text = days.astype("datetime64[D]").astype(str).astype(object)
+    text[days == NULL_DAY] = None
+    return text
+
+
+# Dictionary-encoded strings: codes index into categories, code -1 is NULL
+class Categorical:
+    def __init__(self, codes, categories):
+        self.categories = np.asarray(categories, dtype=object)
+        self.codes = np.asarray(codes).astype(_code_type(len(self.categories)), copy=False)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    def decode(self):
+        values = self.categories[np.maximum(self.codes, 0)] if len(self.categories) else np.full(len(self.codes), None, dtype=object)
+        if (self.codes < 0).any():
+            values = values.copy()
+            values[self.codes < 0] = None
+        return values
+
+
+class ColumnTable:
+    def __init__(self, table, columns):
+        self.table = table
+        self.names = schema.columns[table]
+        self.columns = {}
+        real_columns = schema.real_columns(table)
+        for name in self.names:
+            column = columns[name]
+            if not isinstance(column, Categorical):
+                column = np.asarray(column)
+                if name in schema.date_columns and column.dtype != object:
+                    column = column.astype(np.int32, copy=False)
+                elif name in real_columns and column.dtype.kind in "iu":
+                    # Typed the way SQLite stores it, so rows read the same from either
+                    column = column.astype(np.float64)
+            self.columns[name] = column
+
+    def __len__(self):
+        return len(self.columns[self.names[0]])
+
+    # Bytes held by the column arrays (categories of shared dictionaries not counted)
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+    # Values of a column as Python objects, the way SQLite stores them
+    def values(self, name):
+        column = self.columns[name]
+        if isinstance(column, Categorical):
+            return column.decode().tolist()
+        if name in schema.date_columns and column.dtype != object:
+            return format_dates(column).tolist()
+        if column.dtype.kind == "f" and np.isnan(column).any():
+            # SQLite stores NaN as NULL
+            values = column.astype(object)
+            values[np.isnan(column)] = None
+            return values.tolist()
+        return column.tolist()
+
+    # Row tuples in schema column order, as executemany and the row exporters take them
+    def __iter__(self):
+        return zip(*(self.values(name) for name in self.names))
+
+    # Arrow arrays of the columns, typed after `arrow_schema`
+    def to_arrow(self, arrow_schema):
+        import pyarrow as pa
+
+        arrays = []
+        for field in arrow_schema:
+            column = self.columns[field.name]
+            if isinstance(column, Categorical):
+                indices = pa.array(column.codes, mask=column.codes < 0)
+                dictionary = pa.array(column.categories.tolist(), type=pa.string())
+                array = pa.DictionaryArray.from_arrays(indices, dictionary).cast(field.type)
+            elif field.name in schema.date_columns and column.dtype != object:
+                array = pa.array(format_dates(column), type=field.type)
+            else:
+                array = pa.array(column, type=field.type, from_pandas=True)
+            arrays.append(array)
+        return pa.Table.from_arrays(arrays, schema=arrow_schema)
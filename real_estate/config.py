@@ -0,0 +1,78 @@
+import random
+
+from .pools import DEFAULT_LOCALE, DEFAULT_POOL_SEED, DEFAULT_POOL_SIZE
+
+# Table sizes of the original dataset (scale factor 1)
+BASE_PROPERTIES = 1000
+BASE_OWNED = 625
+BASE_RENTED = 310
+BASE_OWNERS = 250
+BASE_AGENTS = 50
+BASE_TENANTS = 200
+BASE_MAINTENANCE_REQUESTS = 150
+BASE_OPEN_MAINTENANCE_REQUESTS = 20
+
+# First ID of each table's ID block
+PROPERTY_ID_START = 1
+AGENT_ID_START = 501
+OWNER_ID_START = 1001
+TENANT_ID_START = 2001
+REQUEST_ID_START = 3001
+SALE_ID_START = 3001
+RENTAL_ID_START = 5001
+
+# Number of rows handed to a single executemany call
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def _scaled(base, factor):
+    return max(1, round(base * factor))
+
+
+# Row counts for every table, derived from a single scale factor
+class Scale:
+    def __init__(self, factor=1.0, seed=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 locale=DEFAULT_LOCALE, pool_size=DEFAULT_POOL_SIZE, pool_seed=DEFAULT_POOL_SEED):
+        if factor <= 0:
+            raise ValueError(f"Scale factor must be positive, got {factor}")
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be at least 1, got {chunk_size}")
+
+        # Without an explicit seed pick one, so every table of a run agrees on the
+        # property partition and the run can be reproduced afterwards. Whether the
+        # seed was given is kept: a random one cannot be asked for again.
+        self.explicit_seed = seed is not None
+        if seed is None:
+            seed = random.randrange(2**63)
+
+        self.factor = factor
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+        # Faker name/address pools are shared between runs with different seeds
+        self.locale = locale
+        self.pool_size = pool_size
+        self.pool_seed = pool_seed
+
+        self.properties = _scaled(BASE_PROPERTIES, factor)
+        self.owned = min(_scaled(BASE_OWNED, factor), self.properties)
+        self.rented = min(_scaled(BASE_RENTED, factor), self.properties - self.owned)
+        self.available = self.properties - self.owned - self.rented
+
+        self.owners = _scaled(BASE_OWNERS, factor)
+        self.agents = _scaled(BASE_AGENTS, factor)
+        self.tenants = _scaled(BASE_TENANTS, factor)
+        self.maintenance_requests = _scaled(BASE_MAINTENANCE_REQUESTS, factor)
+        self.open_maintenance_requests = min(
+            _scaled(BASE_OPEN_MAINTENANCE_REQUESTS, factor), self.maintenance_requests
+        )
+    def __repr__(self):
+        return f"Scale(factor={self.factor}, properties={self.properties}, seed={self.seed})"
+
+    # Independent random stream for one table
+    def rng(self, name):
+        return random.Random(f"{self.seed}:{name}")
+
+    # Integer key for seeding other generators (Faker, permutations)
+    def derive_seed(self, name):
+        return self.rng(name).getrandbits(64)
@@ -0,0 +1,138 @@
+# Static reference data used by the generators
+
+agency_names = [
+    "Realty Associates", "Heritage Homes", "Century Properties", "Legacy Realty", "Sterling Realty",
+    "Future Homes", "NextGen Realty", "Modern Living Properties", "Tech Realty", "Urban Edge Realty",
+    "Neighborhood Realty", "Hometown Properties", "Local Legends Realty", "Community Choice Realty", "Neighborly Homes",
+    "Premier Properties", "Elite Estates", "Luxury Living Realty", "Exclusive Estates", "Opulent Homes",
+    "Home Sweet Home Realty", "Key Realty", "House Hunters Realty", "Property Pros", "Real Estate Solutions",
+    "Dream Homes Realty", "The Key to Your Home", "Your Perfect Place", "Homeward Bound Realty", "Nest Egg Realty",
+    "Buyer's Choice Realty", "Seller's Advantage Realty", "Investor's Edge Realty", "Rental Solutions Realty", "Commercial Corner Realty",
+    "The Happy Home Hunters", "The Home Sweet Home Team", "The House Whisperers", "The Property Ninjas", "The Real Estate Wizards"
+]
+
+# Agents are only ever assigned to the first three agencies
+agency_choices = agency_names[:3]
+
+issue_descriptions = [
+    "Ant infestation in the kitchen",
+    "Cockroach infestation in the bathroom",
+    "Rodent infestation in the attic or basement",
+    "Bed bug infestation in the bedroom",
+    "Slow-draining bathtub",
+    "Leaky toilet tank",
+    "Water heater not heating water to the desired temperature",
+    "Clogged kitchen sink disposal",
+    "Water damage in the basement",
+    "Dimming lights in certain rooms",
+    "Frequent tripping of circuit breakers",
+    "Electrical outlets not working",
+    "Buzzing sound from electrical outlets",
+    "Flickering lights",
+    "Uneven heating or cooling in different rooms",
+    "High energy bills due to inefficient HVAC system",
+    "Strange noises coming from the HVAC unit",
+    "HVAC system not turning on or off as scheduled",
+    "Poor air quality due to inadequate ventilation",
+    "Refrigerator not cooling or freezing properly",
+    "Dishwasher not cleaning dishes effectively",
+    "Stove or oven not heating correctly",
+    "Washing machine not draining or spinning properly",
+    "Dryer not drying clothes efficiently",
+    "Broken or malfunctioning security system",
+    "Unauthorized access to the property",
+    "Suspicious activity in the neighborhood",
+    "Lost or stolen keys",
+    "Damaged or missing roof shingles",
+    "Leaky gutters or downspouts",
+    "Cracked or uneven driveway or walkway",
+    "Peeling paint on the exterior walls",
+    "Damaged or overgrown landscaping",
+    "Faulty outdoor lighting","Scratched or damaged flooring",
+    "Water stains on the ceiling or walls",
+    "Mold or mildew growth in damp areas",
+    "Squeaky floors or doors",
+    "Drafty windows or doors",
+    "Damaged or missing ceiling tiles",
+    "Loud noise from neighbors",
+    "Excessive noise from traffic or construction",
+    "Noise from pets or children",
+    "Vandalism or graffiti",
+    "Water damage from a leak or flood",
+    "Fire damage",
+    "Storm damage (e.g., wind, hail, lightning)",
+    "Accidental damage (e.g., broken windows, damaged walls)"
+]
+
+# Rows of the Features table
+features = [
+    (1, 'Swimming Pool', 'Exterior', 'Pool'),
+    (2, 'Garage', 'Exterior', 'Garage'),
+    (3, 'Fireplace', 'Interior', 'Fireplace'),
+    (4, 'Garden', 'Exterior', 'Garden'),
+    (5, 'Rooftop', 'Exterior', 'Rooftop'),
+    (6, 'Gym', 'Interior', 'Fitness'),
+    (7, 'Basement', 'Interior', 'Basement'),
+    (8, 'Elevator', 'Interior', 'Accessibility'),
+    (9, 'Balcony', 'Exterior', 'Balcony'),
+    (10, 'Solar Panels', 'Exterior', 'Energy'),
+    (11, 'Smart Home System', 'Technology', 'Smart Home'),
+    (12, 'Security System', 'Security', 'Security System'),
+    (13, 'Sauna', 'Interior', 'Wellness'),
+    (14, 'Jacuzzi', 'Interior', 'Wellness'),
+    (15, 'Home Theater', 'Interior', 'Entertainment'),
+    (16, 'Green Roof', 'Exterior', 'Rooftop'),
+    (17, 'Modern Kitchen', 'Interior', 'Kitchen'),
+    (18, 'Playground', 'Exterior', 'Recreation'),
+    (19, 'Tennis Court', 'Exterior', 'Recreation'),
+    (20, 'Central Air Conditioning', 'Interior', 'Climate Control'),
+    (21, 'Spacious Backyard', 'Exterior', 'Yard'),
+    (22, 'City View', 'Exterior', 'View'),
+    (23, 'Fire Alarm', 'Security', 'Safety'),
+    (24, 'Sprinkler System', 'Security', 'Safety'),
+    (25, 'Energy-Efficient Appliances', 'Energy Efficiency', 'Appliances'),
+    (26, 'Water-Efficient Fixtures', 'Energy Efficiency', 'Fixtures'),
+    (27, 'Golf Course', 'Exterior', 'Recreation'),
+    (28, 'Home Office', 'Interior', 'Room')
+]
+
+# Range of the number of features of a property
+min_features_per_property = 1
+max_features_per_property = 4
+
+property_types = ["Residential", "Commercial"]
+property_statuses = ["Owned", "Rented", "Available"]
+email_domains = ["gmail.com", "yahoo.com", "outlook.com"]
+open_maintenance_statuses = ["Pending", "In Progress"]
+
+payment_methods = ["Bank Transfer", "Credit Card", "Cash", "Mobile Payment"]
+completed_payment_notes = ["", "Paid early", "Discount applied"]
+pending_payment_notes = ["Payment delayed", "Awaiting confirmation", "Partial payment"]
+
+# Region code of a "City, ST 12345" locality -> approximate latitude and longitude of
+# its centre and the radius in km its cities are spread over. Covers the states,
+# territories and military postal regions faker's en_US addresses use.
+regions = {
+    "AL": (32.8, -86.8, 180), "AK": (63.6, -152.5, 600), "AZ": (34.3, -111.7, 250),
+    "AR": (34.9, -92.4, 170), "CA": (37.2, -119.5, 400), "CO": (39.0, -105.5, 220),
+    "CT": (41.6, -72.7, 50), "DE": (39.0, -75.5, 40), "DC": (38.9, -77.0, 8),
+    "FL": (28.6, -82.4, 300), "GA": (32.7, -83.4, 200), "HI": (20.8, -156.3, 150),
+    "ID": (44.4, -114.6, 250), "IL": (40.0, -89.2, 200), "IN": (39.9, -86.3, 150),
+    "IA": (42.1, -93.5, 180), "KS": (38.5, -98.4, 220), "KY": (37.5, -85.3, 180),
+    "LA": (31.1, -92.0, 170), "ME": (45.4, -69.2, 150), "MD": (39.0, -76.8, 80),
+    "MA": (42.3, -71.8, 80), "MI": (44.3, -85.4, 250), "MN": (46.3, -94.3, 250),
+    "MS": (32.7, -89.7, 170), "MO": (38.4, -92.5, 200), "MT": (47.0, -109.6, 300),
+    "NE": (41.5, -99.8, 220), "NV": (39.3, -116.6, 250), "NH": (43.7, -71.6, 70),
+    "NJ": (40.2, -74.7, 70), "NM": (34.4, -106.1, 250), "NY": (42.9, -75.5, 200),
+    "NC": (35.6, -79.4, 200), "ND": (47.5, -100.5, 200), "OH": (40.3, -82.8, 160),
+    "OK": (35.6, -97.5, 200), "OR": (43.9, -120.6, 250), "PA": (40.9, -77.8, 180),
+    "RI": (41.7, -71.5, 20), "SC": (33.9, -80.9, 140), "SD": (44.4, -100.2, 220),
+    "TN": (35.9, -86.4, 180), "TX": (31.5, -99.3, 450), "UT": (39.3, -111.7, 220),
+    "VT": (44.1, -72.7, 70), "VA": (37.5, -78.9, 200), "WA": (47.4, -120.5, 220),
+    "WV": (38.6, -80.6, 120), "WI": (44.6, -89.9, 200), "WY": (43.0, -107.6, 250),
+    "AS": (-14.3, -170.7, 15), "FM": (6.9, 158.2, 20), "GU": (13.4, 144.8, 15),
+    "MH": (7.1, 171.2, 15), "MP": (15.2, 145.7, 20), "PR": (18.2, -66.5, 50),
+    "PW": (7.5, 134.6, 15), "VI": (18.3, -64.9, 15),
+    # Armed Forces Americas, Europe and Pacific
+    "AA": (25.8, -80.3, 30), "AE": (49.4, 7.6, 100), "AP": (26.3, 127.8, 50),
+}
@@ -0,0 +1,133 @@
+import argparse
+import datetime
+import os
+import time
+
+from .export import NULL_PARTITION, partitioned_tables
+
+# Reader of the Parquet datasets written by the "parquet-dataset" export format.
+# Filters are pushed down twice: a date range becomes a filter on the year (and
+# month) partitions, so only the directories of those partitions are opened, and the
+# date, status and property filters are checked against the min/max statistics of
+# every row group, so row groups that cannot match are not read. What is left is
+# filtered row by row by Arrow.
+
+# Partition columns and their types
+PARTITION_TYPES = {"year": "int32", "month": "int32"}
+
+
+def _date_text(value):
+    return value.isoformat() if isinstance(value, datetime.date) else str(value)
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def open_dataset(path, table):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if table not in partitioned_tables:
+        return ds.dataset(os.path.join(path, f"{table}.parquet"), format="parquet")
+    _, levels, _ = partitioned_tables[table]
+    partitioning = ds.HivePartitioning(pa.schema([(level, PARTITION_TYPES[level]) for level in levels]), null_fallback=NULL_PARTITION)
+    return ds.dataset(os.path.join(path, table), format="parquet", partitioning=partitioning)
+
+
+# Partitions holding dates on or after (after=True) or on or before the 'YYYY-MM-DD' day
+def _partitions(levels, day, after):
+    import pyarrow.dataset as ds
+
+    year, month = int(day[:4]), int(day[5:7])
+    if "month" not in levels:
+        return ds.field("year") >= year if after else ds.field("year") <= year
+    later_year = ds.field("year") > year if after else ds.field("year") < year
+    month_of_year = ds.field("month") >= month if after else ds.field("month") <= month
+    return later_year | ((ds.field("year") == year) & month_of_year)
+
+
+# Filter expression of a table: dates from start to end (inclusive, 'YYYY-MM-DD' or
+# dates), statuses and property IDs (single values or lists). None leaves it open.
+# Date bounds are also set on the partitions, which prunes whole directories.
+def filter_expression(table, start=None, end=None, status=None, property_ids=None):
+    import pyarrow.dataset as ds
+
+    date_column, levels, _ = partitioned_tables.get(table, (None, [], None))
+    if (start is not None or end is not None) and date_column is None:
+        raise ValueError(f"{table} is not partitioned by date")
+    conditions = []
+    if start is not None:
+        day = _date_text(start)
+        conditions += [ds.field(date_column) >= day, _partitions(levels, day, after=True)]
+    if end is not None:
+        day = _date_text(end)
+        conditions += [ds.field(date_column) <= day, _partitions(levels, day, after=False)]
+    if status is not None:
+        conditions.append(ds.field("Status").isin(_as_list(status)))
+    if property_ids is not None:
+        conditions.append(ds.field("Property_ID").isin([int(value) for value in _as_list(property_ids)]))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+# Rows of `table` matching the filters (see filter_expression) as an Arrow table,
+# with only `columns` when given
+def scan(path, table, columns=None, **filters):
+    dataset = open_dataset(path, table)
+    expression = filter_expression(table, **filters)
+    columns = columns or [name for name in dataset.schema.names if name not in PARTITION_TYPES]
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+# Files and row groups a scan with these filters reads, against the totals:
+# (files read, files, row groups read, row groups)
+def pruning(path, table, **filters):
+    dataset = open_dataset(path, table)
+    expression = filter_expression(table, **filters)
+    files = row_groups = 0
+    read_files = read_row_groups = 0
+    for fragment in dataset.get_fragments():
+        files += 1
+        row_groups += fragment.num_row_groups
+    for fragment in dataset.get_fragments(filter=expression):
+        kept = fragment.subset(expression, schema=dataset.schema) if expression is not None else fragment
+        if kept.num_row_groups:
+            read_files += 1
+            read_row_groups += kept.num_row_groups
+    return read_files, files, read_row_groups, row_groups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read a partitioned Parquet export with date, status and property filters")
+    parser.add_argument("path", help="directory written by the parquet-dataset export")
+    parser.add_argument("table", choices=list(partitioned_tables))
+    parser.add_argument("--start", help="first date, YYYY-MM-DD")
+    parser.add_argument("--end", help="last date, YYYY-MM-DD")
+    parser.add_argument("--status", action="append", help="status to keep (repeatable)")
+    parser.add_argument("--property", dest="property_ids", action="append", type=int, help="Property_ID to keep (repeatable)")
+    parser.add_argument("--column", dest="columns", action="append", help="column to read (repeatable, default all)")
+    parser.add_argument("--limit", type=int, default=20, help="rows to print (0 prints all)")
+    args = parser.parse_args(argv)
+
+    filters = {"start": args.start, "end": args.end, "status": args.status, "property_ids": args.property_ids}
+    start = time.perf_counter()
+    result = scan(args.path, args.table, args.columns, **filters)
+    seconds = time.perf_counter() - start
+    read_files, files, read_row_groups, row_groups = pruning(args.path, args.table, **filters)
+
+    print("\t".join(result.column_names))
+    shown = result if args.limit == 0 else result.slice(0, args.limit)
+    for row in shown.to_pylist():
+        print("\t".join("" if value is None else str(value) for value in row.values()))
+    print(
+        f"{result.num_rows} rows in {seconds * 1000:.1f} ms, "
+        f"read {read_files} of {files} files and {read_row_groups} of {row_groups} row groups"
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
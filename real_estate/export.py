@@ -0,0 +1,284 @@
+import csv
+import os
+
+from . import schema
+from .columnar import ColumnTable
+from .instrument import disabled
+
+# Exporters stream a table out of SQLite in cursor batches, so memory use is bounded
+# by batch_size and not by the size of the table. write_rows also takes generated
+# ColumnTable chunks, which iterate as rows and go to Parquet without becoming rows.
+
+DEFAULT_BATCH_SIZE = 50_000
+
+# Excel's sheet limit, header row included
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_SHEET_NAME = 31
+
+
+# Arrow type for a column's declared SQLite type
+def _arrow_type(declared):
+    import pyarrow as pa
+
+    declared = declared.upper()
+    if "INT" in declared:
+        return pa.int64()
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return pa.float64()
+    return pa.string()
+
+
+# All tables go into one workbook. Tables longer than a sheet continue on sheets
+# named "Table (2)", "Table (3)", ...
+class ExcelExporter:
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+
+    def begin_table(self, table, columns, types):
+        self.table = table
+        self.columns = columns
+        self.part = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.part += 1
+        suffix = f" ({self.part})" if self.part > 1 else ""
+        title = self.table[:EXCEL_MAX_SHEET_NAME - len(suffix)] + suffix
+        self.sheet = self.workbook.create_sheet(title)
+        self.sheet.append(self.columns)
+        self.sheet_rows = 1
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self.sheet_rows == EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def end_table(self):
+        pass
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+# One CSV file per table in the directory `path`
+class CsvExporter:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def begin_table(self, table, columns, types):
+        self.file = open(os.path.join(self.path, f"{table}.csv"), "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def end_table(self):
+        self.file.close()
+
+    def close(self):
+        pass
+
+
+# One Parquet file per table in the directory `path`, one row group per batch
+class ParquetExporter:
+    def __init__(self, path):
+        import pyarrow  # noqa: F401 - fail early when the optional dependency is missing
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def begin_table(self, table, columns, types):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.schema = pa.schema([(name, _arrow_type(declared)) for name, declared in zip(columns, types)])
+        self.writer = pq.ParquetWriter(os.path.join(self.path, f"{table}.parquet"), self.schema)
+
+    # Arrow table of generated chunk or a batch of row tuples
+    def _arrow_table(self, rows):
+        import pyarrow as pa
+
+        if isinstance(rows, ColumnTable):
+            return rows.to_arrow(self.schema)
+        values = list(zip(*rows))
+        arrays = [pa.array(column, type=field.type) for column, field in zip(values, self.schema)]
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def write_rows(self, rows):
+        self.writer.write_table(self._arrow_table(rows))
+
+    def end_table(self):
+        self.writer.close()
+
+    def close(self):
+        pass
+
+
+# Like ParquetExporter, but the tables of `partitioned_tables` are written as Hive-style
+# partitioned datasets, a directory per table with a file per year (and month)
+# partition: Rent_Payments/year=2023/month=4/part-0.parquet. Partitions are sorted by
+# the table's sort columns and cut into row groups whose min/max statistics let a
+# reader skip the row groups of other statuses or properties (see dataset.py).
+#
+# Rows are buffered per partition, so they can arrive in any order; a partition is
+# written out, sorted, when its buffer is full, when the buffers of all partitions
+# together hold too many rows, or at the end of the table.
+class PartitionedParquetExporter(ParquetExporter):
+    def begin_table(self, table, columns, types):
+        import pyarrow as pa
+
+        if table not in partitioned_tables:
+            self.partitioned = False
+            super().begin_table(table, columns, types)
+            return
+        self.partitioned = True
+        self.table = table
+        self.schema = pa.schema([(name, _arrow_type(declared)) for name, declared in zip(columns, types)])
+        self.date_column, self.levels, self.sort_columns = partitioned_tables[table]
+        self.buffers = {}
+        self.buffered_rows = {}
+        self.writers = {}
+
+    def write_rows(self, rows):
+        if not self.partitioned:
+            super().write_rows(rows)
+            return
+        for key, part in split_partitions(self._arrow_table(rows), self.date_column, self.levels):
+            self.buffers.setdefault(key, []).append(part)
+            self.buffered_rows[key] = self.buffered_rows.get(key, 0) + len(part)
+            if self.buffered_rows[key] >= PARTITION_BUFFER_ROWS:
+                self._flush(key)
+        while sum(self.buffered_rows.values()) > MAX_BUFFERED_ROWS:
+            self._flush(max(self.buffered_rows, key=self.buffered_rows.get))
+
+    def _flush(self, key):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        part = pa.concat_tables(self.buffers.pop(key))
+        del self.buffered_rows[key]
+        part = part.sort_by([(column, "ascending") for column in self.sort_columns])
+        if key not in self.writers:
+            directory = os.path.join(self.path, self.table, *partition_path(self.levels, key))
+            os.makedirs(directory, exist_ok=True)
+            self.writers[key] = pq.ParquetWriter(os.path.join(directory, "part-0.parquet"), self.schema)
+        self.writers[key].write_table(part, row_group_size=PARTITION_ROW_GROUP_ROWS)
+
+    def end_table(self):
+        if not self.partitioned:
+            super().end_table()
+            return
+        for key in list(self.buffers):
+            self._flush(key)
+        for writer in self.writers.values():
+            writer.close()
+
+
+# Tables written as partitioned datasets: (date column partitioned on, partition levels,
+# sort columns within a partition)
+partitioned_tables = {
+    "Sales": ("Sale_Date", ["year"], ["Property_ID", "Sale_Date"]),
+    "Rentals": ("Start_Date", ["year"], ["Property_ID", "Start_Date"]),
+    "Rent_Payments": ("Payment_Date", ["year", "month"], ["Status", "Property_ID", "Payment_Date"]),
+}
+
+# Rows per row group of a partitioned dataset, rows buffered per partition before it
+# is written out and rows buffered over all partitions of a table
+PARTITION_ROW_GROUP_ROWS = 65_536
+PARTITION_BUFFER_ROWS = 1_048_576
+MAX_BUFFERED_ROWS = 4_194_304
+
+# Directory name of the partition of rows with a NULL date, as Hive names it
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+# Partition key of every row: year, or year * 100 + month; -1 for a NULL date
+def partition_keys(dates, levels):
+    import numpy as np
+    import pyarrow.compute as pc
+
+    year = pc.cast(pc.utf8_slice_codeunits(dates, 0, 4), "int32")
+    key = year if levels == ["year"] else pc.add(pc.multiply(year, 100), pc.cast(pc.utf8_slice_codeunits(dates, 5, 7), "int32"))
+    return np.asarray(pc.fill_null(key, -1))
+
+
+# (partition key, rows) of the partitions of an Arrow table
+def split_partitions(table, date_column, levels):
+    import numpy as np
+
+    keys = partition_keys(table.column(date_column), levels)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1, [len(keys)]])
+    table = table.take(order)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        yield int(keys[start]), table.slice(start, stop - start)
+
+
+# Directory names of a partition, as "level=value"
+def partition_path(levels, key):
+    if key < 0:
+        return [f"{level}={NULL_PARTITION}" for level in levels]
+    values = [key] if levels == ["year"] else [key // 100, key % 100]
+    return [f"{level}={value}" for level, value in zip(levels, values)]
+
+
+exporters = {
+    "xlsx": ExcelExporter,
+    "csv": CsvExporter,
+    "parquet": ParquetExporter,
+    "parquet-dataset": PartitionedParquetExporter,
+}
+
+
+# Declared column names and types of a table
+def table_columns(conn, table):
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return [row[1] for row in info], [row[2] for row in info]
+
+
+# Declared column names and types of a table of the schema, without a database
+def schema_columns(table):
+    types = schema.declared_types[table]
+    return list(types), list(types.values())
+
+
+def open_exporter(path, format):
+    if format not in exporters:
+        raise ValueError(f"Unknown export format {format!r}, expected one of {list(exporters)}")
+    return exporters[format](path)
+
+
+# Batches of rows of a table, in primary key order
+def read_batches(conn, table, batch_size=DEFAULT_BATCH_SIZE):
+    cursor = conn.execute(f"SELECT * FROM {table}")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+# Export tables to `path` in one of the formats of `exporters`. Returns the row count per table.
+def export_database(conn, path, format="xlsx", tables=None, batch_size=DEFAULT_BATCH_SIZE, instrumentation=None):
+    exporter = open_exporter(path, format)
+    counts = {}
+    for table in tables or list(schema.tables):
+        with (instrumentation or disabled).phase(f"export:{table}", table) as phase:
+            columns, types = table_columns(conn, table)
+            exporter.begin_table(table, columns, types)
+            counts[table] = 0
+            for rows in read_batches(conn, table, batch_size):
+                exporter.write_rows(rows)
+                counts[table] += len(rows)
+            exporter.end_table()
+            phase.rows = counts[table]
+    exporter.close()
+    return counts
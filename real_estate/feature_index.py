@@ -0,0 +1,269 @@
+import argparse
+import sqlite3
+import time
+
+import numpy as np
+
+from .columnar import Categorical
+from .spec import equals
+
+# Feature-set index. Every property's features are stored as one packed bitmask, bit
+# Feature_ID - 1 set for each feature it has, in Property_Feature_Masks. The table is
+# filled with one GROUP BY pass over Property_Features when installed and afterwards
+# kept current by triggers, like the report summaries.
+#
+# FeatureIndex loads the masks next to the filterable Properties columns into numpy
+# arrays, so "Residential, Available, under $500k, with Swimming Pool AND Garage AND
+# NOT Elevator" is answered with a few vectorised comparisons and bitwise ANDs over
+# compact arrays instead of one self-join of Property_Features per feature.
+
+MASK_TABLE = "Property_Feature_Masks"
+
+# Features are bits of a signed 64-bit SQLite integer
+MAX_FEATURE_ID = 63
+
+# Properties columns that can be filtered by a (low, high) range
+RANGE_COLUMNS = ["Price", "Size", "Year_Built", "Bedrooms", "Bathrooms"]
+
+# Rows read from SQLite per batch when loading the index
+FETCH_ROWS = 100_000
+
+
+def _bit(row):
+    return f"(1 << ({row}.Feature_ID - 1))"
+
+
+def create_sql():
+    return f"CREATE TABLE {MASK_TABLE} (\n    Property_ID INTEGER PRIMARY KEY,\n    Mask INTEGER NOT NULL DEFAULT 0\n)"
+
+
+# Masks of the whole Property_Features table; a feature listed twice is one bit
+def fill_sql():
+    return (
+        f"INSERT INTO {MASK_TABLE} (Property_ID, Mask)\n"
+        f"SELECT Property_ID, sum(DISTINCT {_bit('Property_Features')})\n"
+        f"FROM Property_Features\nWHERE Feature_ID BETWEEN 1 AND {MAX_FEATURE_ID}\nGROUP BY Property_ID"
+    )
+
+
+def _set_sql(row):
+    return (
+        f"INSERT INTO {MASK_TABLE} (Property_ID, Mask) VALUES ({row}.Property_ID, {_bit(row)})\n"
+        f"    ON CONFLICT (Property_ID) DO UPDATE SET Mask = Mask | excluded.Mask;"
+    )
+
+
+# The feature stays set while another Property_Features row still lists it
+def _clear_sql(row):
+    return (
+        f"UPDATE {MASK_TABLE} SET Mask = Mask & ~{_bit(row)}\n"
+        f"    WHERE Property_ID = {row}.Property_ID AND NOT EXISTS (\n"
+        f"        SELECT 1 FROM Property_Features WHERE Property_ID = {row}.Property_ID AND Feature_ID = {row}.Feature_ID);"
+    )
+
+
+def trigger_sql():
+    guard = f"WHEN {{row}}.Feature_ID BETWEEN 1 AND {MAX_FEATURE_ID}"
+    return {
+        f"{MASK_TABLE}_Insert": (
+            f"CREATE TRIGGER {MASK_TABLE}_Insert AFTER INSERT ON Property_Features {guard.format(row='NEW')} BEGIN\n"
+            f"{_set_sql('NEW')}\nEND"
+        ),
+        f"{MASK_TABLE}_Delete": (
+            f"CREATE TRIGGER {MASK_TABLE}_Delete AFTER DELETE ON Property_Features {guard.format(row='OLD')} BEGIN\n"
+            f"{_clear_sql('OLD')}\nEND"
+        ),
+        f"{MASK_TABLE}_Update": (
+            f"CREATE TRIGGER {MASK_TABLE}_Update AFTER UPDATE ON Property_Features BEGIN\n"
+            f"{_clear_sql('OLD')}\n{_set_sql('NEW')}\nEND"
+        ),
+    }
+
+
+def installed(conn):
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    return MASK_TABLE in names and set(trigger_sql()) <= names
+
+
+# (Re)build the mask table from Property_Features and install the triggers that keep
+# it current. Returns the seconds it took.
+def install(conn):
+    start = time.perf_counter()
+    with conn:
+        for trigger in trigger_sql():
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.execute(f"DROP TABLE IF EXISTS {MASK_TABLE}")
+        conn.execute(create_sql())
+        conn.execute(fill_sql())
+        for statement in trigger_sql().values():
+            conn.execute(statement)
+    return time.perf_counter() - start
+
+
+# Smallest unsigned integer type that holds a mask of `bits` features
+def _mask_type(bits):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if bits <= np.iinfo(dtype).bits:
+            return dtype
+    return np.uint64
+
+
+class FeatureIndex:
+    def __init__(self, property_ids, masks, types, statuses, ranges, features):
+        self.property_ids = property_ids
+        self.masks = masks
+        self.types = types
+        self.statuses = statuses
+        self.ranges = ranges
+        # Feature_Description -> Feature_ID
+        self.features = features
+
+    # Every property with its mask (0 without features) and filterable columns
+    @classmethod
+    def load(cls, conn):
+        if not installed(conn):
+            raise ValueError(f"No {MASK_TABLE} in this database, run feature_index.install first")
+        features = dict(conn.execute(f"SELECT Feature_Description, Feature_ID FROM Features WHERE Feature_ID BETWEEN 1 AND {MAX_FEATURE_ID}"))
+        mask_type = _mask_type(max(features.values(), default=1))
+        count = conn.execute("SELECT count(*) FROM Properties").fetchone()[0]
+
+        property_ids = np.empty(count, dtype=np.int64)
+        masks = np.empty(count, dtype=mask_type)
+        ranges = {name: np.empty(count, dtype=np.float64) for name in RANGE_COLUMNS}
+        type_codes, status_codes = np.empty(count, dtype=np.int32), np.empty(count, dtype=np.int32)
+        type_categories, status_categories = {}, {}
+
+        cursor = conn.execute(
+            f"SELECT p.Property_ID, coalesce(m.Mask, 0), p.Type, p.Status, {', '.join('p.' + name for name in RANGE_COLUMNS)}\n"
+            f"FROM Properties p LEFT JOIN {MASK_TABLE} m ON m.Property_ID = p.Property_ID\n"
+            f"ORDER BY p.Property_ID"
+        )
+        start = 0
+        while True:
+            rows = cursor.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            stop = start + len(rows)
+            columns = list(zip(*rows))
+            property_ids[start:stop] = columns[0]
+            masks[start:stop] = columns[1]
+            type_codes[start:stop] = [-1 if value is None else type_categories.setdefault(value, len(type_categories)) for value in columns[2]]
+            status_codes[start:stop] = [-1 if value is None else status_categories.setdefault(value, len(status_categories)) for value in columns[3]]
+            for name, values in zip(RANGE_COLUMNS, columns[4:]):
+                ranges[name][start:stop] = np.array(values, dtype=np.float64)
+            start = stop
+
+        types = Categorical(type_codes, list(type_categories))
+        statuses = Categorical(status_codes, list(status_categories))
+        return cls(property_ids, masks, types, statuses, ranges, features)
+
+    def __len__(self):
+        return len(self.property_ids)
+
+    # Bitmask of features given by Feature_ID or Feature_Description
+    def mask(self, features):
+        mask = 0
+        for feature in features:
+            if isinstance(feature, str):
+                if feature not in self.features:
+                    raise ValueError(f"Unknown feature {feature!r}")
+                feature = self.features[feature]
+            elif feature not in self.features.values():
+                raise ValueError(f"Unknown Feature_ID {feature}")
+            mask |= 1 << (feature - 1)
+        return self.masks.dtype.type(mask)
+
+    # Boolean array of the properties that have every feature of `all_features`, at
+    # least one of `any_features`, none of `no_features`, the given Type and Status and
+    # every range column within its (low, high) bounds, given as lowercase keywords
+    # (price=(None, 500000)); a None bound is open, NULL values never match a bound.
+    def matches(self, all_features=(), any_features=(), no_features=(), type=None, status=None, **ranges):
+        selected = np.ones(len(self), dtype=bool)
+        if all_features:
+            required = self.mask(all_features)
+            selected &= (self.masks & required) == required
+        if any_features:
+            selected &= (self.masks & self.mask(any_features)) != 0
+        if no_features:
+            selected &= (self.masks & self.mask(no_features)) == 0
+        if type is not None:
+            selected &= equals(self.types, type)
+        if status is not None:
+            selected &= equals(self.statuses, status)
+
+        columns = {name.lower(): name for name in RANGE_COLUMNS}
+        for key, (low, high) in ranges.items():
+            if key not in columns:
+                raise ValueError(f"Unknown range {key!r}, expected one of {list(columns)}")
+            values = self.ranges[columns[key]]
+            if low is not None:
+                selected &= values >= low
+            if high is not None:
+                selected &= values <= high
+        return selected
+
+    # Property_IDs of the matching properties, in ID order
+    def search(self, *args, **kwargs):
+        return self.property_ids[self.matches(*args, **kwargs)]
+
+    def count(self, *args, **kwargs):
+        return int(np.count_nonzero(self.matches(*args, **kwargs)))
+
+
+# Load the index of an open database and search it once
+def search(conn, *args, **kwargs):
+    return FeatureIndex.load(conn).search(*args, **kwargs)
+
+
+# Features are given on the command line by description or by ID
+def _feature(text):
+    return int(text) if text.isdigit() else text
+
+
+def _bounds(low, high):
+    return (low, high) if low is not None or high is not None else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search properties by features, type, status and numeric ranges")
+    parser.add_argument("db")
+    parser.add_argument("--with", dest="all_features", action="append", default=[], metavar="FEATURE", help="required feature (repeatable)")
+    parser.add_argument("--any", dest="any_features", action="append", default=[], metavar="FEATURE", help="at least one of these features (repeatable)")
+    parser.add_argument("--without", dest="no_features", action="append", default=[], metavar="FEATURE", help="excluded feature (repeatable)")
+    parser.add_argument("--type")
+    parser.add_argument("--status")
+    for name in RANGE_COLUMNS:
+        option = name.lower().replace("_", "-")
+        parser.add_argument(f"--min-{option}", type=float)
+        parser.add_argument(f"--max-{option}", type=float)
+    parser.add_argument("--limit", type=int, default=20, help="IDs to print (0 prints all)")
+    args = parser.parse_args(argv)
+
+    all_features, any_features, no_features = (
+        [_feature(text) for text in features] for features in (args.all_features, args.any_features, args.no_features)
+    )
+    ranges = {}
+    for name in RANGE_COLUMNS:
+        key = name.lower()
+        bounds = _bounds(getattr(args, f"min_{key}"), getattr(args, f"max_{key}"))
+        if bounds:
+            ranges[key] = bounds
+
+    conn = sqlite3.connect(args.db)
+    try:
+        start = time.perf_counter()
+        index = FeatureIndex.load(conn)
+        loaded = time.perf_counter() - start
+    finally:
+        conn.close()
+
+    start = time.perf_counter()
+    property_ids = index.search(all_features, any_features, no_features, args.type, args.status, **ranges)
+    searched = time.perf_counter() - start
+    shown = property_ids if args.limit == 0 else property_ids[:args.limit]
+    print(" ".join(str(property_id) for property_id in shown))
+    print(f"{len(property_ids)} of {len(index)} properties (index loaded in {loaded:.3f}s, searched in {searched * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,254 @@
+import argparse
+import math
+import sqlite3
+import time
+
+# Spatial search over the Latitude/Longitude of Properties, Owners and Tenants. Each
+# table has an R*Tree (SQLite's rtree virtual table) of its points, filled in one
+# pass when installed and afterwards kept current by triggers, like the report
+# summaries. Bounding-box queries are answered by the R*Tree; radius queries search
+# the bounding box of the circle and keep the rows within the great-circle distance;
+# k-nearest queries find the smallest box holding k rows and search the circle
+# around it. Results are the rows of the table itself, nearest first for radius and
+# k-nearest queries.
+#
+# Boxes do not wrap around the antimeridian, so a search near longitude +-180 does
+# not see points on the other side of it.
+
+# R*Tree table -> (table of the points, key column)
+locations = {
+    "Property_Locations": ("Properties", "Property_ID"),
+    "Owner_Locations": ("Owners", "Owner_ID"),
+    "Tenant_Locations": ("Tenants", "Tenant_ID"),
+}
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Half the earth's circumference, the largest distance between two points
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+# First box radius of a k-nearest search, the factor it grows by and the bisection
+# steps narrowing it down
+NEAREST_START_KM = 1.0
+NEAREST_GROWTH = 4.0
+NEAREST_BISECTIONS = 6
+
+
+def _rtree(table):
+    for name, (source, _) in locations.items():
+        if source == table:
+            return name
+    raise ValueError(f"No spatial index on {table!r}, expected one of {[source for source, _ in locations.values()]}")
+
+
+def create_sql(name):
+    _, key = locations[name]
+    return f"CREATE VIRTUAL TABLE {name} USING rtree({key}, Min_Lat, Max_Lat, Min_Lon, Max_Lon)"
+
+
+def fill_sql(name):
+    source, key = locations[name]
+    return (
+        f"INSERT INTO {name} ({key}, Min_Lat, Max_Lat, Min_Lon, Max_Lon)\n"
+        f"SELECT {key}, Latitude, Latitude, Longitude, Longitude\nFROM {source}\n"
+        f"WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL"
+    )
+
+
+def _add_sql(name, row):
+    _, key = locations[name]
+    return (
+        f"INSERT INTO {name} ({key}, Min_Lat, Max_Lat, Min_Lon, Max_Lon)\n"
+        f"    SELECT {row}.{key}, {row}.Latitude, {row}.Latitude, {row}.Longitude, {row}.Longitude\n"
+        f"    WHERE {row}.Latitude IS NOT NULL AND {row}.Longitude IS NOT NULL;"
+    )
+
+
+def _remove_sql(name, row):
+    _, key = locations[name]
+    return f"DELETE FROM {name} WHERE {key} = {row}.{key};"
+
+
+def trigger_sql(name):
+    source, key = locations[name]
+    return {
+        f"{name}_Insert": f"CREATE TRIGGER {name}_Insert AFTER INSERT ON {source} BEGIN\n{_add_sql(name, 'NEW')}\nEND",
+        f"{name}_Delete": f"CREATE TRIGGER {name}_Delete AFTER DELETE ON {source} BEGIN\n{_remove_sql(name, 'OLD')}\nEND",
+        f"{name}_Update": (
+            f"CREATE TRIGGER {name}_Update AFTER UPDATE OF {key}, Latitude, Longitude ON {source} BEGIN\n"
+            f"{_remove_sql(name, 'OLD')}\n{_add_sql(name, 'NEW')}\nEND"
+        ),
+    }
+
+
+def installed(conn):
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    return all(name in names and set(trigger_sql(name)) <= names for name in locations)
+
+
+# (Re)build every R*Tree from its table and install the triggers that keep it
+# current. Returns the seconds it took.
+def install(conn):
+    start = time.perf_counter()
+    with conn:
+        for name in locations:
+            for trigger in trigger_sql(name):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute(create_sql(name))
+            conn.execute(fill_sql(name))
+            for statement in trigger_sql(name).values():
+                conn.execute(statement)
+    return time.perf_counter() - start
+
+
+# Great-circle (haversine) distance in km
+def distance_km(lat1, lon1, lat2, lon2):
+    if lat2 is None or lon2 is None:
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# (min_lat, max_lat, min_lon, max_lon) of the smallest box around a circle of radius
+# km; it spans every longitude once the circle reaches a pole
+def bounding_box(lat, lon, km):
+    angle = km / EARTH_RADIUS_KM
+    min_lat, max_lat = lat - math.degrees(angle), lat + math.degrees(angle)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(-90.0, min_lat), min(90.0, max_lat), -180.0, 180.0
+    dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+    return min_lat, max_lat, max(-180.0, lon - dlon), min(180.0, lon + dlon)
+
+
+# Rows of `table` in the box. The R*Tree stores 32-bit floats rounded outwards, so
+# the box is checked again against the exact coordinates of the table.
+def _box_sql(table, columns="t.*"):
+    source, key = locations[_rtree(table)]
+    return (
+        f"SELECT {columns}\nFROM {_rtree(table)} r\nJOIN {source} t ON t.{key} = r.{key}\n"
+        f"WHERE r.Max_Lat >= :min_lat AND r.Min_Lat <= :max_lat AND r.Max_Lon >= :min_lon AND r.Min_Lon <= :max_lon\n"
+        f"    AND t.Latitude BETWEEN :min_lat AND :max_lat AND t.Longitude BETWEEN :min_lon AND :max_lon"
+    )
+
+
+def _box_params(min_lat, max_lat, min_lon, max_lon):
+    return {"min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon}
+
+
+def _result(cursor):
+    return [column[0] for column in cursor.description], cursor.fetchall()
+
+
+# Column names and rows of `table` within the bounding box, in key order
+def within_box(conn, min_lat, max_lat, min_lon, max_lon, table="Properties", limit=None):
+    _, key = locations[_rtree(table)]
+    sql = _box_sql(table) + f"\nORDER BY t.{key}"
+    params = _box_params(min_lat, max_lat, min_lon, max_lon)
+    if limit is not None:
+        sql += "\nLIMIT :limit"
+        params["limit"] = limit
+    return _result(conn.execute(sql, params))
+
+
+# Column names and rows of `table` within km of (lat, lon), nearest first (ties in key
+# order), with their distance as a last Distance_Km column
+def within_radius(conn, lat, lon, km, table="Properties", limit=None):
+    conn.create_function("distance_km", 4, distance_km, deterministic=True)
+    _, key = locations[_rtree(table)]
+    sql = (
+        f"SELECT * FROM (\n{_box_sql(table, 't.*, distance_km(:lat, :lon, t.Latitude, t.Longitude) AS Distance_Km')}\n)\n"
+        f"WHERE Distance_Km <= :km\nORDER BY Distance_Km, {key}"
+    )
+    params = {"lat": lat, "lon": lon, "km": km, **_box_params(*bounding_box(lat, lon, km))}
+    if limit is not None:
+        sql += "\nLIMIT :limit"
+        params["limit"] = limit
+    return _result(conn.execute(sql, params))
+
+
+# Whether the box around a circle of radius km holds at least k points of `table`;
+# cheap, since the R*Tree stops at the k-th point
+def _box_holds(conn, table, lat, lon, km, k):
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, km)
+    sql = (
+        f"SELECT count(*) FROM (SELECT 1 FROM {_rtree(table)}\n"
+        f"    WHERE Max_Lat >= ? AND Min_Lat <= ? AND Max_Lon >= ? AND Min_Lon <= ? LIMIT ?)"
+    )
+    return conn.execute(sql, (min_lat, max_lat, min_lon, max_lon, k)).fetchone()[0] >= k
+
+
+# Distance to the farthest point of the box around a circle of radius km, which is
+# one of its corners
+def _box_reach(lat, lon, km):
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, km)
+    if max_lon - min_lon >= 360.0:
+        return MAX_DISTANCE_KM
+    return max(distance_km(lat, lon, corner_lat, corner_lon) for corner_lat in (min_lat, max_lat) for corner_lon in (min_lon, max_lon))
+
+
+# Column names and the k rows of `table` nearest to (lat, lon), nearest first, with
+# their distance as a last Distance_Km column. The smallest box holding k points is
+# found with cheap R*Tree probes: the box grows until it holds them and is then
+# narrowed by bisection. The k-th smallest distance to the points of that box bounds
+# the distance of the k nearest, so a radius query to it finds them while reading
+# not many more rows than the box holds, wherever the dense areas are.
+def nearest(conn, lat, lon, k, table="Properties"):
+    low, high = 0.0, NEAREST_START_KM
+    while high < MAX_DISTANCE_KM and not _box_holds(conn, table, lat, lon, high, k):
+        low, high = high, min(MAX_DISTANCE_KM, high * NEAREST_GROWTH)
+    for _ in range(NEAREST_BISECTIONS):
+        middle = (low + high) / 2
+        if _box_holds(conn, table, lat, lon, middle, k):
+            high = middle
+        else:
+            low = middle
+
+    points = conn.execute(_box_sql(table, "t.Latitude, t.Longitude"), _box_params(*bounding_box(lat, lon, high))).fetchall()
+    if len(points) >= k:
+        km = sorted(distance_km(lat, lon, point_lat, point_lon) for point_lat, point_lon in points)[k - 1]
+    else:
+        # The R*Tree rounds outwards, so the box may have counted points just outside
+        # it; its farthest corner still bounds the distance of those it holds
+        km = _box_reach(lat, lon, high)
+    while True:
+        columns, rows = within_radius(conn, lat, lon, km, table, limit=k)
+        if len(rows) >= k or km >= MAX_DISTANCE_KM:
+            return columns, rows
+        km = min(MAX_DISTANCE_KM, km * 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search properties, owners or tenants by location")
+    parser.add_argument("db")
+    parser.add_argument("--table", default="Properties", choices=[source for source, _ in locations.values()])
+    searches = parser.add_mutually_exclusive_group(required=True)
+    searches.add_argument("--box", nargs=4, type=float, metavar=("MIN_LAT", "MAX_LAT", "MIN_LON", "MAX_LON"))
+    searches.add_argument("--radius", nargs=3, type=float, metavar=("LAT", "LON", "KM"))
+    searches.add_argument("--nearest", nargs=3, type=float, metavar=("LAT", "LON", "K"))
+    parser.add_argument("--limit", type=int, help="rows to return from a box or radius search")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        start = time.perf_counter()
+        if args.box:
+            columns, rows = within_box(conn, *args.box, table=args.table, limit=args.limit)
+        elif args.radius:
+            columns, rows = within_radius(conn, *args.radius, table=args.table, limit=args.limit)
+        else:
+            lat, lon, k = args.nearest
+            columns, rows = nearest(conn, lat, lon, int(k), args.table)
+        seconds = time.perf_counter() - start
+    finally:
+        conn.close()
+
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if value is None else str(value) for value in row))
+    print(f"{len(rows)} rows in {seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
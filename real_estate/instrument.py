@@ -0,0 +1,305 @@
+import argparse
+import io
+import json
+import os
+import re
+import resource
+import sys
+import threading
+import time
+
+# Instrumentation of a run. The build, the pipeline and the exporter mark their phases
+# (pool build, the load of every table, index build, every derived structure, the
+# export of every table) and the chunks they insert; every mark becomes a structured
+# event passed to the hooks:
+#
+#   {"event": "start" | "chunk" | "end" | "profile", "phase": "load:Sales", "rows": ...,
+#    "seconds": ..., "rows_per_sec": ..., "rss_bytes": ..., "peak_rss_bytes": ...,
+#    "queues": {"insert": 3, "export": 0}, "thread": "write", "time": ...}
+#
+# A hook is any callable taking the event dict. Events cost a few microseconds each
+# and there is one per chunk, so instrumentation can stay on in production runs.
+# Without hooks nothing is built at all. One phase can also be profiled, with cProfile
+# (the thread running the phase) or tracemalloc (allocations of the whole process
+# while the phase runs); the profile is written to a file and summarised in a
+# "profile" event. Phases are context managers, so a phase that raises still ends,
+# with an "error" field, and stops its profiler; close() (or leaving a `with` block)
+# stops profilers left running by stages that were aborted and closes event logs.
+
+PROFILERS = ["cprofile", "tracemalloc"]
+
+# Functions or allocation sites listed in a profile event
+PROFILE_TOP = 10
+
+_page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+# Current resident set size in bytes (0 where /proc is missing)
+def resident_bytes():
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _page_size
+    except OSError:
+        return 0
+
+
+# Peak resident set size of the process so far, in bytes
+def peak_resident_bytes():
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _rows_per_sec(rows, seconds):
+    return rows / seconds if seconds else 0.0
+
+
+# A phase being measured; end() it with the rows it produced (or set .rows on the way).
+# As a context manager it ends on leaving the block unless end() was called.
+class Span:
+    def __init__(self, instrumentation, name, table):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.table = table
+        self.rows = 0
+        self.seconds = None
+        self.profiler = instrumentation._start_profile(name)
+        self.start = time.perf_counter()
+
+    def chunk(self, rows, **fields):
+        self.instrumentation.emit("chunk", self.name, self.table, rows=rows, **fields)
+
+    def end(self, rows=None, **fields):
+        self.seconds = time.perf_counter() - self.start
+        if rows is not None:
+            self.rows = rows
+        if self.profiler is not None:
+            profiler, self.profiler = self.profiler, None
+            self.instrumentation._stop_profile(self.name, profiler)
+        self.instrumentation.emit(
+            "end", self.name, self.table, rows=self.rows, seconds=self.seconds, rows_per_sec=_rows_per_sec(self.rows, self.seconds), **fields
+        )
+        return self.seconds
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.seconds is None:
+            if exc_type is not None:
+                self.end(error=repr(exc))
+            else:
+                self.end()
+        return False
+
+
+class Instrumentation:
+    # hooks: callables receiving every event. profile: name of the phase to profile
+    # (matched exactly, or a prefix ending in ':' such as "load:"), with `profiler`
+    # ("cprofile" or "tracemalloc"), written to profile_output.
+    def __init__(self, hooks=(), profile=None, profiler="cprofile", profile_output=None):
+        if profiler not in PROFILERS:
+            raise ValueError(f"profiler must be one of {PROFILERS}, got {profiler!r}")
+        self.hooks = list(hooks)
+        self.profile = profile
+        self.profiler = profiler
+        self.profile_output = profile_output
+        # Queue name -> callable returning its depth, sampled into every event
+        self.queues = {}
+        # Profilers running, and the event logs to close
+        self._profiling = []
+        self._streams = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.hooks)
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def watch_queue(self, name, queue):
+        self.queues[name] = queue.qsize
+
+    # Write every event as a line of JSON to the file at `path` ("-" for stderr),
+    # closed by close()
+    def log_events(self, path):
+        if path == "-":
+            stream = sys.stderr
+        else:
+            stream = open(path, "w")
+            self._streams.append(stream)
+        self.add_hook(json_lines(stream))
+
+    # Stop the profilers of phases that never ended and close the event logs
+    def close(self):
+        for profiler in self._profiling:
+            if self.profiler == "cprofile":
+                profiler.disable()
+            else:
+                profiler.stop()
+        self._profiling.clear()
+        for stream in self._streams:
+            stream.close()
+        self._streams.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def emit(self, kind, phase, table=None, **fields):
+        if not self.hooks:
+            return
+        event = {"event": kind, "phase": phase, "time": time.time(), "thread": threading.current_thread().name}
+        if table is not None:
+            event["table"] = table
+        event.update(fields)
+        if kind != "profile":
+            event["rss_bytes"] = resident_bytes()
+            event["peak_rss_bytes"] = peak_resident_bytes()
+            if self.queues:
+                event["queues"] = {name: depth() for name, depth in self.queues.items()}
+        # Stages on other threads emit too; hooks see one event at a time
+        with self._lock:
+            for hook in self.hooks:
+                hook(event)
+
+    # Start measuring a phase; usable as a context manager
+    def phase(self, name, table=None):
+        self.emit("start", name, table)
+        return Span(self, name, table)
+
+    def _profiled(self, name):
+        return self.profile is not None and (name == self.profile or self.profile.endswith(":") and name.startswith(self.profile))
+
+    def _start_profile(self, name):
+        if not self._profiled(name):
+            return None
+        if self.profiler == "cprofile":
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            import tracemalloc
+
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            profiler = tracemalloc
+        self._profiling.append(profiler)
+        return profiler
+
+    # profile_output, or profile-<phase>.<extension> for each phase of a prefix
+    def _profile_path(self, name):
+        if self.profile_output and not self.profile.endswith(":"):
+            return self.profile_output
+        stem = self.profile_output or "profile"
+        return f"{stem}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.{'prof' if self.profiler == 'cprofile' else 'tracemalloc'}"
+
+    def _stop_profile(self, name, profiler):
+        self._profiling.remove(profiler)
+        path = self._profile_path(name)
+        if self.profiler == "cprofile":
+            import pstats
+
+            profiler.disable()
+            profiler.dump_stats(path)
+            stats = pstats.Stats(profiler, stream=io.StringIO())
+            top = [
+                {"function": f"{filename}:{line}({function})", "calls": calls, "seconds": cumulative}
+                for (filename, line, function), (_, calls, _, cumulative, _) in sorted(
+                    stats.stats.items(), key=lambda item: item[1][3], reverse=True
+                )[:PROFILE_TOP]
+            ]
+            self.emit("profile", name, profiler="cprofile", path=path, top=top)
+        else:
+            try:
+                snapshot = profiler.take_snapshot()
+                _, peak = profiler.get_traced_memory()
+            finally:
+                profiler.stop()
+            snapshot.dump(path)
+            top = [
+                {"location": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:PROFILE_TOP]
+            ]
+            self.emit("profile", name, profiler="tracemalloc", path=path, peak_traced_bytes=peak, top=top)
+
+
+# Instrumentation without hooks, used when none is given
+disabled = Instrumentation()
+
+
+# Hook writing every event as a line of JSON
+def json_lines(stream):
+    def hook(event):
+        stream.write(json.dumps(event) + "\n")
+        stream.flush()
+
+    return hook
+
+
+# Hook printing a progress line for every finished phase (and every chunk with
+# chunks=True)
+def progress(stream=None, chunks=False):
+    def hook(event):
+        kind = event["event"]
+        if kind == "end" or kind == "chunk" and chunks:
+            queues = "".join(f"  {name} queue {depth}" for name, depth in event.get("queues", {}).items())
+            seconds = f"{event['seconds']:>9.2f}s {event['rows_per_sec']:>12,.0f} rows/s" if kind == "end" else f"{'':>31}"
+            print(
+                f"{event['phase']:<32} {event['rows']:>12,} rows {seconds} {event['rss_bytes'] / 2**20:>9.1f} MB{queues}",
+                file=stream or sys.stderr,
+            )
+        elif kind == "profile":
+            print(f"{event['phase']:<32} {event['profiler']} profile written to {event['path']}", file=stream or sys.stderr)
+
+    return hook
+
+
+# Instrumentation configured from command line options (see add_arguments); close it
+# when the run is over
+def from_args(args):
+    instrumentation = Instrumentation([progress()] if args.progress else [], args.profile, args.profiler, args.profile_output)
+    if args.events:
+        instrumentation.log_events(args.events)
+    return instrumentation
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--events", metavar="PATH", help="write phase and chunk events as JSON lines to PATH ('-' for stderr)")
+    group.add_argument("--progress", action="store_true", help="print every finished phase to stderr")
+    group.add_argument("--profile", metavar="PHASE", help="profile this phase, e.g. indexes, load:Rent_Payments or load: for every table")
+    group.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    group.add_argument("--profile-output", metavar="PATH", help="profile file (default profile-<phase>.prof or .tracemalloc; the stem of the files of a prefix)")
+
+
+# Summary of a JSON-lines event log: rows, seconds, rows/sec and the largest resident
+# set of every phase
+def summarize(events):
+    phases = {}
+    for event in events:
+        if event["event"] == "end":
+            phases[event["phase"]] = event
+    lines = []
+    for name, event in phases.items():
+        lines.append(
+            f"{name:<32} {event['rows']:>12,} rows {event['seconds']:>9.2f}s "
+            f"{event['rows_per_sec']:>12,.0f} rows/s {event['peak_rss_bytes'] / 2**20:>9.1f} MB peak"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise an event log written with --events")
+    parser.add_argument("events", help="JSON-lines event log")
+    args = parser.parse_args(argv)
+    with open(args.events) as f:
+        print(summarize(json.loads(line) for line in f if line.strip()))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from . import schema
+from .instrument import disabled
+
+# What to do with tables that already exist in the target database
+IF_EXISTS_MODES = ["fail", "drop", "replace", "append"]
+
+# Rows inserted per explicit transaction during a load
+DEFAULT_TRANSACTION_ROWS = 1_000_000
+
+# Settings for loading into a new database nobody else is using (a fresh file, the
+# temporary file of a replace, or memory). Nothing is journaled or synced until the
+# load is done, so a crash mid-load leaves a database to throw away. Loads into a
+# database that already holds something keep its own journal and sync settings, so
+# a crash or rollback cannot corrupt the data that was there.
+BULK_PRAGMAS = [
+    ("page_size", 16384),  # Only takes effect while the database file is still empty
+    ("journal_mode", "OFF"),
+    ("synchronous", "OFF"),
+    ("cache_size", -262144),  # 256 MiB
+    ("locking_mode", "EXCLUSIVE"),
+]
+
+# Settings restored once a bulk load has finished
+DEFAULT_PRAGMAS = [
+    ("journal_mode", "DELETE"),
+    ("synchronous", "FULL"),
+    ("locking_mode", "NORMAL"),
+]
+
+
+def set_pragmas(conn, pragmas):
+    for name, value in pragmas:
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+# Whether the database has no schema yet, so nothing in it can be lost to a crash
+def is_new_database(conn):
+    return conn.execute("SELECT count(*) FROM sqlite_master").fetchone()[0] == 0
+
+
+def existing_tables(conn):
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [table for table in schema.tables if table in names]
+
+
+# Make the database ready for a load according to if_exists. "replace" is handled by
+# the caller by loading into a fresh file; on a connection it behaves like "drop".
+def prepare_tables(conn, if_exists):
+    if if_exists not in IF_EXISTS_MODES:
+        raise ValueError(f"if_exists must be one of {IF_EXISTS_MODES}, got {if_exists!r}")
+
+    existing = existing_tables(conn)
+    if existing and if_exists == "fail":
+        raise ValueError(f"Tables already exist: {', '.join(existing)} (use if_exists='drop', 'replace' or 'append')")
+    if if_exists in ("drop", "replace"):
+        for table in existing:
+            conn.execute(f"DROP TABLE {table}")
+
+    for table in schema.tables:
+        conn.execute(schema.tables[table])
+
+
+# Connection to load db_name through. With if_exists="replace" it is a separate
+# "<db_name>.loading" file that replaces db_name only when the block succeeds and is
+# removed when it fails.
+@contextmanager
+def target_database(db_name, if_exists):
+    target = db_name
+    if if_exists == "replace" and db_name != ":memory:":
+        target = f"{db_name}.loading"
+        if os.path.exists(target):
+            os.remove(target)
+
+    conn = sqlite3.connect(target)
+    try:
+        yield conn
+    except BaseException:
+        conn.close()
+        if target != db_name and os.path.exists(target):
+            os.remove(target)
+        raise
+    conn.close()
+
+    if target != db_name:
+        os.replace(target, db_name)
+
+
+# Rows, elapsed time and insert time of every loaded table
+class LoadReport:
+    def __init__(self):
+        self.tables = {}
+        self.index_seconds = 0.0
+        self.summary_seconds = 0.0
+        self.feature_index_seconds = 0.0
+        self.spatial_index_seconds = 0.0
+        self.text_index_seconds = 0.0
+
+    # Adds to what was already recorded for the table (merges load it in parts)
+    def add(self, table, rows, seconds, insert_seconds):
+        previous_rows, previous_seconds, previous_insert_seconds = self.tables.get(table, (0, 0.0, 0.0))
+        self.tables[table] = (previous_rows + rows, previous_seconds + seconds, previous_insert_seconds + insert_seconds)
+
+    def counts(self):
+        return {table: rows for table, (rows, _, _) in self.tables.items()}
+
+    def total_rows(self):
+        return sum(self.counts().values())
+
+    # Rows per second of the whole table load (generation included) and of the inserts alone
+    def rows_per_sec(self, table):
+        rows, seconds, insert_seconds = self.tables[table]
+        return rows / seconds if seconds else 0.0, rows / insert_seconds if insert_seconds else 0.0
+
+    def summary(self):
+        lines = []
+        for table, (rows, seconds, _) in self.tables.items():
+            overall, inserts = self.rows_per_sec(table)
+            lines.append(f"{table:<20} {rows:>12,} rows {seconds:>9.2f}s {overall:>12,.0f} rows/s ({inserts:,.0f} rows/s insert)")
+        lines.append(f"{'indexes':<20} {self.index_seconds:>27.2f}s")
+        lines.append(f"{'report summaries':<20} {self.summary_seconds:>27.2f}s")
+        lines.append(f"{'feature index':<20} {self.feature_index_seconds:>27.2f}s")
+        lines.append(f"{'spatial index':<20} {self.spatial_index_seconds:>27.2f}s")
+        lines.append(f"{'text index':<20} {self.text_index_seconds:>27.2f}s")
+        return "\n".join(lines)
+
+
+# Streams chunks into one table at a time inside explicit transactions of
+# transaction_rows rows, with bulk pragmas applied to new databases and indexes built
+# at the end.
+# Every table load is a "load:<table>" phase of the instrumentation, with an event
+# per chunk, and the index build an "indexes" phase. on_commit is called after every
+# commit, once the rows inserted so far are durable.
+class Loader:
+    def __init__(self, conn, if_exists="fail", transaction_rows=DEFAULT_TRANSACTION_ROWS, instrumentation=None, on_commit=None):
+        self.conn = conn
+        self.if_exists = if_exists
+        self.transaction_rows = transaction_rows
+        self.instrumentation = instrumentation or disabled
+        self.on_commit = on_commit
+        self.report = LoadReport()
+        self.pending_rows = 0
+
+    def __enter__(self):
+        # Transactions are managed explicitly for the duration of the load
+        self.isolation_level = self.conn.isolation_level
+        self.conn.isolation_level = None
+        self.bulk = is_new_database(self.conn)
+        if self.bulk:
+            set_pragmas(self.conn, BULK_PRAGMAS)
+        prepare_tables(self.conn, self.if_exists)
+        if self.if_exists != "append":
+            self.drop_indexes()
+        self.conn.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+            self.create_indexes()
+        elif self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        if self.bulk:
+            set_pragmas(self.conn, DEFAULT_PRAGMAS)
+        self.conn.isolation_level = self.isolation_level
+        return False
+
+    # Indexes are built once after the load instead of being maintained row by row.
+    # Appends keep them, since they enforce the keys used to skip existing rows.
+    def drop_indexes(self):
+        for name in schema.index_names():
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def create_indexes(self):
+        with self.instrumentation.phase("indexes") as phase:
+            for statements in schema.indexes.values():
+                for statement in statements:
+                    self.conn.execute(statement)
+            # Fresh statistics so the query planner picks the new indexes
+            self.conn.execute("ANALYZE")
+            self.report.index_seconds = phase.end(self.report.total_rows())
+
+    def commit(self):
+        self.conn.execute("COMMIT")
+        if self.on_commit is not None:
+            self.on_commit()
+
+    def _inserted(self, rows):
+        self.pending_rows += rows
+        if self.pending_rows >= self.transaction_rows:
+            self.commit()
+            self.conn.execute("BEGIN")
+            self.pending_rows = 0
+
+    # Stream row chunks into a table. In append mode rows whose key already exists are skipped.
+    def load_table(self, table, chunks):
+        verb = "INSERT OR IGNORE" if self.if_exists == "append" else "INSERT"
+        sql = schema.insert_sql(table, verb=verb)
+        count, insert_seconds = 0, 0.0
+        with self.instrumentation.phase(f"load:{table}", table) as phase:
+            start = wait_start = time.perf_counter()
+            for chunk in chunks:
+                # The wait for a chunk is its generation, or its queueing when it comes
+                # from worker processes or another stage
+                insert_start = time.perf_counter()
+                inserted = self.conn.executemany(sql, chunk).rowcount
+                chunk_seconds = time.perf_counter() - insert_start
+                insert_seconds += chunk_seconds
+                count += inserted
+                self._inserted(inserted)
+                phase.chunk(inserted, generate_seconds=insert_start - wait_start, insert_seconds=chunk_seconds)
+                wait_start = time.perf_counter()
+            self.report.add(table, count, time.perf_counter() - start, insert_seconds)
+            phase.end(count, insert_seconds=insert_seconds)
+        return count
+
+    # Attach another database file to copy from. SQLite cannot attach inside a
+    # transaction, so the current one is committed first.
+    def attach(self, path, name):
+        self.commit()
+        self.conn.execute("ATTACH DATABASE ? AS " + name, (path,))
+        self.conn.execute("BEGIN")
+        self.pending_rows = 0
+
+    def detach(self, name):
+        self.commit()
+        self.conn.execute(f"DETACH DATABASE {name}")
+        self.conn.execute("BEGIN")
+
+    # Copy the rows of a table of an attached database with one INSERT ... SELECT, in
+    # rowid order
+    def copy_table(self, table, source):
+        verb = "INSERT OR IGNORE" if self.if_exists == "append" else "INSERT"
+        names = ", ".join(schema.columns[table])
+        sql = f"{verb} INTO main.{table} ({names}) SELECT {names} FROM {source}.{table} ORDER BY rowid"
+        with self.instrumentation.phase(f"load:{table}", table) as phase:
+            count = self.conn.execute(sql).rowcount
+            seconds = phase.end(count)
+        self.report.add(table, count, seconds, seconds)
+        self._inserted(count)
+        return count
+
@@ -0,0 +1,49 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from . import tables
+
+# Chunks are generated in worker processes and handed back to a single writer in
+# task order. Every chunk draws from a random stream derived from the master seed,
+# its table and its chunk index, so the rows are identical for any worker count.
+
+# Chunks in flight per worker; bounds the memory held by finished, unwritten chunks
+PENDING_CHUNKS_PER_WORKER = 4
+
+# Per-process generation state, set up once by the pool initializer
+_state = {}
+
+
+def _init_worker(scale):
+    _state["context"] = tables.Context(scale)
+
+
+def _generate_chunk(table, chunk_index):
+    return tables.generate_chunk(_state["context"], table, chunk_index)
+
+
+# Rows of every task in task order, generated in the current process
+def serial_chunks(context, tasks):
+    for table, chunk_index in tasks:
+        yield tables.generate_chunk(context, table, chunk_index)
+
+
+# Rows of every task in task order, generated by a pool of worker processes
+def parallel_chunks(scale, tasks, workers):
+    max_pending = workers * PENDING_CHUNKS_PER_WORKER
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(scale,)) as executor:
+        pending = deque()
+        for table, chunk_index in tasks:
+            pending.append(executor.submit(_generate_chunk, table, chunk_index))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Chunk stream for a whole run, or for one shard of it; workers=1 generates in-process
+def chunk_stream(context, workers=1, shard=None):
+    tasks = tables.tasks(context.scale, shard=shard)
+    if workers > 1:
+        return parallel_chunks(context.scale, tasks, workers)
+    return serial_chunks(context, tasks)
@@ -0,0 +1,146 @@
+import numpy as np
+
+from . import data, spec
+from .columnar import Categorical
+from .spec import plan
+from .vectorized import chunk_bounds, chunk_rng, epoch_day
+
+# Rent payment schedule engine. Every rented property has one lease, the row of
+# Rentals generated for it; the lease pays every PAYMENT_INTERVAL days from one
+# interval after its Start_Date, the last time on or before its End_Date (or the end
+# of the payment period). Payment k of a lease is due on Start_Date + k * interval,
+# so the payers of any window of days are found arithmetically from the lease dates.
+# Payments are produced window by window, already in Payment_Date order, and
+# numbered in the same pass.
+
+PAYMENT_INTERVAL = 30
+
+# The lease dates as the Rentals spec draws them: starts uniform over the years of
+# Start_Date, ends a drawn number of days later
+_rental_columns = dict(spec.tables["Rentals"].columns)
+lease_starts = _rental_columns["Start_Date"]
+lease_lengths = _rental_columns["End_Date"].amount
+
+# Payment period: the years leases start in
+payment_start_year = lease_starts.start_year
+payment_end_year = lease_starts.end_year
+
+payment_methods = np.array(data.payment_methods, dtype=object)
+completed_payment_notes = np.array(data.completed_payment_notes, dtype=object)
+pending_payment_notes = np.array(data.pending_payment_notes, dtype=object)
+# Categories of the Notes column: the pending notes, then the completed ones
+payment_notes = np.concatenate([pending_payment_notes, completed_payment_notes])
+payment_statuses = np.array(["Completed", "Pending"], dtype=object)
+
+
+def default_end_day():
+    return epoch_day(payment_end_year, 12, 31)
+
+
+# Earliest possible payment day: one interval after the earliest lease start
+def first_payment_day():
+    return epoch_day(payment_start_year) + PAYMENT_INTERVAL
+
+
+def payment_day_count(end_day=None):
+    end_day = end_day if end_day is not None else default_end_day()
+    return max(0, end_day - first_payment_day() + 1)
+
+
+# Days per schedule chunk, so that a chunk holds about chunk_size payments: a lease
+# makes about mean length / interval payments, spread over the payment period
+def days_per_chunk(scale):
+    payments_per_lease = (lease_lengths.low + lease_lengths.high) / 2 / PAYMENT_INTERVAL
+    payments_per_day = max(1, scale.rented) * payments_per_lease / payment_day_count()
+    return max(1, int(scale.chunk_size / payments_per_day))
+
+
+# Amount, method, status and notes of payments, given which of them are pending
+def payment_details(rng, pending):
+    size = len(pending)
+    completed = ~pending
+    # Payment method only for "Completed" status, notes consistent with the status
+    payment_method = np.full(size, -1, dtype=np.int8)
+    payment_method[completed] = rng.integers(0, len(payment_methods), int(completed.sum()))
+    notes = np.where(
+        pending,
+        rng.integers(0, len(pending_payment_notes), size),
+        len(pending_payment_notes) + rng.integers(0, len(completed_payment_notes), size),
+    )
+    return {
+        "Payment_Amount": rng.integers(1000, 5000, size, endpoint=True),
+        "Payment_Method": Categorical(payment_method, payment_methods),
+        "Status": Categorical(pending, payment_statuses),
+        "Notes": Categorical(notes, payment_notes),
+    }
+
+
+class PaymentSchedule:
+    def __init__(self, context, end_day=None):
+        self.scale = context.scale
+        self.first_day = first_payment_day()
+        self.end_day = end_day if end_day is not None else default_end_day()
+        # Payments in the last calendar month of the period are still pending
+        self.pending_from_day = int(np.datetime64(self.end_day, "D").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64))
+
+        leases = self._leases(context)
+        self.rental_ids = leases["Rental_ID"]
+        self.tenant_ids = leases["Tenant_ID"]
+        self.property_ids = leases["Property_ID"]
+        self.starts = leases["Start_Date"].astype(np.int64)
+        # Number of payments of every lease within the period
+        last_days = np.minimum(leases["End_Date"].astype(np.int64), self.end_day)
+        self.payment_counts = np.maximum(0, (last_days - self.starts) // PAYMENT_INTERVAL)
+
+    # Rental_ID, Tenant_ID, Property_ID, Start_Date and End_Date of every rented
+    # position, from the same chunks of the Rentals spec a build generates
+    def _leases(self, context):
+        rentals = plan["Rentals"]
+        names = ["Rental_ID", "Tenant_ID", "Property_ID", "Start_Date", "End_Date"]
+        columns = {name: [] for name in names}
+        for chunk_index, start, stop in chunk_bounds(self.scale.rented, rentals.units_per_chunk(self.scale)):
+            chunk = rentals.generate(context, start, stop, chunk_rng(self.scale, "Rentals", chunk_index))
+            for name in names:
+                columns[name].append(chunk[name])
+        return {name: np.concatenate(values) if values else np.empty(0, dtype=np.int64) for name, values in columns.items()}
+
+    # Number of payments dated before `day`
+    def count_before(self, day):
+        due = np.clip((day - 1 - self.starts) // PAYMENT_INTERVAL, 0, self.payment_counts)
+        return int(due.sum())
+
+    # Rented positions and days of all payments dated first_day..last_day (inclusive),
+    # ordered by day and, within a day, by rented position
+    def payers(self, first_day, last_day):
+        # Payments k = first_k..last_k of each lease fall inside the window
+        first_k = np.maximum(1, -(-(first_day - self.starts) // PAYMENT_INTERVAL))
+        last_k = np.minimum(self.payment_counts, (last_day - self.starts) // PAYMENT_INTERVAL)
+        counts = np.maximum(0, last_k - first_k + 1)
+        positions = np.repeat(np.arange(len(self.starts)), counts)
+        k = np.arange(len(positions)) - np.repeat(np.cumsum(counts) - counts, counts) + first_k[positions]
+        days = self.starts[positions] + k * PAYMENT_INTERVAL
+        order = np.lexsort((positions, days))
+        return positions[order], days[order]
+
+    # Columns of the payments dated first_day..last_day
+    def chunk(self, first_day, last_day, rng):
+        positions, days = self.payers(first_day, last_day)
+        size = len(positions)
+        first_id = self.count_before(first_day) + 1
+        payment_ids = np.arange(first_id, first_id + size)
+
+        return {
+            "Payment_ID": payment_ids,
+            "Rental_ID": self.rental_ids[positions],
+            "Payment_Date": days.astype(np.int32),
+            "Tenant_ID": self.tenant_ids[positions],
+            "Property_ID": self.property_ids[positions],
+            **payment_details(rng, days >= self.pending_from_day),
+        }
+
+    # Columns of chunk number chunk_index of the whole schedule
+    def chunk_at(self, chunk_index):
+        days = days_per_chunk(self.scale)
+        first_day = self.first_day + chunk_index * days
+        last_day = min(first_day + days - 1, self.end_day)
+        return self.chunk(first_day, last_day, chunk_rng(self.scale, "Rent_Payments", chunk_index))
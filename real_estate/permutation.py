@@ -0,0 +1,129 @@
+import numpy as np
+
+MASK64 = (1 << 64) - 1
+FEISTEL_ROUNDS = 4
+
+
+# 64-bit integer mixer (splitmix64 finaliser) used as the Feistel round function
+def _mix(value, key):
+    value = ((value ^ key) * 0x9E3779B97F4A7C15) & MASK64
+    value ^= value >> 29
+    value = (value * 0xBF58476D1CE4E5B9) & MASK64
+    value ^= value >> 32
+    return value
+
+
+# Same mixer over a uint64 array; numpy integer arithmetic wraps modulo 2**64
+def _mix_array(values, key):
+    values = (values ^ np.uint64(key)) * np.uint64(0x9E3779B97F4A7C15)
+    values ^= values >> np.uint64(29)
+    values *= np.uint64(0xBF58476D1CE4E5B9)
+    values ^= values >> np.uint64(32)
+    return values
+
+
+# Seeded random permutation of range(n) that needs no memory proportional to n.
+# A balanced Feistel network permutes the smallest power-of-four domain covering n
+# and cycle-walking maps the values that fall outside range(n) back into it, so both
+# the permutation and its inverse can be evaluated for any single position.
+class Permutation:
+    def __init__(self, n, seed):
+        if n < 1:
+            raise ValueError(f"Permutation size must be at least 1, got {n}")
+        self.n = n
+        self.half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        self.keys = [_mix(seed & MASK64, round_number) for round_number in range(FEISTEL_ROUNDS)]
+
+    def __len__(self):
+        return self.n
+
+    def _encrypt(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ (_mix(right, key) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def _decrypt(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in reversed(self.keys):
+            left, right = right ^ (_mix(left, key) & self.half_mask), left
+        return (left << self.half_bits) | right
+
+    # Position i of the shuffled sequence
+    def __getitem__(self, i):
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        value = self._encrypt(i)
+        while value >= self.n:
+            value = self._encrypt(value)
+        return value
+
+    # Position at which value appears in the shuffled sequence
+    def index(self, value):
+        if not 0 <= value < self.n:
+            raise ValueError(f"{value} is not in range({self.n})")
+        i = self._decrypt(value)
+        while i >= self.n:
+            i = self._decrypt(i)
+        return i
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+    def _encrypt_array(self, values):
+        shift, mask = np.uint64(self.half_bits), np.uint64(self.half_mask)
+        left, right = values >> shift, values & mask
+        for key in self.keys:
+            left, right = right, left ^ (_mix_array(right, key) & mask)
+        return (left << shift) | right
+
+    def _decrypt_array(self, values):
+        shift, mask = np.uint64(self.half_bits), np.uint64(self.half_mask)
+        left, right = values >> shift, values & mask
+        for key in reversed(self.keys):
+            left, right = right ^ (_mix_array(left, key) & mask), left
+        return (left << shift) | right
+
+    def _walk(self, step, values):
+        values = step(np.asarray(values, dtype=np.uint64))
+        outside = values >= self.n
+        while outside.any():
+            values[outside] = step(values[outside])
+            outside = values >= self.n
+        return values.astype(np.int64)
+
+    # Vectorised __getitem__ for an array of positions
+    def take(self, positions):
+        return self._walk(self._encrypt_array, positions)
+
+    # Vectorised index() for an array of values
+    def index_array(self, values):
+        return self._walk(self._decrypt_array, values)
+
+
+# Ownership status of every property without materialising the shuffled ID lists.
+# Property IDs are shuffled once; the first `owned` positions are owned, the next
+# `rented` are rented and the rest are available, exactly like divide_numbers().
+class PropertyPartition:
+    def __init__(self, scale):
+        self.scale = scale
+        self.permutation = Permutation(scale.properties, scale.derive_seed("partition"))
+
+    # Status codes (0 owned, 1 rented, 2 available) for an array of property IDs
+    def status_codes(self, property_ids):
+        ranks = self.permutation.index_array(np.asarray(property_ids) - 1)
+        return (ranks >= self.scale.owned).astype(np.int8) + (ranks >= self.scale.owned + self.scale.rented)
+
+    # Owned property IDs at shuffled positions start..stop
+    def owned_ids(self, start, stop):
+        return self.permutation.take(np.arange(start, stop)) + 1
+
+    # Rented property IDs at shuffled positions start..stop of the rented block
+    def rented_ids(self, start, stop):
+        return self.rented_ids_at(np.arange(start, stop))
+
+    # Rented property IDs at an array of shuffled positions within the rented block
+    def rented_ids_at(self, positions):
+        return self.permutation.take(self.scale.owned + np.asarray(positions)) + 1
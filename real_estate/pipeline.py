@@ -0,0 +1,212 @@
+import queue
+import threading
+import time
+
+from .build import finish_load, load_context, table_streams
+from .export import open_exporter, schema_columns
+from .instrument import disabled
+from .loader import DEFAULT_TRANSACTION_ROWS, Loader, target_database
+from .parallel import chunk_stream
+
+# Build and export in one pass, as three stages on their own threads connected by
+# bounded queues:
+#
+#   generate --> insert queue --> write --> export queue --> export
+#
+# The generate stage produces the chunks (in worker processes when workers > 1), the
+# write stage is the only thread that touches the sqlite3 connection, and the export
+# stage writes the chunks once they have been committed, so nothing is read back
+# from the database and the export never holds rows a failed load rolled back. The
+# write stage hands the chunks of every committed transaction over as one
+# batch, and the export queue holds EXPORT_BATCHES of them, so the export of one
+# transaction overlaps the inserts of the next and at most about
+# (EXPORT_BATCHES + 2) * transaction_rows rows are held for the export.
+#
+# The stages overlap, so the wall time approaches that of the slowest stage instead
+# of the sum of all of them; the bounded insert queue keeps generation from running
+# ahead of the inserts by more than queue_chunks chunks. With instrumentation
+# the depths of both queues are sampled into every event, which shows the stage that
+# holds the others back.
+
+DEFAULT_QUEUE_CHUNKS = 8
+
+# Committed transactions waiting for the export stage
+EXPORT_BATCHES = 1
+
+# How often a stage blocked on a queue checks whether another stage failed
+POLL_SECONDS = 0.1
+
+# Messages are (kind, value) pairs; the export queue holds lists of them, one per
+# committed transaction
+BEGIN, ROWS, END, DONE = "begin", "rows", "end", "done"
+
+
+class Aborted(Exception):
+    pass
+
+
+# Wall time, queue wait time and busy time (wall minus waits) of every stage
+class PipelineReport:
+    def __init__(self):
+        self.load = None
+        self.export_counts = {}
+        self.seconds = 0.0
+        self.stage_seconds = {}
+        self.wait_seconds = {}
+
+    def busy_seconds(self, stage):
+        return self.stage_seconds[stage] - self.wait_seconds.get(stage, 0.0)
+
+    def summary(self):
+        lines = [self.load.summary()] if self.load else []
+        for stage in self.stage_seconds:
+            lines.append(f"{'stage ' + stage:<20} {self.busy_seconds(stage):>27.2f}s busy, {self.wait_seconds.get(stage, 0.0):.2f}s waiting")
+        lines.append(f"{'pipeline':<20} {self.seconds:>27.2f}s")
+        return "\n".join(lines)
+
+
+class Pipeline:
+    def __init__(self, queue_chunks=DEFAULT_QUEUE_CHUNKS, instrumentation=None):
+        self.insert_queue = queue.Queue(queue_chunks)
+        self.export_queue = queue.Queue(EXPORT_BATCHES)
+        # Export messages of the open transaction, released to the export queue
+        # when the loader commits it
+        self.uncommitted = []
+        self.instrumentation = instrumentation or disabled
+        if instrumentation is not None:
+            instrumentation.watch_queue("insert", self.insert_queue)
+            instrumentation.watch_queue("export", self.export_queue)
+        self.failed = threading.Event()
+        self.errors = []
+        self.report = PipelineReport()
+        self._stage = threading.local()
+
+    def _waited(self, start):
+        stage = self._stage.name
+        self.report.wait_seconds[stage] = self.report.wait_seconds.get(stage, 0.0) + time.perf_counter() - start
+
+    # Queue operations give up once another stage has failed
+    def put(self, target, item):
+        start = time.perf_counter()
+        try:
+            while not self.failed.is_set():
+                try:
+                    target.put(item, timeout=POLL_SECONDS)
+                    return
+                except queue.Full:
+                    pass
+            raise Aborted()
+        finally:
+            self._waited(start)
+
+    def get(self, source):
+        start = time.perf_counter()
+        try:
+            while not self.failed.is_set():
+                try:
+                    return source.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    pass
+            raise Aborted()
+        finally:
+            self._waited(start)
+
+    def _run_stage(self, name, function, *args):
+        self._stage.name = name
+        start = time.perf_counter()
+        try:
+            function(*args)
+        except Aborted:
+            pass
+        except BaseException as error:
+            self.errors.append(error)
+            self.failed.set()
+        finally:
+            self.report.stage_seconds[name] = time.perf_counter() - start
+
+    def generate(self, scale, workers):
+        context = load_context(scale, self.instrumentation)
+        for table, table_chunks in table_streams(scale, chunk_stream(context, workers)):
+            self.put(self.insert_queue, (BEGIN, table))
+            for chunk in table_chunks:
+                self.put(self.insert_queue, (ROWS, chunk))
+            self.put(self.insert_queue, (END, table))
+        self.put(self.insert_queue, (DONE, None))
+
+    # Chunks of the current table. A chunk is queued for the export once the loader
+    # has inserted it and asks for the next one, and released when it commits.
+    def _table_chunks(self):
+        while True:
+            kind, value = self.get(self.insert_queue)
+            if kind == END:
+                self.uncommitted.append((END, value))
+                return
+            yield value
+            self.uncommitted.append((ROWS, value))
+
+    def _committed(self):
+        if self.uncommitted:
+            batch, self.uncommitted = self.uncommitted, []
+            self.put(self.export_queue, batch)
+
+    def write(self, db_name, scale, if_exists, transaction_rows):
+        with target_database(db_name, if_exists) as conn:
+            with Loader(conn, if_exists, transaction_rows, self.instrumentation, self._committed) as loader:
+                while True:
+                    kind, value = self.get(self.insert_queue)
+                    if kind == DONE:
+                        break
+                    self.uncommitted.append((BEGIN, value))
+                    loader.load_table(value, self._table_chunks())
+                # Released by the final commit, so the export can finish while the
+                # indexes are built
+                self.uncommitted.append((DONE, None))
+            finish_load(conn, loader.report, scale, if_exists, instrumentation=self.instrumentation)
+        self.report.load = loader.report
+
+    def export(self, exporter):
+        counts = self.report.export_counts
+        while True:
+            for kind, value in self.get(self.export_queue):
+                if kind == BEGIN:
+                    phase = self.instrumentation.phase(f"export:{value}", value)
+                    exporter.begin_table(value, *schema_columns(value))
+                    counts[value] = 0
+                    table = value
+                elif kind == ROWS:
+                    exporter.write_rows(value)
+                    counts[table] += len(value)
+                elif kind == END:
+                    exporter.end_table()
+                    phase.end(counts[table])
+                else:
+                    exporter.close()
+                    return
+
+    def run(self, db_name, scale, export_path, export_format, workers, if_exists, transaction_rows):
+        # Fails early on an unknown format or a missing optional dependency
+        exporter = open_exporter(export_path, export_format)
+        stages = [
+            threading.Thread(target=self._run_stage, args=("generate", self.generate, scale, workers), name="generate"),
+            threading.Thread(target=self._run_stage, args=("write", self.write, db_name, scale, if_exists, transaction_rows), name="write"),
+            threading.Thread(target=self._run_stage, args=("export", self.export, exporter), name="export"),
+        ]
+        start = time.perf_counter()
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+        self.report.seconds = time.perf_counter() - start
+        if self.errors:
+            raise self.errors[0]
+        return self.report
+
+
+# Build db_name and export every table to export_path while it is being loaded.
+# Exported chunks are the inserted ones, so appending (which skips existing rows) is
+# not supported.
+def build_and_export(db_name, scale, export_path, export_format="xlsx", workers=1, if_exists="replace",
+                     transaction_rows=DEFAULT_TRANSACTION_ROWS, queue_chunks=DEFAULT_QUEUE_CHUNKS, instrumentation=None):
+    if if_exists == "append":
+        raise ValueError("build_and_export exports what it inserts and cannot append; use create_database")
+    return Pipeline(queue_chunks, instrumentation).run(db_name, scale, export_path, export_format, workers, if_exists, transaction_rows)
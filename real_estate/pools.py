@@ -0,0 +1,197 @@
+import os
+import re
+import zlib
+
+import numpy as np
+
+from . import data
+from .columnar import Categorical
+
+# Faker is slow per call, so names and address parts are generated once into pools,
+# cached on disk and then sampled in bulk with numpy for every table.
+#
+# Addresses come with coordinates that follow from their text: the region code of
+# the "City, ST 12345" locality places the city somewhere around the centre of that
+# region (see data.regions) and the street places the address within a few km of
+# its city. Both positions are hashed from the strings, so an address gets the same
+# coordinates in every pool, table and run. Localities without a known region code
+# (other locales) get NULL coordinates and region.
+
+DEFAULT_LOCALE = "en_US"
+DEFAULT_POOL_SIZE = 5000
+DEFAULT_POOL_SEED = 0
+
+# Faker draws per pool entry before giving up on finding more unique values, and
+# consecutive draws without a new value after which a provider counts as exhausted
+MAX_ATTEMPTS_PER_ENTRY = 20
+MAX_STALE_DRAWS = 5000
+
+# Bumped whenever the cached file layout changes, so stale caches are not read
+POOL_FORMAT_VERSION = 1
+POOL_FIELDS = ["first_names", "first_name_counts", "last_names", "last_name_counts", "streets", "localities"]
+
+region_codes = np.array(list(data.regions), dtype=object)
+REGION_PATTERN = re.compile(r"\b([A-Z]{2}) \d{5}$")
+
+# Cities lie within this share of their region's radius, addresses within
+# ADDRESS_RADIUS_KM of their city
+CITY_SPREAD = 0.8
+ADDRESS_RADIUS_KM = 8.0
+KM_PER_DEGREE = 111.2
+COORDINATE_DECIMALS = 6
+
+
+def default_cache_dir():
+    return os.environ.get("REAL_ESTATE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "real_estate"))
+
+
+# Up to `size` distinct values of a Faker method with how often each was drawn. Name
+# providers have a finite, frequency-weighted list; the counts keep that weighting.
+def _unique_values(method, size):
+    counts = {}
+    stale = 0
+    for _ in range(size * MAX_ATTEMPTS_PER_ENTRY):
+        value = method()
+        if value in counts:
+            counts[value] += 1
+            stale += 1
+            if stale == MAX_STALE_DRAWS:
+                break
+            continue
+        counts[value] = 1
+        stale = 0
+        if len(counts) == size:
+            break
+    return np.array(list(counts), dtype=object), np.array(list(counts.values()), dtype=np.int64)
+
+
+# Uniform floats in [0, 1) hashed from uint64 keys (the splitmix64 finaliser)
+def _unit_hash(keys, salt):
+    with np.errstate(over="ignore"):
+        x = keys.astype(np.uint64) + np.uint64(salt) * np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) / 2.0**53
+
+
+def _text_keys(values):
+    return np.array([zlib.crc32(value.encode()) for value in values], dtype=np.uint64)
+
+
+# Points spread uniformly over discs of radius_km around the given centres, placed by
+# the hashes of keys
+def _scatter(latitudes, longitudes, radius_km, keys):
+    distance = radius_km * np.sqrt(_unit_hash(keys, 1))
+    angle = 2 * np.pi * _unit_hash(keys, 2)
+    latitudes = latitudes + distance * np.cos(angle) / KM_PER_DEGREE
+    longitudes = longitudes + distance * np.sin(angle) / (KM_PER_DEGREE * np.cos(np.radians(latitudes)))
+    return latitudes, longitudes
+
+
+# Region codes (index into region_codes, -1 when unknown) and city centres of localities
+def _place_localities(localities):
+    index = {code: i for i, code in enumerate(region_codes)}
+    regions = np.full(len(localities), -1, dtype=np.int16)
+    for i, locality in enumerate(localities):
+        match = REGION_PATTERN.search(locality)
+        if match and match.group(1) in index:
+            regions[i] = index[match.group(1)]
+
+    # Unknown regions (-1) pick the NULL centre appended last
+    centres = np.array([data.regions[code] for code in region_codes] + [(np.nan, np.nan, 0.0)], dtype=np.float64)[regions]
+    return regions, *_scatter(centres[:, 0], centres[:, 1], centres[:, 2] * CITY_SPREAD, _text_keys(localities))
+
+
+# Indices drawn with probability proportional to counts
+def _weighted_indices(rng, cumulative, size):
+    return np.searchsorted(cumulative, rng.random(size) * cumulative[-1], side="right")
+
+
+# Name and address pools for one locale and seed
+class Pool:
+    def __init__(self, first_names, first_name_counts, last_names, last_name_counts, streets, localities):
+        self.first_names = first_names
+        self.first_name_counts = first_name_counts
+        self.last_names = last_names
+        self.last_name_counts = last_name_counts
+        self.streets = streets
+        self.localities = localities
+        self.first_names_lower = np.array([name.lower() for name in first_names], dtype=object)
+        self.first_name_cumulative = np.cumsum(first_name_counts)
+        self.last_name_cumulative = np.cumsum(last_name_counts)
+        self.street_keys = _text_keys(streets)
+        self.locality_keys = _text_keys(localities)
+        self.locality_regions, self.locality_latitudes, self.locality_longitudes = _place_localities(localities)
+
+    @classmethod
+    def build(cls, locale=DEFAULT_LOCALE, seed=DEFAULT_POOL_SEED, size=DEFAULT_POOL_SIZE):
+        from faker import Faker
+
+        faker = Faker(locale)
+        faker.seed_instance(seed)
+
+        # Addresses are split into their street part and their "City, ST 12345" part
+        # so that sampling can recombine them into size * size distinct addresses
+        streets, localities = {}, {}
+        for _ in range(size * MAX_ATTEMPTS_PER_ENTRY):
+            lines = faker.address().split("\n")
+            streets.setdefault(", ".join(lines[:-1]), None)
+            localities.setdefault(lines[-1], None)
+            if len(streets) >= size and len(localities) >= size:
+                break
+
+        return cls(
+            *_unique_values(faker.first_name, size),
+            *_unique_values(faker.last_name, size),
+            np.array(list(streets)[:size], dtype=object),
+            np.array(list(localities)[:size], dtype=object),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as stored:
+            return cls(*(stored[field] if field.endswith("_counts") else stored[field].astype(object) for field in POOL_FIELDS))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write under a temporary name first so concurrent readers never see a partial file
+        temporary = f"{path}.{os.getpid()}.tmp.npz"
+        arrays = {field: getattr(self, field) for field in POOL_FIELDS}
+        np.savez(temporary, **{field: values if values.dtype != object else values.astype(str) for field, values in arrays.items()})
+        os.replace(temporary, path)
+
+    # Random (first, last, middle) name indices; the middle name is another first name
+    def names(self, rng, size):
+        first = _weighted_indices(rng, self.first_name_cumulative, size)
+        middle = _weighted_indices(rng, self.first_name_cumulative, size)
+        last = _weighted_indices(rng, self.last_name_cumulative, size)
+        return first, last, middle
+
+    # Random full addresses in the "street, City, ST 12345" format of faker.address(),
+    # with their Latitude, Longitude and Region
+    def address_columns(self, rng, size):
+        streets = rng.integers(0, len(self.streets), size)
+        localities = rng.integers(0, len(self.localities), size)
+        keys = (self.locality_keys[localities] << np.uint64(32)) | self.street_keys[streets]
+        latitudes, longitudes = _scatter(self.locality_latitudes[localities], self.locality_longitudes[localities], ADDRESS_RADIUS_KM, keys)
+        return {
+            "Address": self.streets[streets] + ", " + self.localities[localities],
+            "Latitude": np.round(latitudes, COORDINATE_DECIMALS),
+            "Longitude": np.round(longitudes, COORDINATE_DECIMALS),
+            "Region": Categorical(self.locality_regions[localities], region_codes),
+        }
+
+
+def pool_path(cache_dir, locale, seed, size):
+    return os.path.join(cache_dir, f"pool-v{POOL_FORMAT_VERSION}-{locale}-{seed}-{size}.npz")
+
+
+# Load the pool for this locale and seed from the cache, building it on a miss
+def load_pool(locale=DEFAULT_LOCALE, seed=DEFAULT_POOL_SEED, size=DEFAULT_POOL_SIZE, cache_dir=None):
+    path = pool_path(cache_dir or default_cache_dir(), locale, seed, size)
+    if os.path.exists(path):
+        return Pool.load(path)
+    pool = Pool.build(locale, seed, size)
+    pool.save(path)
+    return pool
@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from .build import create_database
+from .config import Scale
+
+# Representative join and filter queries over the generated schema, with their query
+# plans and latencies. Every query should be answered through an index; a plan step
+# that scans a whole table is reported as a full scan, except for the small fixed
+# tables in SMALL_TABLES.
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_REPEATS = 5
+DEFAULT_SEED = 0
+
+SMALL_TABLES = {"Features"}
+
+# Each query is run with the parameters returned by its parameter query, which picks
+# existing keys and values from the database being benchmarked
+queries = {
+    "sales_of_property": (
+        """
+        SELECT s.Sale_ID, s.Sale_Date, s.Sale_Price, o.L_Name, a.L_Name
+        FROM Sales s
+        JOIN Owners o ON o.Owner_ID = s.Owner_ID
+        JOIN Agents a ON a.Agent_ID = s.Agent_ID
+        WHERE s.Property_ID = ?
+        """,
+        "SELECT Property_ID FROM Sales ORDER BY Sale_ID LIMIT 1",
+    ),
+    "sales_of_agent_in_year": (
+        """
+        SELECT s.Sale_ID, s.Sale_Price, p.Address
+        FROM Sales s
+        JOIN Properties p ON p.Property_ID = s.Property_ID
+        WHERE s.Agent_ID = ? AND s.Sale_Date BETWEEN ? AND ?
+        """,
+        "SELECT Agent_ID, substr(Sale_Date, 1, 4) || '-01-01', substr(Sale_Date, 1, 4) || '-12-31' FROM Sales ORDER BY Sale_ID LIMIT 1",
+    ),
+    "sales_of_owner": (
+        "SELECT Sale_ID, Property_ID, Sale_Price FROM Sales WHERE Owner_ID = ?",
+        "SELECT Owner_ID FROM Sales ORDER BY Sale_ID LIMIT 1",
+    ),
+    "rentals_of_tenant": (
+        """
+        SELECT r.Rental_ID, r.Start_Date, r.Monthly_Rent, p.Address
+        FROM Rentals r
+        JOIN Properties p ON p.Property_ID = r.Property_ID
+        WHERE r.Tenant_ID = ?
+        """,
+        "SELECT Tenant_ID FROM Rentals ORDER BY Rental_ID LIMIT 1",
+    ),
+    "payments_of_rental": (
+        "SELECT Payment_ID, Payment_Date, Payment_Amount, Status FROM Rent_Payments WHERE Rental_ID = ?",
+        "SELECT Rental_ID FROM Rentals ORDER BY Rental_ID LIMIT 1",
+    ),
+    "payments_of_tenant": (
+        "SELECT Payment_ID, Payment_Date, Payment_Amount FROM Rent_Payments WHERE Tenant_ID = ?",
+        "SELECT Tenant_ID FROM Rent_Payments ORDER BY Payment_ID LIMIT 1",
+    ),
+    "payments_of_property_in_year": (
+        """
+        SELECT Payment_ID, Payment_Date, Payment_Amount
+        FROM Rent_Payments
+        WHERE Property_ID = ? AND Payment_Date BETWEEN ? AND ?
+        """,
+        "SELECT Property_ID, substr(Payment_Date, 1, 4) || '-01-01', substr(Payment_Date, 1, 4) || '-12-31' FROM Rent_Payments ORDER BY Payment_ID LIMIT 1",
+    ),
+    "pending_payments_of_month": (
+        """
+        SELECT rp.Payment_ID, rp.Payment_Amount, t.L_Name
+        FROM Rent_Payments rp
+        JOIN Tenants t ON t.Tenant_ID = rp.Tenant_ID
+        WHERE rp.Status = 'Pending' AND rp.Payment_Date BETWEEN ? AND ?
+        """,
+        "SELECT substr(max(Payment_Date), 1, 7) || '-01', substr(max(Payment_Date), 1, 7) || '-31' FROM Rent_Payments",
+    ),
+    "requests_of_property": (
+        """
+        SELECT m.Request_ID, m.Date_Submitted, m.Status, m.Cost, p.Address
+        FROM MaintenanceRequests m
+        JOIN Properties p ON p.Property_ID = m.Property_ID
+        WHERE m.Property_ID = ?
+        """,
+        "SELECT Property_ID FROM MaintenanceRequests ORDER BY Request_ID LIMIT 1",
+    ),
+    "open_requests_since": (
+        """
+        SELECT Request_ID, Property_ID, Date_Submitted, Issue_Description
+        FROM MaintenanceRequests
+        WHERE Status = ? AND Date_Submitted >= ?
+        """,
+        "SELECT Status, Date_Submitted FROM MaintenanceRequests WHERE Status != 'Resolved' ORDER BY Request_ID LIMIT 1",
+    ),
+    "features_of_property": (
+        """
+        SELECT f.Feature_Description, f.Feature_Type
+        FROM Property_Features pf
+        JOIN Features f ON f.Feature_ID = pf.Feature_ID
+        WHERE pf.Property_ID = ?
+        """,
+        "SELECT Property_ID FROM Property_Features LIMIT 1",
+    ),
+    "available_with_feature_in_price_range": (
+        """
+        SELECT p.Property_ID, p.Address, p.Price
+        FROM Property_Features pf
+        JOIN Properties p ON p.Property_ID = pf.Property_ID
+        WHERE pf.Feature_ID = ? AND p.Status = 'Available' AND p.Price BETWEEN ? AND ?
+        """,
+        "SELECT Feature_ID, 300000, 400000 FROM Property_Features LIMIT 1",
+    ),
+    "of_type_with_features_in_price_range": (
+        """
+        SELECT p.Property_ID, p.Address, p.Price
+        FROM Properties p
+        JOIN Property_Feature_Masks m ON m.Property_ID = p.Property_ID
+        WHERE p.Type = ? AND p.Status = 'Available' AND p.Price < ? AND m.Mask & ? = ? AND m.Mask & ? = 0
+        """,
+        "SELECT 'Residential', 500000, (1 << 0) | (1 << 1), (1 << 0) | (1 << 1), 1 << 7",
+    ),
+    "properties_in_box": (
+        """
+        SELECT p.Property_ID, p.Address, p.Price
+        FROM Property_Locations r
+        JOIN Properties p ON p.Property_ID = r.Property_ID
+        WHERE r.Max_Lat >= ? AND r.Min_Lat <= ? AND r.Max_Lon >= ? AND r.Min_Lon <= ?
+        """,
+        "SELECT Latitude - 0.05, Latitude + 0.05, Longitude - 0.05, Longitude + 0.05 FROM Properties WHERE Latitude IS NOT NULL LIMIT 1",
+    ),
+    "requests_matching_text": (
+        """
+        SELECT m.Request_ID, m.Property_ID, m.Issue_Description, m.Status
+        FROM Maintenance_Search ms
+        JOIN MaintenanceRequests m ON m.Request_ID = ms.rowid
+        WHERE Maintenance_Search MATCH ?
+        ORDER BY ms.rank
+        LIMIT 20
+        """,
+        "SELECT '\"leak\"*'",
+    ),
+    "available_in_price_range": (
+        "SELECT Property_ID, Address, Price FROM Properties WHERE Status = 'Available' AND Price BETWEEN ? AND ?",
+        "SELECT 300000, 400000",
+    ),
+    "properties_of_type": (
+        "SELECT count(*) FROM Properties WHERE Type = ? AND Status = 'Rented'",
+        "SELECT Type FROM Properties LIMIT 1",
+    ),
+}
+
+
+# Plan steps of a query that read a whole large table
+def full_scans(plan):
+    scans = []
+    for detail in plan:
+        words = detail.split()
+        if words[0] != "SCAN" or words[1] in SMALL_TABLES:
+            continue
+        # A virtual table step (R*Tree, FTS5) lists the constraints it searches by
+        # after "INDEX n:"; without any it reads the whole table, except for the
+        # R*Tree's key lookup "INDEX 1:"
+        if "VIRTUAL TABLE INDEX" in detail and (not words[-1].endswith(":") or words[-1] == "1:"):
+            continue
+        scans.append(detail)
+    return scans
+
+
+def query_plan(conn, sql, params):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+# Median wall time of running a query to completion
+def median_latency(conn, sql, params, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+# Plan, full scans, result size and median latency of every query on an open database
+def run_queries(conn, repeats=DEFAULT_REPEATS, names=None):
+    results = {}
+    for name in names or list(queries):
+        sql, params_sql = queries[name]
+        params = conn.execute(params_sql).fetchone()
+        if params is None:
+            results[name] = {"skipped": "no parameters in this database"}
+            continue
+        plan = query_plan(conn, sql, params)
+        results[name] = {
+            "params": list(params),
+            "plan": plan,
+            "full_scans": full_scans(plan),
+            "rows": len(conn.execute(sql, params).fetchall()),
+            "median_ms": median_latency(conn, sql, params, repeats) * 1000,
+        }
+    return results
+
+
+# Build a database per scale factor in a temporary directory and benchmark it
+def run_scales(scales=DEFAULT_SCALES, seed=DEFAULT_SEED, repeats=DEFAULT_REPEATS, workers=1):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for factor in scales:
+            db_name = os.path.join(directory, f"bench-{factor}.db")
+            create_database(db_name, Scale(factor, seed=seed), workers, if_exists="replace")
+            conn = sqlite3.connect(db_name)
+            try:
+                results[str(factor)] = run_queries(conn, repeats)
+            finally:
+                conn.close()
+            os.remove(db_name)
+    return results
+
+
+def format_results(results):
+    lines = []
+    for label, scale_results in results.items():
+        lines.append(f"== {label}")
+        for name, result in scale_results.items():
+            if "skipped" in result:
+                lines.append(f"{name:<40} skipped: {result['skipped']}")
+                continue
+            status = "FULL SCAN" if result["full_scans"] else "ok"
+            lines.append(f"{name:<40} {result['median_ms']:>10.3f} ms {result['rows']:>8} rows  {status}")
+            for detail in result["plan"]:
+                lines.append(f"    {detail}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query plans and latencies of representative queries")
+    parser.add_argument("--db", help="benchmark an existing database instead of building one per scale")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        conn = sqlite3.connect(args.db)
+        try:
+            results = {args.db: run_queries(conn, args.repeats)}
+        finally:
+            conn.close()
+    else:
+        results = run_scales(args.scales, args.seed, args.repeats, args.workers)
+
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    scans = [name for scale_results in results.values() for name, result in scale_results.items() if result.get("full_scans")]
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
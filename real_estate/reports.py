@@ -0,0 +1,182 @@
+import time
+
+# Named reports over the database, read from summary tables instead of aggregating
+# the source tables on every run. Each summary aggregates one source table by a key;
+# it is filled with one GROUP BY pass when installed and afterwards kept current by
+# triggers that add the contribution of every inserted row and subtract that of
+# every deleted one (an update does both), so the cost of keeping it up to date is
+# proportional to the rows that change.
+
+# Summary table -> source table, key column (name, type, expression) and value
+# columns (name, type, expression). Expressions refer to the source row as {row}.
+# Commissions are stored as rates in percent, so commission amounts are the rate
+# applied to the sale price or to the monthly rent.
+summaries = {
+    "Report_Occupancy": {
+        "source": "Properties",
+        "key": ("Status", "TEXT", "{row}.Status"),
+        "values": [
+            ("Properties", "INTEGER", "1"),
+        ],
+    },
+    "Report_Agent_Sales": {
+        "source": "Sales",
+        "key": ("Agent_ID", "INTEGER", "{row}.Agent_ID"),
+        "values": [
+            ("Sales", "INTEGER", "1"),
+            ("Sales_Volume", "REAL", "{row}.Sale_Price"),
+            ("Sales_Commission_Amount", "REAL", "{row}.Sale_Price * {row}.Commission / 100"),
+        ],
+    },
+    "Report_Agent_Rentals": {
+        "source": "Rentals",
+        "key": ("Agent_ID", "INTEGER", "{row}.Agent_ID"),
+        "values": [
+            ("Rentals", "INTEGER", "1"),
+            ("Rentals_Commission_Amount", "REAL", "{row}.Monthly_Rent * {row}.Commission / 100"),
+        ],
+    },
+    "Report_Property_Maintenance": {
+        "source": "MaintenanceRequests",
+        "key": ("Property_ID", "INTEGER", "{row}.Property_ID"),
+        "values": [
+            ("Requests", "INTEGER", "1"),
+            ("Open_Requests", "INTEGER", "{row}.Status != 'Resolved'"),
+            ("Total_Cost", "REAL", "{row}.Cost"),
+            ("Resolved_Requests", "INTEGER", "{row}.Date_Resolved IS NOT NULL"),
+            ("Resolve_Days", "REAL", "julianday({row}.Date_Resolved) - julianday({row}.Date_Submitted)"),
+        ],
+    },
+    "Report_Rent_Monthly": {
+        "source": "Rent_Payments",
+        "key": ("Month", "TEXT", "substr({row}.Payment_Date, 1, 7)"),
+        "values": [
+            ("Collected_Payments", "INTEGER", "{row}.Status = 'Completed'"),
+            ("Collected_Amount", "REAL", "CASE WHEN {row}.Status = 'Completed' THEN {row}.Payment_Amount END"),
+            ("Pending_Payments", "INTEGER", "{row}.Status = 'Pending'"),
+            ("Pending_Amount", "REAL", "CASE WHEN {row}.Status = 'Pending' THEN {row}.Payment_Amount END"),
+        ],
+    },
+}
+
+# Report name -> query over the summary tables
+reports = {
+    "occupancy": """
+SELECT Status, Properties, round(100.0 * Properties / (SELECT sum(Properties) FROM Report_Occupancy), 2) AS Percent
+FROM Report_Occupancy
+WHERE Properties > 0
+ORDER BY Status
+""",
+    "agent_revenue": """
+SELECT a.Agent_ID, a.F_Name, a.L_Name,
+    coalesce(s.Sales, 0) AS Sales,
+    coalesce(s.Sales_Volume, 0) AS Sales_Volume,
+    round(coalesce(s.Sales_Commission_Amount, 0), 2) AS Sales_Commission_Amount,
+    coalesce(r.Rentals, 0) AS Rentals,
+    round(coalesce(r.Rentals_Commission_Amount, 0), 2) AS Rentals_Commission_Amount,
+    round(coalesce(s.Sales_Commission_Amount, 0) + coalesce(r.Rentals_Commission_Amount, 0), 2) AS Commission_Revenue
+FROM Agents a
+LEFT JOIN Report_Agent_Sales s ON s.Agent_ID = a.Agent_ID
+LEFT JOIN Report_Agent_Rentals r ON r.Agent_ID = a.Agent_ID
+ORDER BY a.Agent_ID
+""",
+    "property_maintenance": """
+SELECT Property_ID, Requests, Open_Requests, round(Total_Cost, 2) AS Total_Cost,
+    round(Resolve_Days / nullif(Resolved_Requests, 0), 1) AS Avg_Days_To_Resolve
+FROM Report_Property_Maintenance
+WHERE Requests > 0
+ORDER BY Property_ID
+""",
+    "rent_by_month": """
+SELECT Month, Collected_Payments, round(Collected_Amount, 2) AS Collected_Amount,
+    Pending_Payments, round(Pending_Amount, 2) AS Pending_Amount
+FROM Report_Rent_Monthly
+WHERE Collected_Payments > 0 OR Pending_Payments > 0
+ORDER BY Month
+""",
+}
+
+
+def _value(expression, row):
+    return f"coalesce({expression.format(row=row)}, 0)"
+
+
+def create_sql(name):
+    summary = summaries[name]
+    key_name, key_type, _ = summary["key"]
+    columns = [f"    {key_name} {key_type} PRIMARY KEY"]
+    columns += [f"    {column} {column_type} NOT NULL DEFAULT 0" for column, column_type, _ in summary["values"]]
+    return f"CREATE TABLE {name} (\n" + ",\n".join(columns) + "\n)"
+
+
+# Aggregate of the whole source table
+def fill_sql(name):
+    summary = summaries[name]
+    source = summary["source"]
+    key_name, _, key = summary["key"]
+    names = [key_name] + [column for column, _, _ in summary["values"]]
+    values = [f"sum({_value(expression, source)})" for _, _, expression in summary["values"]]
+    return (
+        f"INSERT INTO {name} ({', '.join(names)})\n"
+        f"SELECT {key.format(row=source)}, {', '.join(values)}\nFROM {source}\nGROUP BY 1"
+    )
+
+
+# Statement adding (sign "+") or removing (sign "-") the contribution of one row
+def _apply_sql(name, row, sign):
+    summary = summaries[name]
+    key_name, _, key = summary["key"]
+    names = [key_name] + [column for column, _, _ in summary["values"]]
+    values = [key.format(row=row)] + [f"{sign}{_value(expression, row)}" for _, _, expression in summary["values"]]
+    updates = [f"{column} = {column} + excluded.{column}" for column, _, _ in summary["values"]]
+    return (
+        f"INSERT INTO {name} ({', '.join(names)}) VALUES ({', '.join(values)})\n"
+        f"    ON CONFLICT ({key_name}) DO UPDATE SET {', '.join(updates)};"
+    )
+
+
+def trigger_sql(name):
+    source = summaries[name]["source"]
+    return {
+        f"{name}_Insert": f"CREATE TRIGGER {name}_Insert AFTER INSERT ON {source} BEGIN\n{_apply_sql(name, 'NEW', '+')}\nEND",
+        f"{name}_Delete": f"CREATE TRIGGER {name}_Delete AFTER DELETE ON {source} BEGIN\n{_apply_sql(name, 'OLD', '-')}\nEND",
+        f"{name}_Update": (
+            f"CREATE TRIGGER {name}_Update AFTER UPDATE ON {source} BEGIN\n"
+            f"{_apply_sql(name, 'OLD', '-')}\n{_apply_sql(name, 'NEW', '+')}\nEND"
+        ),
+    }
+
+
+# Whether every summary table and trigger exists with its current definition, so
+# databases built with older summaries are rebuilt
+def installed(conn):
+    definitions = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'trigger')"))
+    return all(
+        definitions.get(name) == create_sql(name)
+        and all(definitions.get(trigger) == statement for trigger, statement in trigger_sql(name).items())
+        for name in summaries
+    )
+
+
+# (Re)build every summary table from its source table and install the triggers that
+# keep it current. Returns the seconds it took.
+def install(conn):
+    start = time.perf_counter()
+    with conn:
+        for name in summaries:
+            for trigger in trigger_sql(name):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute(create_sql(name))
+            conn.execute(fill_sql(name))
+            for statement in trigger_sql(name).values():
+                conn.execute(statement)
+    return time.perf_counter() - start
+
+
+# Column names and rows of a named report
+def run_report(conn, name):
+    if name not in reports:
+        raise ValueError(f"Unknown report {name!r}, expected one of {list(reports)}")
+    cursor = conn.execute(reports[name])
+    return [column[0] for column in cursor.description], cursor.fetchall()
@@ -0,0 +1,232 @@
+import sqlite3
+
+# Table definitions of the generated database, in load order. Foreign keys are
+# declared for documentation and PRAGMA foreign_key_check; SQLite only enforces them
+# with PRAGMA foreign_keys = ON, which the loader leaves off.
+tables = {
+    "Properties": """
+CREATE TABLE IF NOT EXISTS Properties (
+    Property_ID INTEGER PRIMARY KEY,
+    Address TEXT,
+    Type TEXT,
+    Status TEXT,
+    Price REAL,
+    Size INTEGER,
+    Year_Built INTEGER,
+    Bedrooms INTEGER,
+    Bathrooms INTEGER,
+    Latitude REAL,
+    Longitude REAL,
+    Region TEXT
+)
+""",
+    "Owners": """
+CREATE TABLE IF NOT EXISTS Owners (
+    Owner_ID INTEGER PRIMARY KEY,
+    F_Name TEXT,
+    L_Name TEXT,
+    Middle_Name TEXT,
+    Phone TEXT,
+    Email TEXT,
+    Date_Of_Birth DATE,
+    Address TEXT,
+    Latitude REAL,
+    Longitude REAL,
+    Region TEXT
+)
+""",
+    "Agents": """
+CREATE TABLE IF NOT EXISTS Agents (
+    Agent_ID INTEGER PRIMARY KEY,
+    F_Name TEXT,
+    L_Name TEXT,
+    Middle_Name TEXT,
+    Phone TEXT,
+    Email TEXT,
+    Agency TEXT,
+    Experience INTEGER,
+    Commission_Rate REAL
+)
+""",
+    "MaintenanceRequests": """
+CREATE TABLE IF NOT EXISTS MaintenanceRequests (
+    Request_ID INTEGER PRIMARY KEY,
+    Property_ID INTEGER REFERENCES Properties (Property_ID),
+    Date_Submitted DATE,
+    Issue_Description TEXT,
+    Status TEXT,
+    Date_Resolved DATE,
+    Cost REAL
+)
+""",
+    "Features": """
+CREATE TABLE IF NOT EXISTS Features (
+    Feature_ID INTEGER PRIMARY KEY,
+    Feature_Description TEXT,
+    Feature_Type TEXT,
+    Feature_Sub_Type TEXT
+)
+""",
+    "Sales": """
+CREATE TABLE IF NOT EXISTS Sales (
+    Sale_ID INTEGER PRIMARY KEY,
+    Property_ID INTEGER REFERENCES Properties (Property_ID),
+    Owner_ID INTEGER REFERENCES Owners (Owner_ID),
+    Sale_Date DATE,
+    Sale_Price REAL,
+    Agent_ID INTEGER REFERENCES Agents (Agent_ID),
+    Commission REAL,
+    Closing_Costs REAL
+)
+""",
+    "Tenants": """
+CREATE TABLE IF NOT EXISTS Tenants (
+    Tenant_ID INTEGER PRIMARY KEY,
+    F_Name TEXT,
+    L_Name TEXT,
+    Middle_Name TEXT,
+    Phone TEXT,
+    Email TEXT,
+    Date_Of_Birth DATE,
+    Address TEXT,
+    Latitude REAL,
+    Longitude REAL,
+    Region TEXT
+)
+""",
+    "Rentals": """
+CREATE TABLE IF NOT EXISTS Rentals (
+    Rental_ID INTEGER PRIMARY KEY,
+    Property_ID INTEGER REFERENCES Properties (Property_ID),
+    Tenant_ID INTEGER REFERENCES Tenants (Tenant_ID),
+    Start_Date DATE,
+    End_Date DATE,
+    Monthly_Rent REAL,
+    Security_Deposit REAL,
+    Agent_ID INTEGER REFERENCES Agents (Agent_ID),
+    Commission REAL
+)
+""",
+    "Rent_Payments": """
+CREATE TABLE IF NOT EXISTS Rent_Payments (
+    Payment_ID INTEGER PRIMARY KEY,
+    Rental_ID INTEGER REFERENCES Rentals (Rental_ID),
+    Payment_Amount REAL,
+    Payment_Date DATE,
+    Payment_Method TEXT,
+    Status TEXT,
+    Notes TEXT,
+    Tenant_ID INTEGER REFERENCES Tenants (Tenant_ID),
+    Property_ID INTEGER REFERENCES Properties (Property_ID)
+)
+""",
+    "Property_Features": """
+CREATE TABLE IF NOT EXISTS Property_Features (
+    Property_ID INTEGER REFERENCES Properties (Property_ID),
+    Feature_ID INTEGER REFERENCES Features (Feature_ID)
+)
+""",
+}
+
+# Column order of every table, as used by the INSERT statements
+columns = {
+    "Properties": ["Property_ID", "Address", "Type", "Status", "Price", "Size", "Year_Built", "Bedrooms", "Bathrooms", "Latitude", "Longitude", "Region"],
+    "Owners": ["Owner_ID", "F_Name", "L_Name", "Middle_Name", "Phone", "Email", "Date_Of_Birth", "Address", "Latitude", "Longitude", "Region"],
+    "Agents": ["Agent_ID", "F_Name", "L_Name", "Middle_Name", "Phone", "Email", "Agency", "Experience", "Commission_Rate"],
+    "MaintenanceRequests": ["Request_ID", "Property_ID", "Date_Submitted", "Issue_Description", "Status", "Date_Resolved", "Cost"],
+    "Features": ["Feature_ID", "Feature_Description", "Feature_Type", "Feature_Sub_Type"],
+    "Sales": ["Sale_ID", "Property_ID", "Owner_ID", "Sale_Date", "Sale_Price", "Agent_ID", "Commission", "Closing_Costs"],
+    "Tenants": ["Tenant_ID", "F_Name", "L_Name", "Middle_Name", "Phone", "Email", "Date_Of_Birth", "Address", "Latitude", "Longitude", "Region"],
+    "Rentals": ["Rental_ID", "Property_ID", "Tenant_ID", "Start_Date", "End_Date", "Monthly_Rent", "Security_Deposit", "Agent_ID", "Commission"],
+    "Rent_Payments": ["Payment_ID", "Rental_ID", "Payment_Amount", "Payment_Date", "Payment_Method", "Status", "Notes", "Tenant_ID", "Property_ID"],
+    "Property_Features": ["Property_ID", "Feature_ID"],
+}
+
+# Columns holding dates; generators keep them as epoch-day integers until write time
+date_columns = {"Date_Of_Birth", "Date_Submitted", "Date_Resolved", "Sale_Date", "Start_Date", "End_Date", "Payment_Date"}
+
+
+# Indexes created after the data is loaded: every foreign key column that queries
+# join on, plus the Status and date columns they filter on
+indexes = {
+    "Properties": [
+        "CREATE INDEX IF NOT EXISTS Properties_Status_Price ON Properties (Status, Price)",
+        "CREATE INDEX IF NOT EXISTS Properties_Type_Status ON Properties (Type, Status)",
+    ],
+    "MaintenanceRequests": [
+        "CREATE INDEX IF NOT EXISTS MaintenanceRequests_Property ON MaintenanceRequests (Property_ID)",
+        "CREATE INDEX IF NOT EXISTS MaintenanceRequests_Status_Submitted ON MaintenanceRequests (Status, Date_Submitted)",
+        "CREATE INDEX IF NOT EXISTS MaintenanceRequests_Submitted ON MaintenanceRequests (Date_Submitted)",
+    ],
+    "Sales": [
+        "CREATE INDEX IF NOT EXISTS Sales_Property ON Sales (Property_ID)",
+        "CREATE INDEX IF NOT EXISTS Sales_Owner ON Sales (Owner_ID)",
+        "CREATE INDEX IF NOT EXISTS Sales_Agent ON Sales (Agent_ID)",
+        "CREATE INDEX IF NOT EXISTS Sales_Date ON Sales (Sale_Date)",
+    ],
+    "Rentals": [
+        "CREATE INDEX IF NOT EXISTS Rentals_Property ON Rentals (Property_ID)",
+        "CREATE INDEX IF NOT EXISTS Rentals_Tenant ON Rentals (Tenant_ID)",
+        "CREATE INDEX IF NOT EXISTS Rentals_Agent ON Rentals (Agent_ID)",
+        "CREATE INDEX IF NOT EXISTS Rentals_Start ON Rentals (Start_Date)",
+        "CREATE INDEX IF NOT EXISTS Rentals_End ON Rentals (End_Date)",
+    ],
+    "Rent_Payments": [
+        "CREATE INDEX IF NOT EXISTS Rent_Payments_Rental ON Rent_Payments (Rental_ID)",
+        "CREATE INDEX IF NOT EXISTS Rent_Payments_Tenant ON Rent_Payments (Tenant_ID)",
+        "CREATE INDEX IF NOT EXISTS Rent_Payments_Property_Date ON Rent_Payments (Property_ID, Payment_Date)",
+        "CREATE INDEX IF NOT EXISTS Rent_Payments_Status_Date ON Rent_Payments (Status, Payment_Date)",
+        "CREATE INDEX IF NOT EXISTS Rent_Payments_Date ON Rent_Payments (Payment_Date)",
+    ],
+    "Property_Features": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS Property_Features_Pair ON Property_Features (Property_ID, Feature_ID)",
+        "CREATE INDEX IF NOT EXISTS Property_Features_Feature ON Property_Features (Feature_ID, Property_ID)",
+    ],
+}
+
+
+# Columns with REAL affinity, which SQLite stores as floats even when given integers
+def real_columns(table):
+    return {name for name, declared in declared_types[table].items() if any(word in declared for word in ("REAL", "FLOA", "DOUB"))}
+
+
+# Declared type of every column, as SQLite reads it from the table definitions
+def _declared_types():
+    conn = sqlite3.connect(":memory:")
+    try:
+        types = {}
+        for table, statement in tables.items():
+            conn.execute(statement)
+            types[table] = {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+        return types
+    finally:
+        conn.close()
+
+
+declared_types = _declared_types()
+
+
+# (table, column, referenced table, referenced column) of every declared foreign key
+def _foreign_keys():
+    conn = sqlite3.connect(":memory:")
+    try:
+        keys = []
+        for table, statement in tables.items():
+            conn.execute(statement)
+            keys += [(table, row[3], row[2], row[4]) for row in conn.execute(f"PRAGMA foreign_key_list({table})")]
+        return keys
+    finally:
+        conn.close()
+
+
+foreign_keys = _foreign_keys()
+
+
+def index_names():
+    return [statement.split(" IF NOT EXISTS ")[1].split()[0] for statements in indexes.values() for statement in statements]
+
+
+def insert_sql(table, into=None, verb="INSERT"):
+    names = columns[table]
+    placeholders = ", ".join("?" for _ in names)
+    return f"{verb} INTO {into or table} ({', '.join(names)})\nVALUES ({placeholders})"
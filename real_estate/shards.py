@@ -0,0 +1,138 @@
+import argparse
+import sqlite3
+
+from . import tables
+from .config import Scale
+from .loader import Loader, target_database
+
+# Sharded builds. Shard k of n generates the k-th contiguous block of chunks of every
+# table. Row IDs are positions in the whole dataset, so every shard gets disjoint ID
+# ranges of Properties, Owners, Agents, Tenants, MaintenanceRequests, Sales, Rentals
+# and Rent_Payments, and references such as Sales -> Owner or Rentals -> Tenant point
+# to rows that another shard may hold. Each chunk draws from a random stream derived
+# from the master seed, so the merged shards hold exactly the rows of a single build
+# with the same seed, scale and chunk size.
+#
+# Every shard file records its build parameters in Shard_Info; the merge checks that
+# all shards of one build are present and agree on them.
+
+INFO_TABLE = "Shard_Info"
+
+# Build parameters that must be equal across the shards of one build
+SHARED_INFO = ["seed", "factor", "chunk_size", "locale", "pool_size", "pool_seed", "shard_count"]
+
+
+class Shard:
+    def __init__(self, index, count):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Shard must be k/n with 0 <= k < n, got {index}/{count}")
+        self.index = index
+        self.count = count
+
+    # Shards are written "k/n"
+    @classmethod
+    def parse(cls, text):
+        index, _, count = text.partition("/")
+        return cls(int(index), int(count))
+
+    def __repr__(self):
+        return f"Shard({self.index}/{self.count})"
+
+    # This shard's block of range(total_chunks)
+    def chunk_range(self, total_chunks):
+        return range(self.index * total_chunks // self.count, (self.index + 1) * total_chunks // self.count)
+
+
+def write_info(conn, scale, shard):
+    info = {
+        "seed": scale.seed,
+        "factor": scale.factor,
+        "chunk_size": scale.chunk_size,
+        "locale": scale.locale,
+        "pool_size": scale.pool_size,
+        "pool_seed": scale.pool_seed,
+        "shard_index": shard.index,
+        "shard_count": shard.count,
+    }
+    with conn:
+        conn.execute(f"DROP TABLE IF EXISTS {INFO_TABLE}")
+        conn.execute(f"CREATE TABLE {INFO_TABLE} (Key TEXT PRIMARY KEY, Value TEXT)")
+        conn.executemany(f"INSERT INTO {INFO_TABLE} VALUES (?, ?)", [(key, str(value)) for key, value in info.items()])
+
+
+def read_info(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute(f"SELECT Key, Value FROM {INFO_TABLE}").fetchall())
+    except sqlite3.OperationalError:
+        raise ValueError(f"{path} is not a shard database") from None
+    finally:
+        conn.close()
+
+
+# Shard files ordered by shard index, after checking they form one complete build
+def ordered_shards(paths):
+    infos = {path: read_info(path) for path in paths}
+    first = next(iter(infos.values()))
+    for path, info in infos.items():
+        different = [key for key in SHARED_INFO if info[key] != first[key]]
+        if different:
+            raise ValueError(f"{path} belongs to another build ({', '.join(different)} differ)")
+
+    by_index = {int(info["shard_index"]): path for path, info in infos.items()}
+    count = int(first["shard_count"])
+    missing = sorted(set(range(count)) - set(by_index))
+    if missing or len(by_index) != len(paths):
+        raise ValueError(f"Expected shards 0..{count - 1} once each, missing {missing}")
+    return [by_index[index] for index in range(count)]
+
+
+# Combine the shard files of one build into db_name with ATTACH and INSERT ... SELECT,
+# then build the indexes and the derived structures once. Returns the load report.
+def merge_shards(db_name, paths, if_exists="replace"):
+    from .build import install_derived
+
+    paths = ordered_shards(paths)
+
+    with target_database(db_name, if_exists) as conn:
+        with Loader(conn, if_exists) as loader:
+            for path in paths:
+                loader.attach(path, "shard")
+                for table in tables.load_order:
+                    loader.copy_table(table, "shard")
+                loader.detach("shard")
+        install_derived(conn, loader.report)
+    return loader.report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build one shard of a dataset, or merge shard files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build shard k of n into its own database file")
+    build.add_argument("db")
+    build.add_argument("--shard", required=True, type=Shard.parse, help="k/n, counting from 0")
+    build.add_argument("--seed", required=True, type=int, help="master seed shared by all shards")
+    build.add_argument("--scale", type=float, default=1.0)
+    build.add_argument("--chunk-size", type=int)
+    build.add_argument("--workers", type=int, default=1)
+
+    merge = commands.add_parser("merge", help="merge all shard files of a build")
+    merge.add_argument("db")
+    merge.add_argument("shards", nargs="+")
+    merge.add_argument("--if-exists", default="replace")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        from .build import create_database
+
+        options = {"chunk_size": args.chunk_size} if args.chunk_size else {}
+        scale = Scale(args.scale, seed=args.seed, **options)
+        report = create_database(args.db, scale, args.workers, "replace", shard=args.shard)
+    else:
+        report = merge_shards(args.db, args.shards, args.if_exists)
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+
+from . import build, spec
+from .config import Scale
+from .pools import default_cache_dir
+
+# Snapshot cache of finished databases. Generation is deterministic, so a database is
+# fully described by its build parameters (seed, scale factor, chunk size, name pools)
+# and by the code that generates and lays it out. A snapshot is stored under a key
+# hashed from both; asking again for the same database copies the snapshot instead of
+# generating it. Snapshots are built in memory and written out with the SQLite backup
+# API, and the cache is bounded in bytes by evicting the least recently used ones.
+
+# Bumped whenever the snapshot file layout changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+# Modules whose code decides the rows, schema or derived structures of a database;
+# a change to any of them changes the schema version
+_sources = ["build", "columnar", "config", "data", "loader", "payments", "permutation", "pools", "schema", "spec", "tables", "vectorized"]
+_derived = [module for module, _ in build.derived]
+
+
+def default_snapshot_dir():
+    return os.path.join(default_cache_dir(), "snapshots")
+
+
+# Hash of the table definitions, the derived structures and the generator code
+def schema_version():
+    digest = hashlib.sha256(f"snapshot-v{SNAPSHOT_FORMAT_VERSION}".encode())
+    package = os.path.dirname(os.path.abspath(spec.__file__))
+    for name in sorted(_sources + [module.__name__.rpartition(".")[2] for module in _derived]):
+        with open(os.path.join(package, f"{name}.py"), "rb") as source:
+            digest.update(name.encode() + b"\0" + source.read())
+    return digest.hexdigest()
+
+
+# Build parameters a database is generated from
+def parameters(scale):
+    return {
+        "seed": scale.seed,
+        "factor": float(scale.factor),
+        "chunk_size": scale.chunk_size,
+        "locale": scale.locale,
+        "pool_size": scale.pool_size,
+        "pool_seed": scale.pool_seed,
+    }
+
+
+def snapshot_key(scale):
+    fingerprint = json.dumps({**parameters(scale), "schema_version": schema_version()}, sort_keys=True)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+
+
+class SnapshotCache:
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_snapshot_dir()
+        self.max_bytes = max_bytes
+
+    def path(self, scale):
+        return os.path.join(self.directory, f"snapshot-{snapshot_key(scale)}.db")
+
+    # Snapshot files, least recently used first; a file's mtime is its last use
+    def entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.startswith("snapshot-") and name.endswith(".db")]
+        stats = [(path, os.stat(path)) for path in paths]
+        return [(path, stat.st_size, stat.st_mtime) for path, stat in sorted(stats, key=lambda entry: entry[1].st_mtime)]
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    # Path of the snapshot of this scale, built on a miss. Returns (path, hit).
+    def get(self, scale, workers=1, in_memory=True):
+        if not scale.explicit_seed:
+            raise ValueError("Snapshots need an explicit seed; one picked at random is never asked for again")
+        path = self.path(scale)
+        if os.path.exists(path):
+            os.utime(path)
+            return path, True
+        self.store(scale, path, workers, in_memory)
+        return path, False
+
+    # Build the snapshot, in memory and then backed up to disk, or directly on disk
+    # for databases that do not fit in memory
+    def store(self, scale, path, workers=1, in_memory=True):
+        os.makedirs(self.directory, exist_ok=True)
+        # Written under a temporary name so concurrent readers never see a partial file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        if in_memory:
+            memory = sqlite3.connect(":memory:")
+            try:
+                build.build_database(memory, scale, workers)
+                target = sqlite3.connect(temporary)
+                try:
+                    memory.backup(target)
+                finally:
+                    target.close()
+            finally:
+                memory.close()
+        else:
+            build.create_database(temporary, scale, workers, "replace")
+        os.replace(temporary, path)
+        self.evict(keep=path)
+
+    # Remove the least recently used snapshots until the cache fits in max_bytes; the
+    # snapshot just stored is kept even when it alone is larger
+    def evict(self, keep=None):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+            removed.append(path)
+        return removed
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.remove(path)
+
+
+# Make db_name the database of this scale: a file copy of its snapshot, built first on
+# a miss. Returns True on a cache hit.
+def create_database(db_name, scale, workers=1, cache=None, in_memory=True):
+    path, hit = (cache or SnapshotCache()).get(scale, workers, in_memory)
+    temporary = f"{db_name}.{os.getpid()}.copying"
+    shutil.copyfile(path, temporary)
+    os.replace(temporary, db_name)
+    return hit
+
+
+# An in-memory connection holding the database of this scale, restored from its
+# snapshot with the backup API
+def connect(scale, workers=1, cache=None, in_memory=True):
+    path, _ = (cache or SnapshotCache()).get(scale, workers, in_memory)
+    source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn = sqlite3.connect(":memory:")
+    try:
+        source.backup(conn)
+    finally:
+        source.close()
+    return conn
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create databases from a cache of finished snapshots")
+    parser.add_argument("db", nargs="?", help="database to create from the snapshot")
+    parser.add_argument("--seed", type=int, help="required unless --list or --clear")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--on-disk", action="store_true", help="build a missing snapshot on disk instead of in memory")
+    parser.add_argument("--cache-dir", help=f"default: {default_snapshot_dir()}")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="cache size bound")
+    parser.add_argument("--list", action="store_true", help="list the cached snapshots")
+    parser.add_argument("--clear", action="store_true", help="remove every cached snapshot")
+    args = parser.parse_args(argv)
+
+    cache = SnapshotCache(args.cache_dir, args.max_bytes)
+    if args.clear:
+        cache.clear()
+    if args.list:
+        for path, size, used in reversed(cache.entries()):
+            print(f"{os.path.basename(path)}  {size / 1024**2:10.1f} MiB  last used {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(used))}")
+        print(f"{cache.size() / 1024**2:.1f} of {cache.max_bytes / 1024**2:.1f} MiB")
+    if args.list or args.clear:
+        return 0
+    if args.db is None or args.seed is None:
+        parser.error("db and --seed are required")
+
+    options = {"chunk_size": args.chunk_size} if args.chunk_size else {}
+    scale = Scale(args.scale, seed=args.seed, **options)
+    start = time.perf_counter()
+    hit = create_database(args.db, scale, args.workers, cache, not args.on_disk)
+    print(f"{args.db}: {scale}, {'copied from the snapshot' if hit else 'built and cached'} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,504 @@
+import numpy as np
+
+from . import data, schema
+from .columnar import NULL_DAY, Categorical
+from .config import (
+    AGENT_ID_START,
+    OWNER_ID_START,
+    PROPERTY_ID_START,
+    RENTAL_ID_START,
+    REQUEST_ID_START,
+    SALE_ID_START,
+    TENANT_ID_START,
+)
+from .permutation import Permutation
+from .vectorized import cycled_ids, days_from_parts, person_columns, random_days, uniform_cents
+
+# Declarative description of the generated tables: how many rows each has, and for
+# every column the distribution its values are drawn from, including how foreign
+# keys spread over the rows of the table they refer to. The spec is compiled once
+# into a plan of batched column generators; generating a chunk runs them in order
+# over numpy arrays, so a table or distribution is added by describing it here
+# instead of writing a generator function.
+#
+# Columns are listed in the order they are generated, which is the order they draw
+# from the chunk's random stream; a column can depend on columns listed before it.
+# Names starting with "_" are helper columns that are not written. A tuple of names
+# is a generator producing several columns at once. Bounds and counts can be
+# functions of the Scale.
+#
+# Rent_Payments is not described here: its rows follow the lease calendar kept by
+# payments.PaymentSchedule.
+
+
+def _resolve(value, scale):
+    return value(scale) if callable(value) else value
+
+
+# Values of a column equal to `value`; categorical columns compare their categories
+def equals(column, value):
+    if isinstance(column, Categorical):
+        categories = column.categories.tolist()
+        return column.codes == categories.index(value) if value in categories else np.zeros(len(column), dtype=bool)
+    return column == value
+
+
+# State of the chunk being generated, passed to every column generator
+class Chunk:
+    def __init__(self, context, table, start, stop, rng):
+        self.scale = context.scale
+        self.partition = context.partition
+        self.pool = context.pool
+        self.table = table
+        self.start = start
+        self.stop = stop
+        self.size = stop - start
+        self.rng = rng
+        self.columns = {}
+
+
+# Column generators. compile() checks the generator against the spec and returns
+# the function producing its values for a chunk.
+class Generator:
+    # Most rows one generation unit produces
+    rows_per_unit = 1
+
+    # Columns of the same table this generator reads
+    def references(self):
+        return []
+
+    def compile(self, plan, table, names):
+        raise NotImplementedError
+
+
+# Consecutive IDs from id_start: the table's key
+class Key(Generator):
+    def __init__(self, id_start):
+        self.id_start = id_start
+
+    def compile(self, plan, table, names):
+        return lambda chunk: np.arange(self.id_start + chunk.start, self.id_start + chunk.stop)
+
+
+# Uniform integers between low and high, both included
+class Integers(Generator):
+    def __init__(self, low, high, dtype=np.int64):
+        self.low = low
+        self.high = high
+        self.dtype = dtype
+
+    def compile(self, plan, table, names):
+        def generate(chunk):
+            low, high = _resolve(self.low, chunk.scale), _resolve(self.high, chunk.scale)
+            return chunk.rng.integers(low, high, chunk.size, endpoint=True, dtype=self.dtype)
+        return generate
+
+
+# Uniform reals between low and high, optionally rounded
+class Uniform(Generator):
+    def __init__(self, low, high, decimals=None):
+        self.low = low
+        self.high = high
+        self.decimals = decimals
+
+    def compile(self, plan, table, names):
+        if self.decimals == 2:
+            return lambda chunk: uniform_cents(chunk.rng, self.low, self.high, chunk.size)
+        if self.decimals is not None:
+            return lambda chunk: np.round(chunk.rng.uniform(self.low, self.high, chunk.size), self.decimals)
+        return lambda chunk: chunk.rng.uniform(self.low, self.high, chunk.size)
+
+
+# Uniform dates from Jan 1 of start_year to Dec 31 of end_year
+class Dates(Generator):
+    def __init__(self, start_year, end_year):
+        self.start_year = start_year
+        self.end_year = end_year
+
+    def compile(self, plan, table, names):
+        return lambda chunk: random_days(chunk.rng, self.start_year, self.end_year, chunk.size)
+
+
+# Dates in one year with uniform months and days of month, both (low, high) ranges
+class MonthDays(Generator):
+    def __init__(self, year, months, days):
+        self.year = year
+        self.months = months
+        self.days = days
+
+    def compile(self, plan, table, names):
+        def generate(chunk):
+            months = chunk.rng.integers(*self.months, chunk.size, endpoint=True)
+            days = chunk.rng.integers(*self.days, chunk.size, endpoint=True)
+            return days_from_parts(self.year, months, days)
+        return generate
+
+
+# NULL: the NULL day for dates, NaN for numbers
+class Null(Generator):
+    def compile(self, plan, table, names):
+        if names[0] in schema.date_columns:
+            return lambda chunk: np.full(chunk.size, NULL_DAY, dtype=np.int32)
+        return lambda chunk: np.full(chunk.size, np.nan)
+
+
+# Uniformly chosen values, dictionary-encoded
+class Choice(Generator):
+    def __init__(self, values):
+        self.values = np.array(values, dtype=object)
+
+    def compile(self, plan, table, names):
+        return lambda chunk: Categorical(chunk.rng.integers(0, len(self.values), chunk.size), self.values)
+
+
+# values[column % len(values)]: cycles through the values along an integer column
+class Cycle(Generator):
+    def __init__(self, values, column):
+        self.values = np.array(values, dtype=object)
+        self.column = column
+
+    def references(self):
+        return [self.column]
+
+    def compile(self, plan, table, names):
+        return lambda chunk: Categorical(chunk.columns[self.column] % len(self.values), self.values)
+
+
+# `then` where column == value, `otherwise` elsewhere. Both are drawn for every row,
+# so the random stream does not depend on the condition.
+class Where(Generator):
+    def __init__(self, column, value, then, otherwise):
+        self.column = column
+        self.value = value
+        self.then = then
+        self.otherwise = otherwise
+
+    def references(self):
+        return [self.column] + self.then.references() + self.otherwise.references()
+
+    def compile(self, plan, table, names):
+        then = self.then.compile(plan, table, names)
+        otherwise = self.otherwise.compile(plan, table, names)
+
+        def generate(chunk):
+            condition = equals(chunk.columns[self.column], self.value)
+            return np.where(condition, then(chunk), otherwise(chunk))
+        return generate
+
+
+# One of `values` where column == value and `otherwise` elsewhere; only the rows
+# that match draw a value
+class ChoiceWhere(Generator):
+    def __init__(self, column, value, values, otherwise):
+        self.column = column
+        self.value = value
+        self.categories = np.array([otherwise] + list(values), dtype=object)
+
+    def references(self):
+        return [self.column]
+
+    def compile(self, plan, table, names):
+        def generate(chunk):
+            condition = equals(chunk.columns[self.column], self.value)
+            codes = np.zeros(chunk.size, dtype=np.int64)
+            codes[condition] = 1 + chunk.rng.integers(0, len(self.categories) - 1, int(condition.sum()))
+            return Categorical(codes, self.categories)
+        return generate
+
+
+# Another column plus a drawn amount (dates plus days, prices plus costs)
+class Offset(Generator):
+    def __init__(self, column, amount):
+        self.column = column
+        self.amount = amount
+
+    def references(self):
+        return [self.column] + self.amount.references()
+
+    def compile(self, plan, table, names):
+        amount = self.amount.compile(plan, table, names)
+        return lambda chunk: chunk.columns[self.column] + amount(chunk)
+
+
+# Another column times a drawn factor, optionally rounded
+class Scaled(Generator):
+    def __init__(self, column, factor, decimals=None):
+        self.column = column
+        self.factor = factor
+        self.decimals = decimals
+
+    def references(self):
+        return [self.column] + self.factor.references()
+
+    def compile(self, plan, table, names):
+        factor = self.factor.compile(plan, table, names)
+
+        def generate(chunk):
+            values = chunk.columns[self.column] * factor(chunk)
+            return values if self.decimals is None else np.round(values, self.decimals)
+        return generate
+
+
+# True for `count` rows of the table placed at random: the first `count` positions of
+# a seeded shuffle of all rows
+class Share(Generator):
+    def __init__(self, count):
+        self.count = count
+
+    def compile(self, plan, table, names):
+        stream = f"{table}:{names[0].lstrip('_')}"
+
+        def generate(chunk):
+            shuffle = Permutation(plan[table].unit_count(chunk.scale), chunk.scale.derive_seed(stream))
+            return shuffle.index_array(np.arange(chunk.start, chunk.stop)) < _resolve(self.count, chunk.scale)
+        return generate
+
+
+# Owned/Rented/Available status of the properties in the key column, from the
+# property partition
+class PartitionStatus(Generator):
+    def __init__(self, key):
+        self.key = key
+
+    def references(self):
+        return [self.key]
+
+    def compile(self, plan, table, names):
+        statuses = np.array(data.property_statuses, dtype=object)
+        return lambda chunk: Categorical(chunk.partition.status_codes(chunk.columns[self.key]), statuses)
+
+
+# Foreign key into `parent`. Cardinalities:
+#   "uniform"   every row picks a parent uniformly at random
+#   "balanced"  every parent is used rows // parents or one more times, in random
+#               order (the original script's repeat-and-shuffle lists)
+#   "owned", "rented"  every owned (rented) property exactly once, in the order of
+#               the property partition; the table has one row per such property
+class ForeignKey(Generator):
+    cardinalities = ["uniform", "balanced", "owned", "rented"]
+
+    def __init__(self, parent, cardinality):
+        if cardinality not in self.cardinalities:
+            raise ValueError(f"Unknown cardinality {cardinality!r}, expected one of {self.cardinalities}")
+        self.parent = parent
+        self.cardinality = cardinality
+
+    def compile(self, plan, table, names):
+        if self.parent not in plan:
+            raise ValueError(f"{table}.{names[0]} refers to {self.parent}, which is not in the spec")
+        parent = plan[self.parent]
+        id_start = parent.id_start()
+        if self.cardinality in ("owned", "rented"):
+            if self.parent != "Properties":
+                raise ValueError(f"{table}.{names[0]}: {self.cardinality!r} keys refer to Properties")
+            if self.cardinality == "owned":
+                return lambda chunk: chunk.partition.owned_ids(chunk.start, chunk.stop)
+            return lambda chunk: chunk.partition.rented_ids(chunk.start, chunk.stop)
+        if self.cardinality == "uniform":
+            return lambda chunk: chunk.rng.integers(id_start, id_start + parent.unit_count(chunk.scale) - 1, chunk.size, endpoint=True)
+
+        return lambda chunk: self.balanced_ids(plan, table, chunk.scale, chunk.start, chunk.stop)
+
+    # IDs of a balanced key for the rows start..stop of `table`. They do not depend on
+    # the chunk's random stream, so other tables can look them up.
+    def balanced_ids(self, plan, table, scale, start, stop):
+        parent = plan[self.parent]
+        stream = f"{table}:{self.parent.lower()}"
+        return cycled_ids(scale, stream, plan[table].unit_count(scale), parent.unit_count(scale), parent.id_start(), start, stop)
+
+
+# F_Name, L_Name, Middle_Name, Phone and Email of people, from the name pools
+class Person(Generator):
+    def compile(self, plan, table, names):
+        return lambda chunk: person_columns(chunk.pool, chunk.rng, chunk.size)
+
+
+# Address, Latitude, Longitude and Region, from the address pools
+class Address(Generator):
+    def compile(self, plan, table, names):
+        return lambda chunk: chunk.pool.address_columns(chunk.rng, chunk.size)
+
+
+# Junction rows: every row of `parent` is linked to between low and high distinct
+# rows of the static table `child`, chosen at random. Produces (parent key, child
+# key) pairs, so it is the only generator of its table.
+class Sets(Generator):
+    def __init__(self, parent, child, low, high):
+        self.parent = parent
+        self.child = child
+        self.low = low
+        self.high = high
+        self.rows_per_unit = high
+
+    def compile(self, plan, table, names):
+        id_start = plan[self.parent].id_start()
+        child_ids = np.array([row[0] for row in plan[self.child].spec.rows])
+
+        def generate(chunk):
+            counts = chunk.rng.integers(self.low, self.high, chunk.size, endpoint=True)
+            # A random ordering of the children per parent row; each keeps its first `count`
+            picks = chunk.rng.random((chunk.size, len(child_ids))).argsort(axis=1)[:, :self.high]
+            kept = np.arange(self.high) < counts[:, None]
+            return {
+                names[0]: np.repeat(np.arange(id_start + chunk.start, id_start + chunk.stop), counts),
+                names[1]: child_ids[picks[kept]],
+            }
+        return generate
+
+
+PERSON = ("F_Name", "L_Name", "Middle_Name", "Phone", "Email")
+ADDRESS = ("Address", "Latitude", "Longitude", "Region")
+
+
+# A table: the Scale attribute counting its generation units (rows, or parent rows
+# for Sets) and its generated columns, or fixed rows
+class Table:
+    def __init__(self, units=None, columns=(), rows=None):
+        self.units = units
+        self.columns = list(columns)
+        self.rows = rows
+
+
+tables = {
+    "Properties": Table("properties", [
+        ("Property_ID", Key(PROPERTY_ID_START)),
+        ("Type", Choice(data.property_types)),
+        ("Status", PartitionStatus("Property_ID")),
+        # Rented properties carry a monthly rent, the others a sale price
+        ("Price", Where("Status", "Rented", Integers(1000, 5000), Integers(200_000, 2_000_000))),
+        # Commercial properties are larger
+        ("Size", Where("Type", "Residential", Integers(70, 500), Integers(100, 1000))),
+        (ADDRESS, Address()),
+        ("Year_Built", Integers(2000, 2010)),
+        ("Bedrooms", Integers(1, 4)),
+        ("Bathrooms", Integers(1, 3)),
+    ]),
+    "Owners": Table("owners", [
+        ("Owner_ID", Key(OWNER_ID_START)),
+        (PERSON, Person()),
+        ("Date_Of_Birth", Dates(1975, 2000)),
+        (ADDRESS, Address()),
+    ]),
+    "Agents": Table("agents", [
+        ("Agent_ID", Key(AGENT_ID_START)),
+        (PERSON, Person()),
+        ("Agency", Choice(data.agency_choices)),
+        ("Experience", Integers(1, 10)),
+        ("Commission_Rate", Uniform(4, 7, decimals=2)),
+    ]),
+    "MaintenanceRequests": Table("maintenance_requests", [
+        ("Request_ID", Key(REQUEST_ID_START)),
+        ("_open", Share(lambda scale: scale.open_maintenance_requests)),
+        # Open requests were submitted between September and December 2024
+        ("Date_Submitted", Where("_open", True, MonthDays(2024, (9, 12), (1, 28)), Dates(2005, 2024))),
+        ("Date_Resolved", Where("_open", True, Null(), Offset("Date_Submitted", Integers(7, 60, dtype=np.int32)))),
+        ("Status", ChoiceWhere("_open", True, data.open_maintenance_statuses, otherwise="Resolved")),
+        ("Property_ID", ForeignKey("Properties", "uniform")),
+        ("Issue_Description", Cycle(data.issue_descriptions, "Request_ID")),
+        ("Cost", Uniform(100, 1000, decimals=2)),
+    ]),
+    "Features": Table(rows=data.features),
+    "Sales": Table("owned", [
+        ("Sale_ID", Key(SALE_ID_START)),
+        ("Property_ID", ForeignKey("Properties", "owned")),
+        ("Owner_ID", ForeignKey("Owners", "balanced")),
+        ("Agent_ID", ForeignKey("Agents", "balanced")),
+        ("Sale_Price", Integers(200_000, 2_000_000)),
+        ("Sale_Date", Dates(2002, 2024)),
+        ("Commission", Uniform(4, 10, decimals=2)),  # Commission range 4% to 10%
+        ("Closing_Costs", Offset("Sale_Price", Uniform(1000, 3000))),  # Closing costs > sale price by 1000 to 3000
+    ]),
+    "Tenants": Table("tenants", [
+        ("Tenant_ID", Key(TENANT_ID_START)),
+        (PERSON, Person()),
+        ("Date_Of_Birth", Dates(1975, 2005)),
+        (ADDRESS, Address()),
+    ]),
+    "Rentals": Table("rented", [
+        ("Rental_ID", Key(RENTAL_ID_START)),
+        ("Property_ID", ForeignKey("Properties", "rented")),
+        ("Tenant_ID", ForeignKey("Tenants", "balanced")),
+        ("Start_Date", Dates(2002, 2024)),
+        ("Monthly_Rent", Integers(1000, 5000)),
+        ("End_Date", Offset("Start_Date", Integers(90, 365, dtype=np.int32))),  # 3 months to 1 year later
+        ("Security_Deposit", Scaled("Monthly_Rent", Uniform(1, 2), decimals=2)),  # 1x to 2x monthly rent
+        ("Agent_ID", ForeignKey("Agents", "uniform")),
+        ("Commission", Uniform(4, 10, decimals=2)),  # Commission between 4% and 10%
+    ]),
+    "Property_Features": Table("properties", [
+        (("Property_ID", "Feature_ID"), Sets("Properties", "Features", data.min_features_per_property, data.max_features_per_property)),
+    ]),
+}
+
+
+# A table of the spec compiled into its column generators
+class TablePlan:
+    def __init__(self, table, spec):
+        self.table = table
+        self.spec = spec
+        self.steps = []
+
+    def unit_count(self, scale):
+        return 1 if self.spec.rows is not None else getattr(scale, self.spec.units)
+
+    # Units per chunk, so a chunk holds at most chunk_size rows
+    def units_per_chunk(self, scale):
+        rows_per_unit = max((generator.rows_per_unit for _, generator in self.spec.columns), default=1)
+        return max(1, scale.chunk_size // rows_per_unit)
+
+    def id_start(self):
+        generator = self.spec.columns[0][1] if self.spec.columns else None
+        if not isinstance(generator, Key):
+            raise ValueError(f"{self.table} has no Key column to refer to")
+        return generator.id_start
+
+    # Columns of the chunk covering units start..stop, by name
+    def generate(self, context, start, stop, rng):
+        if self.spec.rows is not None:
+            return {name: np.array(values, dtype=object) for name, values in zip(schema.columns[self.table], zip(*self.spec.rows))}
+        chunk = Chunk(context, self.table, start, stop, rng)
+        for names, generate in self.steps:
+            values = generate(chunk)
+            if len(names) == 1:
+                chunk.columns[names[0]] = values
+            else:
+                chunk.columns.update({name: values[name] for name in names})
+        return chunk.columns
+
+
+# Compile the spec, checking that every table produces exactly its schema columns
+# and that columns only depend on columns generated before them
+def compile_plan(spec=tables):
+    plan = {table: TablePlan(table, table_spec) for table, table_spec in spec.items()}
+    for table, table_plan in plan.items():
+        expected = schema.columns[table]
+        if table_plan.spec.rows is not None:
+            if any(len(row) != len(expected) for row in table_plan.spec.rows):
+                raise ValueError(f"{table}: every row must have the columns {expected}")
+            continue
+        generated = []
+        for names, generator in table_plan.spec.columns:
+            names = names if isinstance(names, tuple) else (names,)
+            if isinstance(generator, Sets) and len(table_plan.spec.columns) > 1:
+                raise ValueError(f"{table}: Sets must be the only generator of its table")
+            missing = [column for column in generator.references() if column not in generated]
+            if missing:
+                raise ValueError(f"{table}.{names[0]} depends on {missing}, which must be generated before it")
+            table_plan.steps.append((names, generator.compile(plan, table, names)))
+            generated += names
+        written = [name for name in generated if not name.startswith("_")]
+        if sorted(written) != sorted(expected):
+            raise ValueError(f"{table} generates {written}, expected the columns {expected}")
+    return plan
+
+
+plan = compile_plan()
+
+
+# Values of the balanced foreign key `column` of `table` for its rows start..stop,
+# such as the tenant of every rental
+def balanced_ids(scale, table, column, start, stop):
+    for names, generator in tables[table].columns:
+        if names == column and isinstance(generator, ForeignKey) and generator.cardinality == "balanced":
+            return generator.balanced_ids(plan, table, scale, start, stop)
+    raise ValueError(f"{table}.{column} is not a balanced foreign key")
@@ -0,0 +1,109 @@
+from . import payments
+from .permutation import PropertyPartition
+from .pools import load_pool
+from .columnar import ColumnTable
+from .spec import plan
+from .vectorized import chunk_rng
+
+# Every table is generated in chunks that are independent of each other: a chunk only
+# needs the scale, its chunk index and the shared partition and name pools. Chunks can
+# therefore be produced in any order or process and still give the same rows. What
+# the rows hold is described by the spec (spec.py).
+
+# Generation dependencies. "partition" is the owned/rented/available split, which is
+# derived from the seed alone and rebuilt wherever it is needed.
+dependencies = {
+    "Properties": ["partition"],
+    "Owners": [],
+    "Agents": [],
+    "MaintenanceRequests": [],
+    "Features": [],
+    "Sales": ["partition"],
+    "Tenants": [],
+    "Rentals": ["partition"],
+    "Rent_Payments": ["partition"],
+    "Property_Features": [],
+}
+
+stages = {"partition"}
+
+
+# Tables in an order that respects the dependency graph, ties broken by the order of
+# `dependencies` (the order the original script created them in)
+def generation_order(graph=dependencies):
+    order, done = [], set(stages)
+    pending = list(graph)
+    while pending:
+        ready = [table for table in pending if all(dependency in done for dependency in graph[table])]
+        if not ready:
+            raise ValueError(f"Circular table dependencies between {pending}")
+        table = ready[0]
+        order.append(table)
+        done.add(table)
+        pending.remove(table)
+    return order
+
+
+load_order = generation_order()
+
+
+# Shared state chunks are generated from: the scale, the property partition, the
+# name pools and, built on first use, the rent payment schedule
+class Context:
+    def __init__(self, scale):
+        self.scale = scale
+        self.partition = PropertyPartition(scale)
+        self.pool = load_pool(scale.locale, scale.pool_seed, scale.pool_size)
+        self._schedule = None
+
+    @property
+    def schedule(self):
+        if self._schedule is None:
+            self._schedule = payments.PaymentSchedule(self)
+        return self._schedule
+
+
+# Number of generation units (rows, payment days for Rent_Payments, properties for
+# Property_Features) of a table
+def unit_count(scale, table):
+    if table == "Rent_Payments":
+        return payments.payment_day_count() if scale.rented else 0
+    return plan[table].unit_count(scale)
+
+
+# Generation units per chunk, chosen so a chunk holds at most scale.chunk_size rows
+def units_per_chunk(scale, table):
+    if table == "Rent_Payments":
+        return payments.days_per_chunk(scale)
+    return plan[table].units_per_chunk(scale)
+
+
+def chunk_count(scale, table):
+    return len(range(0, unit_count(scale, table), units_per_chunk(scale, table)))
+
+
+# Chunk indexes of a table generated by this run: all of them, or the contiguous
+# block that belongs to `shard`
+def chunk_indexes(scale, table, shard=None):
+    count = chunk_count(scale, table)
+    return shard.chunk_range(count) if shard is not None else range(count)
+
+
+# One chunk of a table as a ColumnTable
+def generate_chunk(context, table, chunk_index):
+    if table == "Rent_Payments":
+        return ColumnTable(table, context.schedule.chunk_at(chunk_index))
+    if table not in plan:
+        raise ValueError(f"Unknown table {table}")
+    size = units_per_chunk(context.scale, table)
+    start = chunk_index * size
+    stop = min(start + size, unit_count(context.scale, table))
+    rng = chunk_rng(context.scale, table, chunk_index)
+    return ColumnTable(table, plan[table].generate(context, start, stop, rng))
+
+
+# Every (table, chunk_index) task of a run, in load order
+def tasks(scale, order=load_order, shard=None):
+    for table in order:
+        for chunk_index in chunk_indexes(scale, table, shard):
+            yield table, chunk_index
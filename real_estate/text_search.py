@@ -0,0 +1,150 @@
+import argparse
+import re
+import sqlite3
+import time
+
+# Full-text search over the free-text columns. Each searchable table has an FTS5
+# index over some of its columns, stored as an external-content table: the index
+# holds only the tokens and reads the text back from the table it indexes, so the
+# text is not stored twice. The indexes are built in bulk when installed and
+# afterwards kept current by triggers, like the report summaries. Searches are
+# ranked by bm25 and return the matching rows of the indexed table, best first.
+#
+# Words are stemmed (porter) and every word of a free-text search also matches as a
+# prefix, so "leak" finds "Leaky toilet tank" and "Water damage from a leak".
+
+# FTS5 table -> (indexed table, key column, indexed columns)
+indexes = {
+    "Maintenance_Search": ("MaintenanceRequests", "Request_ID", ["Issue_Description"]),
+    "Property_Search": ("Properties", "Property_ID", ["Address"]),
+    "Owner_Search": ("Owners", "Owner_ID", ["F_Name", "Middle_Name", "L_Name", "Address"]),
+    "Tenant_Search": ("Tenants", "Tenant_ID", ["F_Name", "Middle_Name", "L_Name", "Address"]),
+    "Payment_Search": ("Rent_Payments", "Payment_ID", ["Notes"]),
+}
+
+TOKENIZER = "porter unicode61"
+DEFAULT_LIMIT = 20
+
+
+def _index(table):
+    for name, (source, _, _) in indexes.items():
+        if source == table:
+            return name
+    raise ValueError(f"No text index on {table!r}, expected one of {[source for source, _, _ in indexes.values()]}")
+
+
+def create_sql(name):
+    source, key, columns = indexes[name]
+    return (
+        f"CREATE VIRTUAL TABLE {name} USING fts5({', '.join(columns)}, "
+        f"content='{source}', content_rowid='{key}', tokenize='{TOKENIZER}')"
+    )
+
+
+# Index every row of the indexed table
+def fill_sql(name):
+    return f"INSERT INTO {name} ({name}) VALUES ('rebuild')"
+
+
+def _add_sql(name, row):
+    _, key, columns = indexes[name]
+    values = ", ".join(f"{row}.{column}" for column in columns)
+    return f"INSERT INTO {name} (rowid, {', '.join(columns)}) VALUES ({row}.{key}, {values});"
+
+
+# External-content indexes are told the old values of the row they drop
+def _remove_sql(name, row):
+    _, key, columns = indexes[name]
+    values = ", ".join(f"{row}.{column}" for column in columns)
+    return f"INSERT INTO {name} ({name}, rowid, {', '.join(columns)}) VALUES ('delete', {row}.{key}, {values});"
+
+
+def trigger_sql(name):
+    source, key, columns = indexes[name]
+    return {
+        f"{name}_Insert": f"CREATE TRIGGER {name}_Insert AFTER INSERT ON {source} BEGIN\n{_add_sql(name, 'NEW')}\nEND",
+        f"{name}_Delete": f"CREATE TRIGGER {name}_Delete AFTER DELETE ON {source} BEGIN\n{_remove_sql(name, 'OLD')}\nEND",
+        f"{name}_Update": (
+            f"CREATE TRIGGER {name}_Update AFTER UPDATE OF {', '.join([key] + columns)} ON {source} BEGIN\n"
+            f"{_remove_sql(name, 'OLD')}\n{_add_sql(name, 'NEW')}\nEND"
+        ),
+    }
+
+
+def installed(conn):
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    return all(name in names and set(trigger_sql(name)) <= names for name in indexes)
+
+
+# (Re)build every text index from its table and install the triggers that keep it
+# current. Returns the seconds it took.
+def install(conn):
+    start = time.perf_counter()
+    with conn:
+        for name in indexes:
+            for trigger in trigger_sql(name):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute(create_sql(name))
+            conn.execute(fill_sql(name))
+            for statement in trigger_sql(name).values():
+                conn.execute(statement)
+    return time.perf_counter() - start
+
+
+# FTS5 query matching rows that contain every word of `text`, each as a prefix;
+# punctuation and FTS5 operators in the text are taken as separators
+def match_query(text):
+    words = re.findall(r"\w+", text)
+    if not words:
+        raise ValueError(f"Nothing to search for in {text!r}")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+# Column names and the best `limit` rows of `table` matching `text` (ties in key
+# order), with their bm25 score (lower is better) as a last Score column. With
+# raw=True the text is an FTS5 query (phrases, OR, NOT, NEAR, column filters)
+# instead of free text.
+def search(conn, table, text, limit=DEFAULT_LIMIT, raw=False):
+    name = _index(table)
+    source, key, _ = indexes[name]
+    cursor = conn.execute(
+        f"SELECT t.*, s.rank AS Score\nFROM {name} s\nJOIN {source} t ON t.{key} = s.rowid\n"
+        f"WHERE {name} MATCH ?\nORDER BY s.rank, s.rowid\nLIMIT ?",
+        (text if raw else match_query(text), limit),
+    )
+    return [column[0] for column in cursor.description], cursor.fetchall()
+
+
+# Number of rows of `table` matching `text`
+def count(conn, table, text, raw=False):
+    name = _index(table)
+    return conn.execute(f"SELECT count(*) FROM {name} WHERE {name} MATCH ?", (text if raw else match_query(text),)).fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ranked full-text search of maintenance issues, addresses, names and payment notes")
+    parser.add_argument("db")
+    parser.add_argument("text")
+    parser.add_argument("--table", default="MaintenanceRequests", choices=[source for source, _, _ in indexes.values()])
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--raw", action="store_true", help="TEXT is an FTS5 query")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        start = time.perf_counter()
+        columns, rows = search(conn, args.table, args.text, args.limit, args.raw)
+        total = count(conn, args.table, args.text, args.raw)
+        seconds = time.perf_counter() - start
+    finally:
+        conn.close()
+
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if value is None else str(value) for value in row))
+    print(f"{len(rows)} of {total} matching rows in {seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+import argparse
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import data, schema
+
+# Referential-integrity and consistency checks of a generated (or advanced) database.
+# Every rule is one set-based query selecting the rows that break it: foreign keys
+# are anti-joins against the referenced primary key, the business rules are filters
+# and grouped aggregates answered from the indexes the loader creates. No rule reads
+# a row more than once, so a check costs about one pass over the tables it touches.
+# Rules run concurrently, each on its own read-only connection. Only the standard
+# library is imported, so the validator starts quickly.
+
+DEFAULT_SAMPLES = 5
+
+
+# SQL list of string literals
+def _in(values):
+    return "(" + ", ".join("'" + value.replace("'", "''") + "'" for value in values) + ")"
+
+
+def _foreign_key_rules():
+    rules = {}
+    for table, column, parent, key in sorted(schema.foreign_keys, key=lambda fk: (list(schema.tables).index(fk[0]), schema.columns[fk[0]].index(fk[1]))):
+        row_key = schema.columns[table][0] if table != "Property_Features" else "rowid"
+        rules[f"{table}.{column}"] = (
+            f"{column} refers to an existing {parent} row",
+            f"SELECT c.{row_key}, c.{column} FROM {table} c\n"
+            f"WHERE c.{column} IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {parent} p WHERE p.{key} = c.{column})",
+        )
+    return rules
+
+
+# Rule name -> (description, query selecting the rows that break the rule). Conditions
+# are wrapped in coalesce(..., 0) so that NULLs count as violations; CROSS JOIN keeps
+# the large table as the outer loop, read in rowid order instead of through an index.
+rules = {
+    **_foreign_key_rules(),
+    "payment_matches_rental": (
+        "Rent_Payments have the tenant and property of their rental",
+        """
+        SELECT p.Payment_ID, p.Rental_ID FROM Rent_Payments p
+        CROSS JOIN Rentals r ON r.Rental_ID = p.Rental_ID
+        WHERE p.Tenant_ID IS NOT r.Tenant_ID OR p.Property_ID IS NOT r.Property_ID
+        """,
+    ),
+    "payment_within_rental": (
+        "Rent_Payments are dated after the Start_Date of their rental and no later than its End_Date",
+        """
+        SELECT p.Payment_ID, p.Payment_Date, r.Start_Date, r.End_Date FROM Rent_Payments p
+        CROSS JOIN Rentals r ON r.Rental_ID = p.Rental_ID
+        WHERE NOT coalesce(p.Payment_Date > r.Start_Date AND p.Payment_Date <= r.End_Date, 0)
+        """,
+    ),
+    "payment_status_notes": (
+        "Completed payments have a method and completed notes, pending ones no method and pending notes",
+        f"""
+        SELECT Payment_ID, Status, Payment_Method, Notes FROM Rent_Payments
+        WHERE NOT coalesce(
+            Status = 'Completed' AND Payment_Method IN {_in(data.payment_methods)} AND Notes IN {_in(data.completed_payment_notes)}
+            OR Status = 'Pending' AND Payment_Method IS NULL AND Notes IN {_in(data.pending_payment_notes)}, 0)
+        """,
+    ),
+    "request_status": (
+        "Resolved maintenance requests have a Date_Resolved, open ones none",
+        f"""
+        SELECT Request_ID, Status, Date_Resolved FROM MaintenanceRequests
+        WHERE NOT coalesce(
+            Status = 'Resolved' AND Date_Resolved IS NOT NULL
+            OR Status IN {_in(data.open_maintenance_statuses)} AND Date_Resolved IS NULL, 0)
+        """,
+    ),
+    "request_resolved_after_submitted": (
+        "Date_Resolved is after Date_Submitted",
+        """
+        SELECT Request_ID, Date_Submitted, Date_Resolved FROM MaintenanceRequests
+        WHERE Date_Resolved IS NOT NULL AND NOT coalesce(Date_Resolved > Date_Submitted, 0)
+        """,
+    ),
+    "rental_end_after_start": (
+        "Rentals end after they start",
+        "SELECT Rental_ID, Start_Date, End_Date FROM Rentals WHERE NOT coalesce(End_Date > Start_Date, 0)",
+    ),
+    "rented_have_rentals": (
+        "Rented properties have a rental",
+        """
+        SELECT p.Property_ID FROM Properties p
+        WHERE p.Status = 'Rented' AND NOT EXISTS (SELECT 1 FROM Rentals r WHERE r.Property_ID = p.Property_ID)
+        """,
+    ),
+    "property_partition": (
+        "Owned properties have a sale and no rental, rented ones a rental and no sale, available ones neither",
+        """
+        SELECT p.Property_ID, p.Status FROM Properties p
+        WHERE p.Status IS NOT CASE
+            EXISTS (SELECT 1 FROM Sales s WHERE s.Property_ID = p.Property_ID)
+            + 2 * EXISTS (SELECT 1 FROM Rentals r WHERE r.Property_ID = p.Property_ID)
+            WHEN 0 THEN 'Available' WHEN 1 THEN 'Owned' WHEN 2 THEN 'Rented' END
+        """,
+    ),
+    "single_sale_or_rental": (
+        "A property is sold at most once and rented at most once",
+        """
+        SELECT 'Sales', Property_ID, count(*) FROM Sales GROUP BY Property_ID HAVING count(*) > 1
+        UNION ALL
+        SELECT 'Rentals', Property_ID, count(*) FROM Rentals GROUP BY Property_ID HAVING count(*) > 1
+        """,
+    ),
+    "features_per_property": (
+        f"Every property has {data.min_features_per_property} to {data.max_features_per_property} distinct features",
+        f"""
+        SELECT p.Property_ID, count(f.Feature_ID) FROM Properties p
+        LEFT JOIN Property_Features f ON f.Property_ID = p.Property_ID
+        GROUP BY p.Property_ID
+        HAVING count(f.Feature_ID) NOT BETWEEN {data.min_features_per_property} AND {data.max_features_per_property}
+            OR count(f.Feature_ID) != count(DISTINCT f.Feature_ID)
+        """,
+    ),
+}
+
+
+def connect_read_only(path):
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+
+# (violations, sample rows, seconds) of one rule
+def check(conn, name, samples=DEFAULT_SAMPLES):
+    _, sql = rules[name]
+    start = time.perf_counter()
+    violations = conn.execute(f"SELECT count(*) FROM ({sql})").fetchone()[0]
+    rows = conn.execute(f"{sql}\nLIMIT ?", (samples,)).fetchall() if violations and samples else []
+    return violations, rows, time.perf_counter() - start
+
+
+# Rule name -> (violations, sample rows, seconds) of the database at `path`, for every
+# rule or those in `names`
+def validate(path, names=None, samples=DEFAULT_SAMPLES, workers=None):
+    names = list(rules) if names is None else names
+    unknown = [name for name in names if name not in rules]
+    if unknown:
+        raise ValueError(f"Unknown rules {unknown}, expected some of {list(rules)}")
+
+    def run(name):
+        conn = connect_read_only(path)
+        try:
+            return check(conn, name, samples)
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max(1, min(workers or os.cpu_count() or 1, len(names)))) as executor:
+        return dict(zip(names, executor.map(run, names)))
+
+
+def format_results(results):
+    width = max(len(name) for name in results)
+    lines = [f"{'Rule':<{width}}  {'Violations':>10}  {'Seconds':>8}"]
+    for name, (violations, rows, seconds) in results.items():
+        lines.append(f"{name:<{width}}  {violations:>10,}  {seconds:>8.3f}")
+        lines += [f"{'':<{width}}    {row}" for row in rows]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check foreign keys and business rules of a generated database")
+    parser.add_argument("db")
+    parser.add_argument("--rule", action="append", choices=list(rules), help="rule to check (repeatable, default all)")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="violating rows to show per rule")
+    parser.add_argument("--workers", type=int, default=None, help="rules checked concurrently (default: CPU count)")
+    parser.add_argument("--list", action="store_true", help="list the rules and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (description, _) in rules.items():
+            print(f"{name}: {description}")
+        return 0
+
+    start = time.perf_counter()
+    results = validate(args.db, args.rule, args.samples, args.workers)
+    print(format_results(results))
+    failed = sum(1 for violations, _, _ in results.values() if violations)
+    print(f"{failed} of {len(results)} rules violated, checked in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
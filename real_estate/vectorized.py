@@ -0,0 +1,89 @@
+import numpy as np
+
+from . import data
+from .columnar import Categorical
+from .permutation import Permutation
+
+# Batch generation engine: every column of a chunk is drawn at once with numpy and
+# dates stay epoch-day integers until the chunk is turned into rows for SQLite.
+# Each chunk has its own random stream derived from the seed, table and chunk number,
+# so a chunk can be regenerated on its own and the output does not depend on the
+# order in which chunks are produced.
+
+issue_descriptions = np.array(data.issue_descriptions, dtype=object)
+open_maintenance_statuses = np.array(data.open_maintenance_statuses, dtype=object)
+email_domains = np.array(data.email_domains, dtype=object)
+
+
+def epoch_day(year, month=1, day=1):
+    return int(np.datetime64(f"{year:04d}-{month:02d}-{day:02d}", "D").astype(np.int64))
+
+
+# Uniform dates between Jan 1 of start_year and Dec 31 of end_year, like random_date()
+def random_days(rng, start_year, end_year, size):
+    return rng.integers(epoch_day(start_year), epoch_day(end_year, 12, 31), size, endpoint=True, dtype=np.int32)
+
+
+# Epoch days of given year/month/day arrays
+def days_from_parts(years, months, days):
+    month_index = (np.asarray(years) - 1970) * 12 + (np.asarray(months) - 1)
+    first_of_month = month_index.astype("datetime64[M]").astype("datetime64[D]").astype(np.int32)
+    return first_of_month + (np.asarray(days, dtype=np.int32) - 1)
+
+
+# Random values rounded to cents, like round(random.uniform(low, high), 2)
+def uniform_cents(rng, low, high, size):
+    return np.round(rng.uniform(low, high, size), 2)
+
+
+def chunk_rng(scale, table, chunk_index):
+    return np.random.default_rng(scale.derive_seed(f"numpy:{table}:{chunk_index}"))
+
+
+# (chunk_index, start, stop) offsets covering `total` rows
+def chunk_bounds(total, chunk_size):
+    for chunk_index, start in enumerate(range(0, total, chunk_size)):
+        yield chunk_index, start, min(start + chunk_size, total)
+
+
+# Spread `count` rows over `pool_size` IDs the way the original repeat-and-shuffle
+# lists did: every ID is used count // pool_size or one more times, in random order.
+# Returns the IDs for positions start..stop.
+def cycled_ids(scale, name, count, pool_size, id_start, start, stop):
+    permutation = Permutation(count, scale.derive_seed(name))
+    return id_start + permutation.take(np.arange(start, stop)) % pool_size
+
+
+# Numbers as an object array of str, ready for elementwise string concatenation
+def as_text(numbers):
+    return np.asarray(numbers).astype(str).astype(object)
+
+
+# Function to generate random American phone numbers
+def generate_phone(rng, size):
+    return (
+        "(" + as_text(rng.integers(100, 999, size, endpoint=True))
+        + ") " + as_text(rng.integers(100, 999, size, endpoint=True))
+        + "-" + as_text(rng.integers(1000, 9999, size, endpoint=True))
+    )
+
+
+# Function to generate emails from lowercased name arrays
+def generate_email(rng, first_names_lower, middle_names_lower):
+    size = len(first_names_lower)
+    domains = email_domains[rng.integers(0, len(email_domains), size)]
+    random_digits = as_text(rng.integers(10, 9999, size, endpoint=True))
+    return first_names_lower + "." + middle_names_lower + "." + random_digits + "@" + domains
+
+
+# Name, contact and address columns shared by Owners, Agents and Tenants
+def person_columns(pool, rng, size):
+    first, last, middle = pool.names(rng, size)
+    return {
+        "F_Name": Categorical(first, pool.first_names),
+        "L_Name": Categorical(last, pool.last_names),
+        "Middle_Name": Categorical(middle, pool.first_names),
+        "Phone": generate_phone(rng, size),
+        "Email": generate_email(rng, pool.first_names_lower[first], pool.first_names_lower[middle]),
+    }
+
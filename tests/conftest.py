@@ -0,0 +1,43 @@
+import shutil
+
+import pytest
+
+from real_estate.build import create_database
+from real_estate.config import Scale
+
+# A small build split into several chunks per table, so chunk boundaries and shards
+# are exercised
+SCALE_FACTOR = 0.5
+SEED = 11
+CHUNK_SIZE = 200
+
+
+# Name pools and snapshots are cached in a directory of the test session instead of
+# the user's cache
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("cache")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("REAL_ESTATE_CACHE_DIR", str(path))
+        yield path
+
+
+@pytest.fixture(scope="session")
+def scale():
+    return Scale(SCALE_FACTOR, seed=SEED, chunk_size=CHUNK_SIZE)
+
+
+# Path of a freshly generated database, built once per session; tests that write to
+# it take a copy (see database_copy)
+@pytest.fixture(scope="session")
+def database(tmp_path_factory, cache_dir, scale):
+    path = str(tmp_path_factory.mktemp("database") / "real_estate.db")
+    create_database(path, scale, if_exists="replace")
+    return path
+
+
+@pytest.fixture
+def database_copy(database, tmp_path):
+    path = str(tmp_path / "copy.db")
+    shutil.copyfile(database, path)
+    return path
@@ -0,0 +1,59 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from real_estate.advance import PAYMENT_INTERVAL, State, advance
+
+
+@pytest.fixture
+def conn(database_copy):
+    conn = sqlite3.connect(database_copy)
+    yield conn
+    conn.close()
+
+
+def _date(day):
+    return str(np.datetime64(day, "D"))
+
+
+def _set_lease(conn, rental_id, start_day, end_day):
+    with conn:
+        conn.execute("UPDATE Rentals SET Start_Date = ?, End_Date = ? WHERE Rental_ID = ?", (_date(start_day), _date(end_day), rental_id))
+
+
+def _payment_dates(conn, rental_id, after_id):
+    rows = conn.execute("SELECT Payment_Date FROM Rent_Payments WHERE Rental_ID = ? AND Payment_ID > ? ORDER BY Payment_ID", (rental_id, after_id))
+    return [row[0] for row in rows]
+
+
+def test_new_payments_lie_inside_their_rental(conn):
+    last_id = conn.execute("SELECT max(Payment_ID) FROM Rent_Payments").fetchone()[0]
+    advance(conn, months=3, seed=5)
+    outside = conn.execute(
+        """
+        SELECT count(*) FROM Rent_Payments p JOIN Rentals r ON r.Rental_ID = p.Rental_ID
+        WHERE p.Payment_ID > ? AND NOT (p.Payment_Date > r.Start_Date AND p.Payment_Date <= r.End_Date
+            AND CAST(julianday(p.Payment_Date) - julianday(r.Start_Date) AS INTEGER) % ? = 0)
+        """,
+        (last_id, PAYMENT_INTERVAL),
+    ).fetchone()[0]
+    assert outside == 0
+
+
+def test_leases_stop_paying_at_their_end_date(conn):
+    clock = State(conn).clock
+    ended, ending, running = [row[0] for row in conn.execute("SELECT Rental_ID FROM Rentals ORDER BY Rental_ID LIMIT 3")]
+    # Ended the day before the period, ends after its second interval of the period,
+    # and runs past both advances
+    _set_lease(conn, ended, clock - 100, clock)
+    _set_lease(conn, ending, clock - 10, clock + 2 * PAYMENT_INTERVAL)
+    _set_lease(conn, running, clock - 10, clock + 200)
+    last_id = conn.execute("SELECT max(Payment_ID) FROM Rent_Payments").fetchone()[0]
+
+    advance(conn, months=1, seed=5)
+    advance(conn, months=2, seed=5)
+
+    assert _payment_dates(conn, ended, last_id) == []
+    assert _payment_dates(conn, ending, last_id) == [_date(clock - 10 + k * PAYMENT_INTERVAL) for k in (1, 2)]
+    assert _payment_dates(conn, running, last_id) == [_date(clock - 10 + k * PAYMENT_INTERVAL) for k in (1, 2, 3)]
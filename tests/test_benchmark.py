@@ -0,0 +1,16 @@
+import sqlite3
+
+from real_estate import schema
+from real_estate.benchmark import run_tier
+
+
+def test_run_tier_loads_the_rows_of_a_build(database, scale, tmp_path):
+    phases = {phase["phase"]: phase for phase in run_tier(scale, str(tmp_path))}
+    conn = sqlite3.connect(database)
+    try:
+        for table in schema.tables:
+            rows = conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            assert phases[f"insert:{table}"]["rows"] == rows, table
+    finally:
+        conn.close()
+    assert phases["export:csv"]["rows"] == sum(phases[f"insert:{table}"]["rows"] for table in schema.tables)
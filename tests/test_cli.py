@@ -0,0 +1,35 @@
+import pytest
+
+from real_estate.cli import main
+
+
+def test_append_returns_the_exit_status(database_copy, capsys):
+    assert main(["append", database_copy, "--months", "2", "--seed", "5"]) == 0
+    assert f"{database_copy} advanced to 2025-02-28" in capsys.readouterr().out
+
+
+def test_validate_returns_the_exit_status(database, capsys):
+    assert main(["validate", database]) == 0
+    assert "0 of" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("options, message", [
+    ([], "--snapshot needs --seed"),
+    (["--seed", "1", "--export", "out.csv"], "cannot be combined with --export"),
+    (["--seed", "1", "--if-exists", "append"], "cannot append"),
+])
+def test_snapshot_option_errors(tmp_path, capsys, options, message):
+    with pytest.raises(SystemExit) as exit:
+        main(["generate", str(tmp_path / "db.db"), "--snapshot", *options])
+    assert exit.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_query_limit_applies_to_reports(database, capsys):
+    main(["query", database, "--report", "rent_by_month"])
+    all_rows = capsys.readouterr().out.splitlines()[1:]
+    assert len(all_rows) > 2
+    main(["query", database, "--report", "rent_by_month", "--limit", "2"])
+    assert capsys.readouterr().out.splitlines()[1:] == all_rows[:2]
+    main(["query", database, "SELECT Rental_ID FROM Rentals ORDER BY Rental_ID", "--limit", "3"])
+    assert len(capsys.readouterr().out.splitlines()) == 1 + 3
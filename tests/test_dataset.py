@@ -0,0 +1,70 @@
+import os
+import sqlite3
+
+import pytest
+
+from real_estate.dataset import pruning, scan
+from real_estate.export import export_database, partitioned_tables
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(scope="module")
+def dataset(database, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("dataset") / "real_estate")
+    conn = sqlite3.connect(database)
+    try:
+        export_database(conn, path, "parquet-dataset")
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture
+def conn(database):
+    conn = sqlite3.connect(database)
+    yield conn
+    conn.close()
+
+
+def _keys(conn, sql, params=()):
+    return sorted(row[0] for row in conn.execute(sql, params))
+
+
+def test_tables_are_written_by_year(dataset, conn):
+    assert os.path.isfile(os.path.join(dataset, "Properties.parquet"))
+    years = sorted(name for name in os.listdir(os.path.join(dataset, "Sales")))
+    expected = [f"year={year}" for year in _keys(conn, "SELECT DISTINCT CAST(substr(Sale_Date, 1, 4) AS INTEGER) FROM Sales")]
+    assert years == expected
+    assert all(name.startswith("month=") for name in os.listdir(os.path.join(dataset, "Rent_Payments", years[-1])))
+
+
+def test_scans_return_every_row(dataset, conn):
+    for table in partitioned_tables:
+        key = conn.execute(f"SELECT * FROM {table} LIMIT 0").description[0][0]
+        assert sorted(scan(dataset, table, [key]).column(key).to_pylist()) == _keys(conn, f"SELECT {key} FROM {table}"), table
+
+
+def test_filters_match_sql(dataset, conn):
+    found = scan(dataset, "Rent_Payments", ["Payment_ID"], start="2015-03-01", end="2016-02-29", status="Completed")
+    expected = _keys(
+        conn,
+        "SELECT Payment_ID FROM Rent_Payments WHERE Payment_Date BETWEEN ? AND ? AND Status = 'Completed'",
+        ("2015-03-01", "2016-02-29"),
+    )
+    assert expected and sorted(found.column("Payment_ID").to_pylist()) == expected
+
+    property_ids = _keys(conn, "SELECT Property_ID FROM Sales ORDER BY Sale_ID LIMIT 3")
+    found = scan(dataset, "Sales", ["Sale_ID"], property_ids=property_ids, end="2030-01-01")
+    assert sorted(found.column("Sale_ID").to_pylist()) == _keys(
+        conn, f"SELECT Sale_ID FROM Sales WHERE Property_ID IN ({', '.join('?' * len(property_ids))})", property_ids
+    )
+    with pytest.raises(ValueError, match="not partitioned"):
+        scan(dataset, "Properties", start="2020-01-01")
+
+
+def test_date_ranges_prune_partitions(dataset):
+    read_files, files, read_row_groups, row_groups = pruning(dataset, "Rent_Payments", start="2020-01-01", end="2020-12-31")
+    assert 0 < read_files <= 12 < files
+    assert 0 < read_row_groups < row_groups
+    assert pruning(dataset, "Rent_Payments")[:2] == (files, files)
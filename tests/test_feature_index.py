@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from real_estate import feature_index
+from real_estate.feature_index import FeatureIndex
+
+
+@pytest.fixture
+def conn(database_copy):
+    conn = sqlite3.connect(database_copy)
+    yield conn
+    conn.close()
+
+
+# Property_IDs having every feature in `features`, by self-joining Property_Features
+def _self_join(conn, features, where="", params=()):
+    joins = "".join(
+        f" JOIN Property_Features f{i} ON f{i}.Property_ID = p.Property_ID AND f{i}.Feature_ID = ?" for i in range(len(features))
+    )
+    sql = f"SELECT DISTINCT p.Property_ID FROM Properties p{joins} WHERE 1 {where} ORDER BY p.Property_ID"
+    return [row[0] for row in conn.execute(sql, (*features, *params))]
+
+
+def _feature_ids(conn):
+    return [row[0] for row in conn.execute("SELECT Feature_ID FROM Features ORDER BY Feature_ID")]
+
+
+def test_feature_sets_match_the_self_join(conn):
+    index = FeatureIndex.load(conn)
+    ids = _feature_ids(conn)
+    assert _self_join(conn, ids[:1])
+    for features in [ids[:1], ids[1:3], [ids[0], ids[5]], [ids[2], ids[7], ids[9]]]:
+        assert index.search(all_features=features).tolist() == _self_join(conn, features)
+
+
+def test_filters_match_sql(conn):
+    index = FeatureIndex.load(conn)
+    features = _feature_ids(conn)[:1]
+    expected = _self_join(
+        conn, features, "AND p.Type = ? AND p.Status = ? AND p.Price <= ? AND p.Bedrooms >= ?", ("Residential", "Owned", 1_000_000, 2)
+    )
+    found = index.search(all_features=features, type="Residential", status="Owned", price=(None, 1_000_000), bedrooms=(2, None))
+    assert found.tolist() == expected
+    assert index.count(type="No such type") == 0
+
+
+def test_exclusion_and_any(conn):
+    index = FeatureIndex.load(conn)
+    first, second = _feature_ids(conn)[:2]
+    having_first = set(_self_join(conn, [first]))
+    having_second = set(_self_join(conn, [second]))
+    assert set(index.search(any_features=[first, second]).tolist()) == having_first | having_second
+    assert set(index.search(all_features=[first], no_features=[second]).tolist()) == having_first - having_second
+
+
+def test_triggers_keep_the_index_current(conn):
+    first, second = _feature_ids(conn)[:2]
+    property_id = _self_join(conn, [first])[0]
+    with conn:
+        conn.execute("DELETE FROM Property_Features WHERE Property_ID = ? AND Feature_ID = ?", (property_id, first))
+        conn.execute("DELETE FROM Property_Features WHERE Property_ID = ? AND Feature_ID = ?", (property_id, second))
+        conn.execute("INSERT INTO Property_Features (Property_ID, Feature_ID) VALUES (?, ?)", (property_id, second))
+    assert feature_index.installed(conn)
+    index = FeatureIndex.load(conn)
+    for features in [[first], [second], [first, second]]:
+        assert index.search(all_features=features).tolist() == _self_join(conn, features)
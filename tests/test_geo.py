@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+
+from real_estate import geo
+
+
+@pytest.fixture
+def conn(database_copy):
+    conn = sqlite3.connect(database_copy)
+    yield conn
+    conn.close()
+
+
+def _scan_box(conn, table, key, min_lat, max_lat, min_lon, max_lon):
+    rows = conn.execute(
+        f"SELECT {key} FROM {table} WHERE Latitude BETWEEN ? AND ? AND Longitude BETWEEN ? AND ? ORDER BY {key}",
+        (min_lat, max_lat, min_lon, max_lon),
+    )
+    return [row[0] for row in rows]
+
+
+# Boxes around the continental US, a state-sized area and an empty stretch of ocean
+BOXES = [(24.0, 50.0, -125.0, -66.0), (36.0, 42.0, -110.0, -100.0), (-10.0, 10.0, -40.0, -20.0)]
+
+
+def test_box_queries_match_a_scan(conn):
+    assert geo.installed(conn)
+    assert _scan_box(conn, "Properties", "Property_ID", *BOXES[0])
+    for table, key in geo.locations.values():
+        for box in BOXES:
+            columns, rows = geo.within_box(conn, *box, table=table)
+            assert [row[columns.index(key)] for row in rows] == _scan_box(conn, table, key, *box), (table, box)
+    assert geo.within_box(conn, *BOXES[0], limit=3)[1] == geo.within_box(conn, *BOXES[0])[1][:3]
+
+
+def test_radius_and_nearest_match_distances(conn):
+    lat, lon = 39.0, -98.0
+    points = conn.execute("SELECT Property_ID, Latitude, Longitude FROM Properties").fetchall()
+    distances = sorted((geo.distance_km(lat, lon, point_lat, point_lon), key) for key, point_lat, point_lon in points)
+
+    columns, rows = geo.within_radius(conn, lat, lon, 500)
+    assert [row[0] for row in rows] == [key for distance, key in distances if distance <= 500]
+    assert rows and all(row[-1] <= 500 for row in rows)
+
+    columns, rows = geo.nearest(conn, lat, lon, 7)
+    assert [row[0] for row in rows] == [key for _, key in distances[:7]]
+
+
+def test_triggers_keep_the_index_current(conn):
+    box = BOXES[2]
+    with conn:
+        conn.execute("UPDATE Properties SET Latitude = 0.5, Longitude = -30.5 WHERE Property_ID = 1")
+        conn.execute("DELETE FROM Owners WHERE Owner_ID = (SELECT min(Owner_ID) FROM Owners)")
+    _, rows = geo.within_box(conn, *box)
+    assert [row[0] for row in rows] == [1]
+    owner_count = conn.execute("SELECT count(*) FROM Owners WHERE Latitude IS NOT NULL").fetchone()[0]
+    assert len(geo.within_box(conn, -90, 90, -180, 180, table="Owners")[1]) == owner_count
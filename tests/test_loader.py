@@ -0,0 +1,26 @@
+import os
+import sqlite3
+
+import pytest
+
+from real_estate.loader import target_database
+
+
+def test_replace_swaps_in_the_loaded_file(tmp_path):
+    db_name = str(tmp_path / "real_estate.db")
+    sqlite3.connect(db_name).close()
+    with target_database(db_name, "replace") as conn:
+        conn.execute("CREATE TABLE Loaded (x)")
+    assert os.listdir(tmp_path) == ["real_estate.db"]
+    conn = sqlite3.connect(db_name)
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == [("Loaded",)]
+    conn.close()
+
+
+def test_failed_replace_removes_the_loading_file(tmp_path):
+    db_name = str(tmp_path / "real_estate.db")
+    with pytest.raises(RuntimeError):
+        with target_database(db_name, "replace") as conn:
+            conn.execute("CREATE TABLE Loaded (x)")
+            raise RuntimeError("load failed")
+    assert os.listdir(tmp_path) == []
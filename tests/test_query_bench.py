@@ -0,0 +1,35 @@
+import sqlite3
+
+import pytest
+
+from real_estate import schema
+from real_estate.query_bench import full_scans, queries, run_queries
+
+
+@pytest.fixture
+def conn(database):
+    conn = sqlite3.connect(database)
+    yield conn
+    conn.close()
+
+
+def test_a_build_creates_every_index(conn):
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(schema.index_names()) <= names
+
+
+def test_foreign_keys_hold(conn):
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+
+
+def test_every_query_uses_an_index(conn):
+    results = run_queries(conn, repeats=1)
+    assert list(results) == list(queries)
+    for name, result in results.items():
+        assert "skipped" not in result, name
+        assert result["full_scans"] == [], (name, result["plan"])
+
+
+def test_full_scans_are_recognised():
+    plan = ["SCAN Rent_Payments", "SCAN Features", "SEARCH Sales USING INDEX Sales_Property (Property_ID=?)"]
+    assert full_scans(plan) == ["SCAN Rent_Payments"]
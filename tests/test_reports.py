@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+from real_estate import reports
+from real_estate.advance import advance
+
+
+@pytest.fixture
+def conn(database_copy):
+    conn = sqlite3.connect(database_copy)
+    yield conn
+    conn.close()
+
+
+# Rows of every summary table with a non-zero value, rounded against summation order
+def _summaries(conn):
+    tables = {}
+    for name, summary in reports.summaries.items():
+        values = [column for column, _, _ in summary["values"]]
+        rows = conn.execute(f"SELECT * FROM {name} WHERE {' OR '.join(f'{value} != 0' for value in values)} ORDER BY 1")
+        tables[name] = [tuple(round(value, 6) if isinstance(value, float) else value for value in row) for row in rows]
+    return tables
+
+
+def test_a_build_installs_the_summaries(conn):
+    assert reports.installed(conn)
+    occupancy = dict(conn.execute("SELECT Status, Properties FROM Report_Occupancy"))
+    assert occupancy == dict(conn.execute("SELECT Status, count(*) FROM Properties GROUP BY Status"))
+
+
+def test_triggers_keep_the_summaries_equal_to_a_rebuild(conn):
+    advance(conn, months=2, seed=5)
+    with conn:
+        conn.execute("DELETE FROM Sales WHERE Sale_ID IN (SELECT Sale_ID FROM Sales ORDER BY Sale_ID LIMIT 5)")
+        conn.execute("UPDATE Rentals SET Agent_ID = (SELECT min(Agent_ID) FROM Agents), Commission = 9.5 WHERE Rental_ID % 7 = 0")
+        conn.execute("UPDATE MaintenanceRequests SET Status = 'Resolved', Date_Resolved = '2025-03-01' WHERE Date_Resolved IS NULL")
+        conn.execute("DELETE FROM Rent_Payments WHERE Payment_ID % 11 = 0")
+    maintained = _summaries(conn)
+    reports.install(conn)
+    assert maintained == _summaries(conn)
+
+
+def test_agent_revenue_reports_commission_amounts(conn):
+    columns, rows = reports.run_report(conn, "agent_revenue")
+    revenue = {row[0]: row[columns.index("Commission_Revenue")] for row in rows}
+    expected = dict(conn.execute(
+        """
+        SELECT a.Agent_ID, round(
+            coalesce((SELECT sum(Sale_Price * Commission / 100) FROM Sales s WHERE s.Agent_ID = a.Agent_ID), 0)
+            + coalesce((SELECT sum(Monthly_Rent * Commission / 100) FROM Rentals r WHERE r.Agent_ID = a.Agent_ID), 0), 2)
+        FROM Agents a
+        """
+    ))
+    assert revenue.keys() == expected.keys()
+    assert all(revenue[agent] == pytest.approx(expected[agent], abs=0.011) for agent in expected)
+
+
+def test_unknown_report(conn):
+    with pytest.raises(ValueError, match="Unknown report"):
+        reports.run_report(conn, "no_such_report")
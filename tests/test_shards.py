@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+from real_estate import schema
+from real_estate.build import create_database
+from real_estate.shards import Shard, merge_shards
+
+
+def _rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+
+
+def _build_shards(directory, scale, count):
+    paths = []
+    for index in range(count):
+        path = str(directory / f"shard-{index}.db")
+        create_database(path, scale, if_exists="replace", shard=Shard(index, count))
+        paths.append(path)
+    return paths
+
+
+def test_merged_shards_equal_a_single_build(database, scale, tmp_path):
+    merged = str(tmp_path / "merged.db")
+    merge_shards(merged, _build_shards(tmp_path, scale, 2))
+    for table in schema.tables:
+        assert _rows(merged, table) == _rows(database, table), table
+
+
+def test_merge_needs_every_shard(scale, tmp_path):
+    paths = _build_shards(tmp_path, scale, 2)
+    with pytest.raises(ValueError, match="missing"):
+        merge_shards(str(tmp_path / "merged.db"), paths[:1])
+
+
+def test_shard_blocks_cover_every_chunk_once():
+    blocks = [Shard(index, 3).chunk_range(10) for index in range(3)]
+    assert [chunk for block in blocks for chunk in block] == list(range(10))
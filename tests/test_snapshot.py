@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+import pytest
+
+from real_estate import schema, snapshot
+from real_estate.config import Scale
+
+
+def _write(path, size, used):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    os.utime(path, (used, used))
+
+
+def _rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+
+
+def test_eviction_removes_the_least_recently_used(tmp_path):
+    cache = snapshot.SnapshotCache(str(tmp_path), max_bytes=250)
+    paths = [str(tmp_path / f"snapshot-{name}.db") for name in "abcd"]
+    for used, path in enumerate(paths):
+        _write(path, 100, 1_000_000 + used)
+    # Not a snapshot, so neither counted nor removed
+    _write(str(tmp_path / "other.db"), 1000, 0)
+
+    assert cache.evict(keep=paths[0]) == paths[1:3]
+    assert [path for path, _, _ in cache.entries()] == [paths[0], paths[3]]
+    assert cache.size() == 200
+    assert os.path.exists(tmp_path / "other.db")
+
+
+def test_snapshot_larger_than_the_cache_is_kept(tmp_path):
+    cache = snapshot.SnapshotCache(str(tmp_path), max_bytes=50)
+    path = str(tmp_path / "snapshot-a.db")
+    _write(path, 100, 1_000_000)
+    assert cache.evict(keep=path) == []
+    assert cache.evict() == [path]
+
+
+def test_miss_then_hit(database, scale, tmp_path):
+    cache = snapshot.SnapshotCache(str(tmp_path / "snapshots"))
+    first = str(tmp_path / "first.db")
+    second = str(tmp_path / "second.db")
+    assert snapshot.create_database(first, scale, cache=cache) is False
+    assert snapshot.create_database(second, scale, cache=cache) is True
+    assert len(cache.entries()) == 1
+    for table in schema.tables:
+        assert _rows(second, table) == _rows(database, table), table
+
+
+def test_keys_follow_the_build_parameters(scale):
+    assert snapshot.snapshot_key(scale) == snapshot.snapshot_key(Scale(scale.factor, seed=scale.seed, chunk_size=scale.chunk_size))
+    assert snapshot.snapshot_key(scale) != snapshot.snapshot_key(Scale(scale.factor, seed=scale.seed + 1, chunk_size=scale.chunk_size))
+    assert snapshot.snapshot_key(scale) != snapshot.snapshot_key(Scale(scale.factor * 2, seed=scale.seed, chunk_size=scale.chunk_size))
+
+
+def test_random_seeds_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="explicit seed"):
+        snapshot.SnapshotCache(str(tmp_path)).get(Scale(0.5))
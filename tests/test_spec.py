@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from real_estate import schema, tables
+from real_estate.spec import ForeignKey, Integers, Key, Offset, Table, compile_plan, plan
+
+
+@pytest.fixture(scope="module")
+def context(scale):
+    return tables.Context(scale)
+
+
+def _chunks(context, table):
+    return [tables.generate_chunk(context, table, index) for index in range(tables.chunk_count(context.scale, table))]
+
+
+def _column(chunks, name):
+    return np.concatenate([chunk.columns[name] for chunk in chunks])
+
+
+def test_plan_covers_every_table_but_rent_payments():
+    assert sorted(plan) == sorted(table for table in schema.tables if table != "Rent_Payments")
+
+
+def test_chunks_are_deterministic_and_have_the_schema_columns(context):
+    for table in plan:
+        first, again = tables.generate_chunk(context, table, 0), tables.generate_chunk(context, table, 0)
+        assert first.names == schema.columns[table]
+        assert list(first) == list(again), table
+
+
+def test_keys_are_consecutive_across_chunks(context):
+    for table, table_plan in plan.items():
+        if table_plan.spec.rows is not None or table == "Property_Features":
+            continue
+        keys = _column(_chunks(context, table), schema.columns[table][0])
+        assert keys.tolist() == list(range(table_plan.id_start(), table_plan.id_start() + len(keys))), table
+
+
+def test_foreign_keys_and_partition(context):
+    scale = context.scale
+    sales = _chunks(context, "Sales")
+    rentals = _chunks(context, "Rentals")
+    sold, rented = _column(sales, "Property_ID"), _column(rentals, "Property_ID")
+    # Every owned property is sold once and every rented one rented once
+    assert len(set(sold.tolist())) == len(sold) == scale.owned
+    assert len(set(rented.tolist())) == len(rented) == scale.rented
+    assert not set(sold.tolist()) & set(rented.tolist())
+    assert (context.partition.status_codes(sold) == 0).all()
+    assert (context.partition.status_codes(rented) == 1).all()
+
+    owners = _column(sales, "Owner_ID")
+    owner_start = plan["Owners"].id_start()
+    assert owners.min() >= owner_start and owners.max() < owner_start + scale.owners
+    # Balanced keys spread the rows evenly over the parents
+    counts = np.bincount(owners - owner_start, minlength=scale.owners)
+    assert counts.max() - counts.min() <= 1
+
+
+def test_feature_sets(context):
+    features = _chunks(context, "Property_Features")
+    property_ids, feature_ids = _column(features, "Property_ID"), _column(features, "Feature_ID")
+    pairs = set(zip(property_ids.tolist(), feature_ids.tolist()))
+    assert len(pairs) == len(property_ids)
+    per_property = np.bincount(property_ids)[1:]
+    assert per_property.min() >= 1 and per_property.max() <= 4
+
+
+def test_compile_rejects_bad_specs():
+    with pytest.raises(ValueError, match="expected the columns"):
+        compile_plan({"Agents": Table("agents", [("Agent_ID", Key(1))])})
+    with pytest.raises(ValueError, match="must be generated before it"):
+        compile_plan({"Sales": Table("owned", [("Sale_ID", Key(1)), ("Closing_Costs", Offset("Sale_Price", Integers(1, 2)))])})
+    with pytest.raises(ValueError, match="not in the spec"):
+        compile_plan({"Sales": Table("owned", [("Sale_ID", Key(1)), ("Owner_ID", ForeignKey("Owners", "balanced"))])})
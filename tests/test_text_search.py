@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from real_estate import text_search
+
+
+@pytest.fixture
+def conn(database_copy):
+    conn = sqlite3.connect(database_copy)
+    yield conn
+    conn.close()
+
+
+def _like_count(conn, table, column, word):
+    return conn.execute(f"SELECT count(*) FROM {table} WHERE {column} LIKE ?", (f"%{word}%",)).fetchone()[0]
+
+
+def test_every_index_is_installed_by_a_build(conn):
+    assert text_search.installed(conn)
+    assert set(text_search.indexes) >= {"Maintenance_Search", "Payment_Search"}
+
+
+def test_search_matches_like(conn):
+    for table, column, word in [("MaintenanceRequests", "Issue_Description", "infestation"), ("Rent_Payments", "Notes", "delayed")]:
+        expected = _like_count(conn, table, column, word)
+        assert expected > 0
+        assert text_search.count(conn, table, word) == expected
+        columns, rows = text_search.search(conn, table, word, limit=5)
+        assert columns[-1] == "Score" and len(rows) == min(5, expected)
+        assert all(word in row[columns.index(column)].lower() for row in rows)
+
+
+def test_free_text_matches_stems_and_prefixes(conn):
+    # "leak" finds "Leaky toilet tank"
+    assert text_search.count(conn, "MaintenanceRequests", "leak") >= _like_count(conn, "MaintenanceRequests", "Issue_Description", "leaky")
+    with pytest.raises(ValueError):
+        text_search.search(conn, "MaintenanceRequests", "  ")
+    with pytest.raises(ValueError, match="No text index"):
+        text_search.search(conn, "Sales", "anything")
+
+
+def test_triggers_keep_the_indexes_current(conn):
+    payment_id = conn.execute("SELECT min(Payment_ID) FROM Rent_Payments").fetchone()[0]
+    with conn:
+        conn.execute("UPDATE Rent_Payments SET Notes = 'Settled by zebra' WHERE Payment_ID = ?", (payment_id,))
+        conn.execute("DELETE FROM MaintenanceRequests WHERE Issue_Description LIKE '%infestation%'")
+    _, rows = text_search.search(conn, "Rent_Payments", "zebra")
+    assert [row[0] for row in rows] == [payment_id]
+    assert text_search.count(conn, "MaintenanceRequests", "infestation") == 0
+    # The index stays consistent with its table
+    conn.execute("INSERT INTO Payment_Search (Payment_Search, rank) VALUES ('integrity-check', 1)")
@@ -0,0 +1,42 @@
+import sqlite3
+
+from real_estate.advance import advance
+from real_estate.validate import rules, validate
+
+
+def _violated(results):
+    return {name: violations for name, (violations, _, _) in results.items() if violations}
+
+
+def test_generated_database_is_valid(database):
+    results = validate(database, workers=2)
+    assert list(results) == list(rules)
+    assert _violated(results) == {}
+
+
+def test_advanced_database_is_valid(database_copy):
+    conn = sqlite3.connect(database_copy)
+    try:
+        _, counts = advance(conn, months=3, seed=5)
+    finally:
+        conn.close()
+    assert counts["Rent_Payments"] > 0
+    assert _violated(validate(database_copy, workers=2)) == {}
+
+
+def test_violations_are_counted_and_sampled(database_copy):
+    conn = sqlite3.connect(database_copy)
+    with conn:
+        rental_id = conn.execute("SELECT Rental_ID FROM Rent_Payments ORDER BY Payment_ID LIMIT 1").fetchone()[0]
+        conn.execute("UPDATE Rentals SET Tenant_ID = -1 WHERE Rental_ID = ?", (rental_id,))
+        conn.execute("UPDATE Rentals SET End_Date = Start_Date WHERE Rental_ID = ?", (rental_id,))
+        payments = conn.execute("SELECT count(*) FROM Rent_Payments WHERE Rental_ID = ?", (rental_id,)).fetchone()[0]
+    conn.close()
+
+    names = ["Rentals.Tenant_ID", "rental_end_after_start", "payment_matches_rental", "payment_within_rental"]
+    results = validate(database_copy, names, samples=1)
+    # Every payment of the rental is now dated after its End_Date
+    expected = {"Rentals.Tenant_ID": 1, "rental_end_after_start": 1, "payment_matches_rental": payments, "payment_within_rental": payments}
+    assert _violated(results) == expected
+    _, samples, _ = results["Rentals.Tenant_ID"]
+    assert samples == [(rental_id, -1)]